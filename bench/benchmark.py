@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+""" PyLinter benchmarks
+
+    Measures how the plugin copes with large amounts of Pylint output, outside
+    of Sublime Text. The `stubs` directory next to this file provides
+    stand-ins for the `sublime` and `sublime_plugin` modules, so `pylinter.py`
+    can be imported as it would be by Sublime Text 3.
+
+    Synthetic Pylint output of various sizes, in Pylint's JSON and text
+    formats, is replayed through the same code paths a real run goes through:
+    decoding the output, `PylintThread.handle_messages` (on the lint thread),
+    `PylintThread.process_errors` and `PylinterCommand.show_errors` (on the
+    main thread), `PylinterCommand.popup_error_list` and
+    `BackgroundPylinter.on_selection_modified`. "main thread slice" is the
+    longest the main thread is kept busy at a time while the results of a run
+    are shown. The latency of settings lookups
+    through `multiconf.get` and `PylSet`, and the time the quick check takes
+    on a module of the same size, are measured as well.
+
+    Pylint itself is not needed. Run from the repository root:
+
+        python bench/benchmark.py [--sizes 10,1000] [--json results.json]
+                                  [--baseline results.json]
+
+    For every benchmark the time per operation, the throughput in messages
+    per second and the peak memory allocated during a single operation are
+    reported. With --baseline, benchmarks that became slower than the
+    baseline by more than the tolerance are listed and the exit status is 1.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import types
+import argparse
+import importlib
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4
+    tracemalloc = None
+
+# The most precise clock available
+clock = getattr(time, "perf_counter", time.time)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+# The minimum amount of time to spend on a single benchmark, in seconds
+MIN_TIME = 0.2
+MAX_REPEAT = 1000
+
+# (message id, symbol, message) of the messages in the synthetic output
+MESSAGE_TYPES = (
+    ("C0103", "invalid-name", 'Variable name "%s" doesn\'t conform to '
+                              'snake_case naming style'),
+    ("C0116", "missing-function-docstring",
+     "Missing function or method docstring"),
+    ("C0301", "line-too-long", "Line too long (%d/100)"),
+    ("E0602", "undefined-variable", "Undefined variable '%s'"),
+    ("E1101", "no-member", "Instance of 'Thing' has no '%s' member"),
+    ("R0913", "too-many-arguments", "Too many arguments (%d/5)"),
+    ("W0611", "unused-import", "Unused import %s"),
+    ("W0613", "unused-argument", "Unused argument '%s'"),
+)
+
+# Settings used by the multiconf benchmarks
+MULTICONF_SETTINGS = {
+    "plain": "/usr/bin/python",
+    "multiconf": {"#multiconf#": [
+        {"os:windows": "C:\\Python27\\python.exe"},
+        {"os:osx;host:build-mac": "/usr/local/bin/python"},
+        {"os:linux;host:some-other-host": "/opt/python/bin/python"},
+        {"os:linux": "/usr/bin/python"},
+    ]},
+}
+
+
+def load_pylinter():
+    """ Import PyLinter the way Sublime Text 3 does, using the stubs """
+    sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+    package = types.ModuleType("Pylinter")
+    package.__path__ = [ROOT_DIR]
+    sys.modules["Pylinter"] = package
+
+    import sublime
+    settings = sublime.load_settings("Pylinter.sublime-settings")
+    settings.values.update({"verbose": False, "use_cache": False})
+
+    pylinter = importlib.import_module("Pylinter.pylinter")
+    # Skip probing for Pylint, the benchmarks never run it
+    pylinter.PYLINT_SETTINGS = settings
+    pylinter.set_pylint_command(["pylint"], (2, 12, 0))
+    return sublime, pylinter, importlib.import_module("Pylinter.multiconf")
+
+
+def make_source(line_count):
+    """ Return a Python source with `line_count` lines """
+    return "\n".join("    value_%d = compute(value_%d, %d)  # %s" % (
+        i, i - 1, i, "x" * (i % 40)) for i in range(line_count))
+
+
+def make_records(message_count, line_count, seed=0):
+    """ Return `message_count` Pylint messages in Pylint's JSON format """
+    rnd = random.Random(seed)
+    records = []
+    for i in range(message_count):
+        msg_id, symbol, template = rnd.choice(MESSAGE_TYPES)
+        line = rnd.randrange(line_count) + 1
+        column = rnd.randrange(4, 20)
+        if "%s" in template:
+            message = template % ("name_%d" % i)
+        elif "%d" in template:
+            message = template % rnd.randrange(100, 200)
+        else:
+            message = template
+        records.append({
+            "type": "error", "module": "synthetic", "obj": "",
+            "line": line, "column": column,
+            "endLine": line, "endColumn": column + 8,
+            "path": "synthetic.py", "symbol": symbol,
+            "message": message, "message-id": msg_id})
+    return records
+
+
+def to_text(records):
+    """ Return the records in the text format PyLinter asks older Pylint
+    versions for """
+    return "\n".join("%s:%d:%s:%s" % (r["path"], r["line"], r["message-id"],
+                                      r["message"]) for r in records)
+
+
+def measure(func, setup=None):
+    """ Return the fastest time of a single call of `func`, repeated for at
+    least MIN_TIME seconds, and the peak memory it allocated in bytes, or None
+    if that can't be determined. `setup`, if given, is called before every
+    call and is not timed. """
+    timings = []
+    started = time.time()
+    while (len(timings) < 3 or time.time() - started < MIN_TIME) and \
+            len(timings) < MAX_REPEAT:
+        if setup:
+            setup()
+        gc.disable()
+        start = clock()
+        func()
+        end = clock()
+        gc.enable()
+        timings.append(end - start)
+
+    peak = None
+    if tracemalloc is not None:
+        if setup:
+            setup()
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return min(timings), peak
+
+
+class Replay(object):
+    """ Replays synthetic Pylint output into a view """
+
+    def __init__(self, sublime, pylinter, size):
+        self.sublime = sublime
+        self.pylinter = pylinter
+        self.size = size
+        line_count = max(100, size // 3)
+        self.records = make_records(size, line_count)
+        self.json_output = json.dumps(self.records, indent=4)
+        self.text_output = to_text(self.records)
+        self.messages = [pylinter.parse_record(r)[1:] for r in self.records]
+
+        self.window = sublime.active_window()
+        source = make_source(line_count)
+        self.view = self.window.add_view(sublime.View(
+            source, "/tmp/synthetic.py", self.window))
+        # The synthetic source is a function body
+        self.module = ("def synthetic():\n" + source).encode("utf-8")
+        self.command = pylinter.PylinterCommand(self.view)
+        self.listener = pylinter.BackgroundPylinter()
+        self.settings = pylinter.PylSet.read_settings()
+
+    def decode_json(self):
+        parse_record = self.pylinter.parse_record
+        return [parse_record(r)[1:] for r in json.loads(self.json_output)]
+
+    def decode_text(self):
+        parse_line = self.pylinter.parse_line
+        messages = []
+        for line in self.text_output.split("\n"):
+            message = parse_line(line)
+            if message is not None:
+                messages.append(message[1:])
+        return messages
+
+    def quick_check(self):
+        return self.pylinter.quickcheck.check(self.module)
+
+    def make_thread(self):
+        """ Return a lint thread for the view that is the current run """
+        pylinter = self.pylinter
+        thread = pylinter.PylintThread(self.view, *self.settings)
+        # What `LintScheduler.submit` would do, minus starting the thread
+        pylinter.LintScheduler._generation[self.view.id()] = thread.generation
+
+        return thread
+
+    def reset_view(self):
+        """ Forget all markers, as if the view had never been linted """
+        view_id = self.view.id()
+        self.pylinter.PYLINTER_ERRORS.pop(view_id, None)
+        self.pylinter.PYLINTER_VIEWS.pop(view_id, None)
+        for category in self.pylinter.CATEGORIES:
+            self.view.erase_regions("pylinter." + category)
+
+    def handle_messages(self):
+        self.thread.handle_messages(self.messages, [])
+
+    def prepare_handle_messages(self):
+        del self.sublime._TIMEOUTS[:]
+        self.thread = self.make_thread()
+
+    def process_errors(self):
+        self.sublime.run_timeouts()
+
+    def prepare_process_errors(self):
+        """ Have the results of a run indexed, up to the point where they
+        are handed over to the main thread """
+        self.reset_view()
+        del self.sublime._TIMEOUTS[:]
+        self.thread = self.make_thread()
+        self.thread.handle_messages(self.messages, [])
+
+    def longest_slice(self):
+        """ Return the longest time a single main thread callback takes while
+        the results of a run are shown """
+        longest = None
+        for _ in range(3):
+            self.prepare_process_errors()
+            slowest = 0.0
+            timeouts = self.sublime._TIMEOUTS
+            gc.disable()
+            while timeouts:
+                start = clock()
+                timeouts.pop(0)()
+                slowest = max(slowest, clock() - start)
+            gc.enable()
+            longest = slowest if longest is None else min(longest, slowest)
+        return longest
+
+    def forget_drawn(self):
+        self.pylinter.PYLINTER_VIEWS[self.view.id()].drawn = {}
+
+    def show_errors(self):
+        self.pylinter.PylinterCommand.show_errors(self.view)
+        self.sublime.run_timeouts()
+
+    def popup_error_list(self):
+        self.command.popup_error_list()
+
+    def move_caret(self):
+        """ Move the caret over 1000 lines, some of which have messages """
+        view, listener = self.view, self.listener
+        line_count = len(view._line_starts)
+        step = max(1, line_count // 1000)
+        for line in range(0, min(line_count, 1000 * step), step):
+            view.sel()[0] = self.sublime.Region(view.text_point(line, 0))
+            listener.on_selection_modified(view)
+
+    def run(self):
+        """ Yield (name, seconds, peak memory, operations) for every
+        benchmark, where `operations` is the number of operations a single
+        run consists of. Only single operations handle all messages, None
+        means the benchmark is not about the messages handled. """
+        yield ("decode json",) + measure(self.decode_json) + (1,)
+        yield ("decode text",) + measure(self.decode_text) + (1,)
+        yield ("handle_messages",) + measure(
+            self.handle_messages, self.prepare_handle_messages) + (1,)
+        yield ("process_errors",) + measure(
+            self.process_errors, self.prepare_process_errors) + (1,)
+        yield ("main thread slice", self.longest_slice(), None, None)
+        yield ("show_errors full",) + measure(
+            self.show_errors, self.forget_drawn) + (1,)
+        yield ("show_errors unchanged",) + measure(self.show_errors) + (1,)
+        yield ("popup_error_list",) + measure(self.popup_error_list) + (1,)
+        yield ("on_selection_modified",) + measure(self.move_caret) + (1000,)
+        yield ("quick check",) + measure(self.quick_check) + (1,)
+
+
+def bench_settings(sublime, pylinter, multiconf):
+    """ Yield (name, seconds per lookup, peak memory) for the settings
+    lookups """
+    settings = sublime.Settings(MULTICONF_SETTINGS)
+    lookups = 1000
+
+    def lookup(key):
+        def run():
+            for _ in range(lookups):
+                multiconf.get(settings, key)
+        return run
+
+    for key in sorted(MULTICONF_SETTINGS):
+        seconds, peak = measure(lookup(key))
+        yield ("multiconf.get %s" % key, seconds / lookups, peak)
+
+    view = sublime.active_window().active_view()
+
+    def pylset():
+        for _ in range(lookups):
+            pylinter.PylSet.get_or("python_bin", "python", view)
+
+    seconds, peak = measure(pylset)
+    yield ("PylSet.get_or", seconds / lookups, peak)
+
+
+def format_memory(peak):
+    if peak is None:
+        return "n/a"
+    return "%.1f KiB" % (peak / 1024.0)
+
+
+def compare(results, baseline, tolerance):
+    """ Return the descriptions of the results that regressed """
+    regressions = []
+    for key, result in sorted(results.items()):
+        old = baseline.get(key)
+        if old and result["seconds"] > old["seconds"] * (1 + tolerance):
+            regressions.append("%s: %.4f ms -> %.4f ms (+%.0f%%)" % (
+                key, old["seconds"] * 1000, result["seconds"] * 1000,
+                (result["seconds"] / old["seconds"] - 1) * 100))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run PyLinter benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated numbers of messages to replay")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write the results to PATH as JSON")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="compare with results written by --json")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown that counts as a regression "
+                        "(default: 0.25)")
+    args = parser.parse_args()
+
+    sublime, pylinter, multiconf = load_pylinter()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = {}
+
+    row = "%-24s %9s %14s %14s %12s"
+    print(row % ("benchmark", "messages", "time/op", "messages/s",
+                 "peak memory"))
+
+    for size in sizes:
+        replay = Replay(sublime, pylinter, size)
+        for name, seconds, peak, ops in replay.run():
+            per_op = seconds / (ops or 1)
+            throughput = None
+            if ops == 1:
+                throughput = size / per_op if per_op else float("inf")
+            print(row % (name, size, "%.4f ms" % (per_op * 1000),
+                         "-" if throughput is None else "%.0f" % throughput,
+                         format_memory(peak)))
+            results["%s/%d" % (name, size)] = {
+                "seconds": per_op, "throughput": throughput, "peak": peak}
+        replay.reset_view()
+
+    for name, seconds, peak in bench_settings(sublime, pylinter, multiconf):
+        print(row % (name, "-", "%.2f us" % (seconds * 1e6), "-",
+                     format_memory(peak)))
+        results[name] = {"seconds": seconds, "throughput": None,
+                         "peak": peak}
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline),
+                                  args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print("  " + regression)
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+""" A stand-in for Sublime Text's `sublime` module.
+
+Only the parts of the API that PyLinter uses are provided, and only as far as
+the benchmarks need them. Callbacks passed to `set_timeout` are queued and run
+by `run_timeouts`, so the benchmarks decide when "the main thread" does its
+work.
+"""
+
+import bisect
+
+HIDDEN = 128
+DRAW_OUTLINED = 256
+DRAW_NO_FILL = 32
+DRAW_NO_OUTLINE = 512
+
+_TIMEOUTS = []
+_SETTINGS = {}
+
+
+def version():
+    return "3211"
+
+
+def platform():
+    return "linux"
+
+
+def arch():
+    return "x64"
+
+
+def set_timeout(callback, delay=0):
+    _TIMEOUTS.append(callback)
+
+
+def set_timeout_async(callback, delay=0):
+    _TIMEOUTS.append(callback)
+
+
+def run_timeouts():
+    """ Run all queued callbacks, including the ones they queue """
+    while _TIMEOUTS:
+        _TIMEOUTS.pop(0)()
+
+
+def status_message(msg):
+    pass
+
+
+def error_message(msg):
+    pass
+
+
+def message_dialog(msg):
+    pass
+
+
+def load_settings(name):
+    return _SETTINGS.setdefault(name, Settings())
+
+
+class Settings(object):
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.callbacks = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+        for callback in list(self.callbacks.values()):
+            callback()
+
+    def has(self, key):
+        return key in self.values
+
+    def erase(self, key):
+        self.values.pop(key, None)
+
+    def add_on_change(self, key, callback):
+        self.callbacks[key] = callback
+
+    def clear_on_change(self, key):
+        self.callbacks.pop(key, None)
+
+
+class Region(object):
+    __slots__ = ("a", "b")
+
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def empty(self):
+        return self.a == self.b
+
+    def __eq__(self, other):
+        return (self.a, self.b) == (other.a, other.b)
+
+    def __hash__(self):
+        return hash((self.a, self.b))
+
+    def __repr__(self):
+        return "Region(%d, %d)" % (self.a, self.b)
+
+
+class View(object):
+    """ A buffer with a file name, settings, regions and a selection """
+    _last_id = 0
+
+    def __init__(self, text="", file_name=None, window=None):
+        View._last_id += 1
+        self._id = View._last_id
+        self._file_name = file_name
+        self._window = window
+        self._settings = Settings()
+        self._regions = {}
+        self._status = {}
+        self._sel = [Region(0)]
+        self._change_count = 0
+        self._text = ""
+        self._line_starts = [0]
+        self.set_text(text)
+
+    def set_text(self, text):
+        self._text = text
+        self._line_starts = [0]
+        start = text.find("\n")
+        while start != -1:
+            self._line_starts.append(start + 1)
+            start = text.find("\n", start + 1)
+        self._change_count += 1
+
+    def id(self):
+        return self._id
+
+    def buffer_id(self):
+        return self._id
+
+    def file_name(self):
+        return self._file_name
+
+    def settings(self):
+        return self._settings
+
+    def window(self):
+        return self._window
+
+    def size(self):
+        return len(self._text)
+
+    def change_count(self):
+        return self._change_count
+
+    def is_loading(self):
+        return False
+
+    def is_dirty(self):
+        return False
+
+    def substr(self, region):
+        if isinstance(region, Region):
+            return self._text[region.begin():region.end()]
+        return self._text[region:region + 1]
+
+    def text_point(self, row, col):
+        row = max(0, min(row, len(self._line_starts) - 1))
+        return min(self._line_starts[row] + col, len(self._text))
+
+    def rowcol(self, point):
+        row = bisect.bisect_right(self._line_starts, point) - 1
+        return (row, point - self._line_starts[row])
+
+    def line(self, point):
+        if isinstance(point, Region):
+            point = point.begin()
+        row = self.rowcol(point)[0]
+        begin = self._line_starts[row]
+        if row + 1 < len(self._line_starts):
+            end = self._line_starts[row + 1] - 1
+        else:
+            end = len(self._text)
+        return Region(begin, end)
+
+    def sel(self):
+        return self._sel
+
+    def add_regions(self, key, regions, scope="", icon="", flags=0):
+        self._regions[key] = list(regions)
+
+    def get_regions(self, key):
+        return list(self._regions.get(key, []))
+
+    def erase_regions(self, key):
+        self._regions.pop(key, None)
+
+    def set_status(self, key, value):
+        self._status[key] = value
+
+    def erase_status(self, key):
+        self._status.pop(key, None)
+
+    def run_command(self, cmd, args=None):
+        if cmd == "append":
+            self.set_text(self._text + args["characters"])
+
+    def show(self, *args):
+        pass
+
+
+class Window(object):
+    def __init__(self):
+        self._views = []
+        self._active = None
+        self._panels = {}
+
+    def id(self):
+        return 1
+
+    def views(self):
+        return list(self._views)
+
+    def active_view(self):
+        return self._active
+
+    def num_groups(self):
+        return 1
+
+    def active_view_in_group(self, group):
+        return self._active
+
+    def folders(self):
+        return []
+
+    def project_data(self):
+        return {}
+
+    def show_quick_panel(self, items, on_done, *args, **kwargs):
+        pass
+
+    def create_output_panel(self, name, *args):
+        panel = View(window=self)
+        self._panels[name] = panel
+        return panel
+
+    def get_output_panel(self, name):
+        return self.create_output_panel(name)
+
+    def find_output_panel(self, name):
+        return self._panels.get(name)
+
+    def run_command(self, cmd, args=None):
+        pass
+
+    def add_view(self, view):
+        view._window = self
+        self._views.append(view)
+        self._active = view
+        return view
+
+
+_WINDOW = Window()
+
+
+def active_window():
+    return _WINDOW
+
+
+def windows():
+    return [_WINDOW]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+""" A stand-in for Sublime Text's `sublime_plugin` module """
+
+
+class TextCommand(object):
+    def __init__(self, view):
+        self.view = view
+
+
+class WindowCommand(object):
+    def __init__(self, window):
+        self.window = window
+
+
+class ApplicationCommand(object):
+    pass
+
+
+class EventListener(object):
+    pass
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+""" Rank Pylint's checkers by the time they take.
+
+A Pylint worker can time the methods of every checker during a job, see
+`CheckerTimer` in `pylint_worker.py`. A `CheckerProfile` turns those timings
+into the time spent per checker, per plugin and per message id, and suggests
+which messages to disable to get a file linted within a target time.
+
+The time of a method is attributed to the messages it checks, split evenly.
+Methods that don't say which messages they check are attributed to all
+messages of their checker. Pylint skips a method once all of the messages it
+checks are disabled, which is what the suggestion is based on; it never
+includes errors or fatal messages.
+
+The timings include the overhead of timing itself, and a method that is
+called by another timed method only counts towards the latter's time once.
+
+This module does not depend on Sublime Text.
+"""
+
+try:
+    from . import stats
+except (ImportError, ValueError):
+    import stats
+
+# The categories of the messages that are never suggested for disabling
+KEEP_CATEGORIES = ("E", "F")
+
+# Messages whose disabling saves less than this share of the total time are
+# not worth suggesting
+MIN_SAVING = 0.01
+
+# The number of rows shown per table
+TABLE_ROWS = 20
+
+
+def format_share(part, total):
+    if not total:
+        return "-"
+    return "%.1f%%" % (100.0 * part / total)
+
+
+class CheckerProfile(object):
+    """ The checker timings of a single Pylint run """
+
+    def __init__(self, data, plugins=()):
+        # The time the whole run took, in seconds
+        self.total = data.get("total", 0.0)
+        # [checker name, module, method, seconds, calls, message ids]
+        self.timings = data.get("timings", [])
+        # checker name -> {message id: symbol}
+        self.checkers = data.get("checkers", {})
+        self.cprofile = data.get("cprofile")
+        self.plugins = plugins or ()
+
+        self.symbols = {}
+        for messages in self.checkers.values():
+            self.symbols.update(messages)
+
+    def checked_messages(self, timing):
+        """ Return the ids of the messages a timed method is for """
+        return timing[5] or sorted(self.checkers.get(timing[0], ()))
+
+    def plugin_of(self, module):
+        """ Return the plugin that provides the checker in `module`, or
+        "pylint" for Pylint's own checkers """
+        for plugin in self.plugins:
+            if module == plugin or module.startswith(plugin + "."):
+                return plugin
+        return "pylint"
+
+    def checker_time(self):
+        """ Return the time spent in checkers """
+        return sum(timing[3] for timing in self.timings)
+
+    def by_checker(self):
+        """ Return (seconds, calls, checker, plugin) per checker, slowest
+        first """
+        found = {}
+        for name, module, _, seconds, calls, _ in self.timings:
+            key = (name, self.plugin_of(module))
+            total = found.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += calls
+        return sorted(((seconds, calls, name, plugin)
+                       for (name, plugin), (seconds, calls)
+                       in found.items()), reverse=True)
+
+    def by_plugin(self):
+        """ Return (seconds, plugin) per plugin, slowest first """
+        found = {}
+        for seconds, _, _, plugin in self.by_checker():
+            found[plugin] = found.get(plugin, 0.0) + seconds
+        return sorted(((seconds, plugin) for plugin, seconds in found.items()),
+                      reverse=True)
+
+    def by_message(self):
+        """ Return (seconds, message id, symbol) per message id, slowest
+        first """
+        found = {}
+        for timing in self.timings:
+            messages = self.checked_messages(timing)
+            for msg_id in messages:
+                found[msg_id] = found.get(msg_id, 0.0) + (timing[3] /
+                                                          len(messages))
+        return sorted(((seconds, msg_id, self.symbols.get(msg_id))
+                       for msg_id, seconds in found.items()), reverse=True)
+
+    def savings(self, disabled):
+        """ Return the time saved by disabling the given message ids """
+        disabled = set(disabled)
+        saved = 0.0
+        for timing in self.timings:
+            messages = self.checked_messages(timing)
+            if messages and disabled.issuperset(messages):
+                saved += timing[3]
+        return saved
+
+    def suggest_disable(self, target):
+        """ Return the message ids to disable to have Pylint take at most
+        `target` seconds, and the time it's estimated to take then """
+        if self.total <= target:
+            return [], self.total
+
+        disabled = []
+        for seconds, msg_id, _ in self.by_message():
+            if seconds <= 0 or msg_id[:1] in KEEP_CATEGORIES:
+                continue
+            disabled.append(msg_id)
+            if self.total - self.savings(disabled) <= target:
+                break
+
+        # Leave out the messages that don't make enough of a difference
+        for msg_id in reversed(list(disabled)):
+            rest = [m for m in disabled if m != msg_id]
+            saved = self.savings(rest)
+            if (self.savings(disabled) - saved < MIN_SAVING * self.total or
+                    self.total - saved <= target):
+                disabled = rest
+
+        return sorted(disabled), self.total - self.savings(disabled)
+
+    def compact(self, disabled):
+        """ Return the message ids with those of checkers that are disabled
+        as a whole replaced by the checker's name, which Pylint's `disable`
+        accepts as well """
+        disabled = set(disabled)
+        names = []
+        for name, messages in sorted(self.checkers.items()):
+            if messages and disabled.issuperset(messages):
+                names.append(name)
+                disabled.difference_update(messages)
+        return names + sorted(disabled)
+
+    def report(self, target):
+        """ Return a textual report of the profile, with a suggested
+        `disable` setting for a run within `target` seconds """
+        checker_time = self.checker_time()
+        lines = ["Pylint took %s, %s of which in checkers (%s)" % (
+            stats.format_duration(self.total),
+            stats.format_duration(checker_time),
+            format_share(checker_time, self.total)), ""]
+
+        lines.append("Time per checker")
+        lines.append("  %10s %7s %9s  %-28s %s" % ("time", "share", "calls",
+                                                  "checker", "plugin"))
+        for seconds, calls, name, plugin in self.by_checker()[:TABLE_ROWS]:
+            lines.append("  %10s %7s %9d  %-28s %s" % (
+                stats.format_duration(seconds),
+                format_share(seconds, self.total), calls, name, plugin))
+
+        plugins = self.by_plugin()
+        if len(plugins) > 1:
+            lines.extend(["", "Time per plugin"])
+            for seconds, plugin in plugins:
+                lines.append("  %10s %7s  %s" % (
+                    stats.format_duration(seconds),
+                    format_share(seconds, self.total), plugin))
+
+        lines.extend(["", "Time per message id"])
+        for seconds, msg_id, symbol in self.by_message()[:TABLE_ROWS]:
+            if seconds > 0:
+                lines.append("  %10s %7s  %s %s" % (
+                    stats.format_duration(seconds),
+                    format_share(seconds, self.total), msg_id, symbol or ""))
+
+        lines.append("")
+        disable, estimate = self.suggest_disable(target)
+        if not disable:
+            if self.total <= target:
+                lines.append("Pylint already takes less than the target of "
+                             "%s" % stats.format_duration(target))
+            else:
+                lines.append("No messages can be disabled to get closer to "
+                             "the target of %s" %
+                             stats.format_duration(target))
+        else:
+            lines.append("Suggested for a target of %s, estimated to take "
+                         "%s:" % (stats.format_duration(target),
+                                  stats.format_duration(estimate)))
+            quoted = ['"%s"' % item for item in self.compact(disable)]
+            lines.append('    "disable": [%s]' % ",\n                ".join(
+                ", ".join(quoted[i:i + 8]) for i in range(0, len(quoted), 8)))
+            if estimate > target:
+                lines.append("The target can't be met by disabling "
+                             "messages alone")
+
+        if self.cprofile:
+            lines.extend(["", "cProfile", self.cprofile])
+        return "\n".join(lines) + "\n"
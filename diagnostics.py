@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+""" Storage for the Pylint messages of a view.
+
+A `DiagnosticStore` holds every message Pylint reported for a view, including
+multiple messages on the same line, as compact `Diagnostic` records. It keeps a
+sorted index of the lines that have messages and an index per message
+category, so lookups by line or by category don't require a scan.
+
+The state of the view itself, e.g. whether the markers are visible, is kept
+separately in a `ViewState`.
+
+This module does not depend on Sublime Text.
+"""
+
+import sys
+import json
+import zlib
+import bisect
+
+try:
+    from sys import intern
+except ImportError:
+    # Python 2, where intern is a builtin
+    pass
+
+# The message categories Pylint uses
+CATEGORIES = ("C", "E", "F", "I", "R", "W")
+
+# Where diagnostics come from, and how much they are trusted: "quick" for the
+# in-process check that runs ahead of Pylint, "pylint" for Pylint itself. The
+# results of Pylint runs with a lint profile have the name of the profile as
+# their origin, and rank like "pylint".
+ORIGIN_RANKS = {"quick": 0, "pylint": 1}
+PROFILE_RANK = 1
+
+
+def origin_rank(origin):
+    return ORIGIN_RANKS.get(origin, PROFILE_RANK)
+
+
+def _intern(text):
+    """ Intern a string; unicode strings can't be interned on Python 2 """
+    try:
+        return intern(text)
+    except TypeError:
+        return text
+
+
+class Diagnostic(object):
+    """ A single Pylint message.
+
+    Lines and columns are zero based. An `end_line` of -1 means Pylint did not
+    report where the offending code ends, an `end_column` of -1 means the end
+    of the line. `origin` is one of `ORIGIN_RANKS` or a profile name.
+    """
+    __slots__ = ("line", "column", "end_line", "end_column", "category",
+                 "msg_id", "symbol", "message", "origin")
+
+    def __init__(self, line, msg_id, message, column=0, end_line=-1,
+                 end_column=-1, symbol=None, origin="pylint"):
+        self.line = line
+        self.column = column
+        self.end_line = end_line
+        self.end_column = end_column
+        self.msg_id = _intern(msg_id)
+        self.symbol = symbol and _intern(symbol)
+        self.category = self.msg_id[0].upper()
+        # Many messages are repeated verbatim within and across files
+        self.message = _intern(message)
+        self.origin = origin
+
+    @classmethod
+    def from_message(cls, message, origin=None):
+        """ Create a diagnostic from a (line number, type, error number,
+        message[, column, end line, end column, symbol, origin]) sequence, as
+        produced by the output parsers. `origin`, if given, overrides the one
+        in the sequence. """
+        line, err_type, errno, text = message[:4]
+        diagnostic = cls(line, err_type + errno, text, *message[4:])
+        if origin is not None:
+            diagnostic.origin = origin
+        return diagnostic
+
+    @property
+    def span(self):
+        """ The (line, column, end line, end column) of the offending code.
+        A diagnostic without an end position spans the rest of its line. """
+        if self.end_line < 0:
+            return (self.line, self.column, self.line, -1)
+        return (self.line, self.column, self.end_line, self.end_column)
+
+    def to_message(self):
+        """ Return the message sequence this diagnostic can be created from,
+        see `from_message` """
+        return [self.line, self.msg_id[0], self.msg_id[1:], self.message,
+                self.column, self.end_line, self.end_column, self.symbol,
+                self.origin]
+
+    def __str__(self):
+        return "%s: %s" % (self.msg_id, self.message)
+
+    def __repr__(self):
+        return "Diagnostic(%d, %r, %r)" % (self.line, self.msg_id,
+                                           self.message)
+
+
+# The approximate memory used by a diagnostic, not counting its message, and
+# by the index entry of a line, in bytes
+DIAGNOSTIC_SIZE = (sys.getsizeof(Diagnostic(0, "C0000", "")) +
+                   2 * sys.getsizeof(None))
+LINE_SIZE = 3 * sys.getsizeof([]) // 2
+
+
+class DiagnosticStore(object):
+    """ The diagnostics of a single view, indexed by line and by category """
+
+    def __init__(self, diagnostics=()):
+        self._clear()
+        self.add(diagnostics)
+
+    def _clear(self):
+        """ Remove all diagnostics """
+        self._by_line = {}
+        self._by_category = dict((c, []) for c in CATEGORIES)
+        # The line numbers that have diagnostics, in ascending order
+        self._lines = []
+        self._count = 0
+        # The approximate memory used, see `memory_size`
+        self._size = 0
+        # The memoized outcomes of `lines_by_category`, `spans_by_category`
+        # and `_id_index`
+        self._category_lines = None
+        self._category_spans = None
+        self._id_index = None
+        # origin -> the number of diagnostics from there
+        self._origins = {}
+
+    def add(self, diagnostics):
+        """ Add diagnostics to the store """
+        by_line = self._by_line
+        new_lines = False
+
+        for diagnostic in diagnostics:
+            on_line = by_line.get(diagnostic.line)
+            if on_line is None:
+                by_line[diagnostic.line] = [diagnostic]
+                new_lines = True
+                self._size += LINE_SIZE
+            else:
+                on_line.append(diagnostic)
+            self._by_category.setdefault(diagnostic.category,
+                                         []).append(diagnostic)
+            self._count += 1
+            self._origins[diagnostic.origin] = self._origins.get(
+                diagnostic.origin, 0) + 1
+            self._size += DIAGNOSTIC_SIZE + len(diagnostic.message)
+            self._category_lines = self._category_spans = None
+            self._id_index = None
+
+        if new_lines:
+            self._lines = sorted(by_line)
+
+    def merge(self, diagnostics, replace=()):
+        """ Add diagnostics, after removing those of the origins in
+        `replace`.
+
+        Where diagnostics of different origins report the same message id on
+        the same line, only those of the highest ranked origin are kept, see
+        `origin_rank`. Between origins of the same rank, the diagnostics being
+        added win.
+        """
+        diagnostics = list(diagnostics)
+        replace = set(replace)
+        if not replace.intersection(self._origins) and not any(
+                self._reports(d.line, d.msg_id) for d in diagnostics):
+            # Nothing to remove or to reconcile
+            self.add(diagnostics)
+            return
+
+        incoming = {}
+        for diagnostic in diagnostics:
+            key = (diagnostic.line, diagnostic.msg_id)
+            incoming[key] = max(incoming.get(key, -1),
+                                origin_rank(diagnostic.origin))
+        kept = [d for d in self if d.origin not in replace and
+                origin_rank(d.origin) > incoming.get((d.line, d.msg_id), -1)]
+        existing = {}
+        for diagnostic in kept:
+            key = (diagnostic.line, diagnostic.msg_id)
+            existing[key] = max(existing.get(key, -1),
+                                origin_rank(diagnostic.origin))
+        kept.extend(d for d in diagnostics
+                    if origin_rank(d.origin) >= existing.get((d.line,
+                                                              d.msg_id), -1))
+        self._clear()
+        self.add(kept)
+
+    def _reports(self, line, msg_id):
+        """ Return True if there's a diagnostic with the message id on the
+        line """
+        return any(d.msg_id == msg_id for d in self._by_line.get(line, ()))
+
+    def overlay(self, diagnostics):
+        """ Return a new store with these diagnostics and the diagnostics of
+        this store that they don't replace. A diagnostic is replaced by the
+        ones with the same line and message id from an origin that ranks at
+        least as high, see `origin_rank`, so the results of a run that is
+        still in progress can be laid over those of the previous run. """
+        diagnostics = list(diagnostics)
+        incoming = {}
+        for diagnostic in diagnostics:
+            key = (diagnostic.line, diagnostic.msg_id)
+            incoming[key] = max(incoming.get(key, -1),
+                                origin_rank(diagnostic.origin))
+        kept = [d for d in self
+                if origin_rank(d.origin) > incoming.get((d.line, d.msg_id),
+                                                        -1)]
+        return DiagnosticStore(kept + diagnostics)
+
+    def move_lines(self, moves):
+        """ Move the diagnostics on the lines in `moves`, a dictionary of old
+        line -> new line, along with the end of the code they are about """
+        diagnostics = list(self)
+        for diagnostic in diagnostics:
+            line = moves.get(diagnostic.line, diagnostic.line)
+            if line != diagnostic.line:
+                if diagnostic.end_line >= 0:
+                    diagnostic.end_line += line - diagnostic.line
+                diagnostic.line = line
+        self._clear()
+        self.add(diagnostics)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """ Iterate over all diagnostics in line order """
+        for line in self._lines:
+            for diagnostic in self._by_line[line]:
+                yield diagnostic
+
+    def __contains__(self, line):
+        return line in self._by_line
+
+    def memory_size(self):
+        """ Return the approximate memory used by the store in bytes """
+        return self._size
+
+    def snapshot(self):
+        """ Return a compact, serialized copy of the diagnostics, see
+        `from_snapshot` """
+        messages = [diagnostic.to_message() for diagnostic in self]
+        return zlib.compress(json.dumps(messages,
+                                        separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """ Return a store with the diagnostics of a snapshot """
+        messages = json.loads(zlib.decompress(data).decode("utf-8"))
+        return cls(Diagnostic.from_message(message) for message in messages)
+
+    def lines(self):
+        """ Return the line numbers that have diagnostics, in ascending
+        order """
+        return self._lines
+
+    def next_line(self, line):
+        """ Return the first line after `line` that has diagnostics, wrapping
+        around to the first one, or None if there are no diagnostics """
+        lines = self._lines
+        if not lines:
+            return None
+        index = bisect.bisect_right(lines, line)
+        return lines[index] if index < len(lines) else lines[0]
+
+    def previous_line(self, line):
+        """ Return the last line before `line` that has diagnostics, wrapping
+        around to the last one, or None if there are no diagnostics """
+        lines = self._lines
+        if not lines:
+            return None
+        index = bisect.bisect_left(lines, line)
+        return lines[index - 1] if index > 0 else lines[-1]
+
+    def _get_id_index(self):
+        """ Return the message ids, diagnostics and their descriptions, in the
+        order of message id, message and line number """
+        if self._id_index is None:
+            ordered = sorted(self, key=lambda d: (d.msg_id, d.message, d.line))
+            self._id_index = ([d.msg_id for d in ordered], ordered,
+                              [str(d) for d in ordered])
+        return self._id_index
+
+    def in_id_order(self, prefix=""):
+        """ Return the diagnostics whose message id starts with `prefix`, e.g.
+        a category or a complete message id, and their descriptions, sorted
+        by message id and message """
+        ids, ordered, descriptions = self._get_id_index()
+        if not prefix:
+            return ordered, descriptions
+        prefix = prefix.upper()
+        # Message ids consist of capitals and digits, which all sort before
+        # the tilde
+        start = bisect.bisect_left(ids, prefix)
+        end = bisect.bisect_left(ids, prefix + "~", start)
+        return ordered[start:end], descriptions[start:end]
+
+    def id_counts(self):
+        """ Return (message id, symbol, count) for every message id, sorted
+        by message id """
+        counts = []
+        for diagnostic in self._get_id_index()[1]:
+            if counts and counts[-1][0] == diagnostic.msg_id:
+                counts[-1][2] += 1
+            else:
+                counts.append([diagnostic.msg_id, diagnostic.symbol, 1])
+        return [tuple(count) for count in counts]
+
+    def at_line(self, line):
+        """ Return the diagnostics on the given line """
+        return self._by_line.get(line, [])
+
+    def by_category(self, category):
+        """ Return the diagnostics of the given category """
+        return self._by_category.get(category, [])
+
+    def lines_by_category(self):
+        """ Return a dictionary of category -> sorted line numbers """
+        if self._category_lines is None:
+            lines = {}
+            for category, diagnostics in self._by_category.items():
+                lines[category] = sorted(set(d.line for d in diagnostics))
+            self._category_lines = lines
+        return self._category_lines
+
+    def spans_by_category(self):
+        """ Return a dictionary of category -> sorted spans, see
+        `Diagnostic.span` """
+        if self._category_spans is None:
+            spans = {}
+            for category, diagnostics in self._by_category.items():
+                spans[category] = sorted(set(d.span for d in diagnostics))
+            self._category_spans = spans
+        return self._category_spans
+
+
+class ViewState(object):
+    """ The Pylinter state of a view.
+
+    `drawn` describes the markers currently drawn in the view, as a dictionary
+    of category -> (line numbers or spans, icon, flags, change count,
+    regions), where
+    the change count is the one of the view at the time the regions were
+    computed. `hidden` holds the same for markers that have been toggled off.
+
+    `anchored` lists the lines of the anchor regions that follow the lines
+    with diagnostics as the buffer is edited, in ascending order, and
+    `line_count` is the number of lines in the view the last time the
+    anchors were looked at.
+    """
+    __slots__ = ("visible", "drawn", "hidden", "anchored", "line_count")
+
+    def __init__(self):
+        self.visible = True
+        self.drawn = {}
+        self.hidden = {}
+        self.anchored = None
+        self.line_count = None
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+""" How long linting every file takes, kept across sessions.
+
+A `DurationHistory` keeps the most recent lint durations of every file, per
+kind of run: runs of all checkers are kept apart from those of profiles that
+only enable some, see `run_key`. The history is stored as a single JSON file.
+It's used to tell slow files apart, to estimate how long a run will take and
+to plan the order in which files are linted, see `ShardQueues`.
+
+Files that haven't been linted before are estimated from their size, using
+the speed at which the other files were linted.
+
+This module does not depend on Sublime Text.
+"""
+
+import os
+import json
+import time
+import threading
+
+try:
+    from . import stats
+except (ImportError, ValueError):
+    import stats
+
+# The key of the runs of all checkers
+FULL = "full"
+
+# The number of durations kept per file and kind of run
+HISTORY_SIZE = 10
+
+# The number of seconds after which a file stops counting as slow, unless
+# it was linted slowly again since. Slow files are linted with a different
+# profile, so this is what gets them a new run to judge them by.
+SLOW_EXPIRY = 3600.0
+
+# The minimum number of seconds between writes of the history file
+SAVE_INTERVAL = 5.0
+
+# The assumed lint speed, in seconds per byte, until some files have been
+# linted
+DEFAULT_RATE = 1.0 / 50000
+
+
+def history_file(cache_dir):
+    """ Return the path of the history kept in the given cache directory """
+    return os.path.join(cache_dir, "history", "durations.json")
+
+
+def run_key(profile, profile_options):
+    """ Return the history key of runs with the given lint profile """
+    if not profile_options:
+        return FULL
+    return profile
+
+
+class DurationHistory(object):
+    """ The most recent lint durations of every file, stored in `path` """
+
+    def __init__(self, path, size=HISTORY_SIZE):
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        # normalized file name -> {"size": bytes, "runs": {key: [seconds]},
+        # "last": {key: time of the last run}},
+        # loaded on first use
+        self._files = None
+        # key -> seconds per byte, worked out on first use
+        self._rates = {}
+        self._dirty = False
+        self._saved = 0.0
+
+    @staticmethod
+    def _normalize(file_name):
+        return os.path.normcase(os.path.abspath(file_name))
+
+    def _load(self):
+        """ Read the stored history, called with the lock held """
+        if self._files is not None:
+            return
+        try:
+            with open(self.path) as stored:
+                self._files = json.load(stored)
+        except (IOError, OSError, ValueError):
+            self._files = {}
+
+    def record(self, file_name, key, seconds, size=None):
+        """ Add the duration of a run, and store the history if it hasn't
+        been stored for a while """
+        with self._lock:
+            self._load()
+            entry = self._files.setdefault(self._normalize(file_name),
+                                           {"size": 0, "runs": {}})
+            if size is not None:
+                entry["size"] = size
+            runs = entry["runs"].setdefault(key, [])
+            runs.append(round(seconds, 3))
+            del runs[:-self.size]
+            entry.setdefault("last", {})[key] = int(time.time())
+            self._rates.pop(key, None)
+            self._dirty = True
+            save = stats.clock() - self._saved >= SAVE_INTERVAL
+        if save:
+            self.save()
+
+    def expected(self, file_name, key):
+        """ Return the median duration of the recent runs of a file, or None
+        if it hasn't been linted before """
+        with self._lock:
+            self._load()
+            entry = self._files.get(self._normalize(file_name))
+            runs = entry and entry["runs"].get(key)
+        return stats.percentile(runs, 50) if runs else None
+
+    def _rate(self, key):
+        """ Return the median lint speed over all files, in seconds per
+        byte, called with the lock held """
+        rate = self._rates.get(key)
+        if rate is None:
+            rates = [stats.percentile(entry["runs"][key], 50) / entry["size"]
+                     for entry in self._files.values()
+                     if entry["size"] and entry["runs"].get(key)]
+            rate = stats.percentile(rates, 50) if rates else DEFAULT_RATE
+            self._rates[key] = rate
+        return rate
+
+    def estimate(self, file_name, key, size=None):
+        """ Return the expected duration of a run, estimated from the file's
+        size if it hasn't been linted before. The size is looked up if it's
+        not given. """
+        expected = self.expected(file_name, key)
+        if expected is not None:
+            return expected
+        if size is None:
+            try:
+                size = os.path.getsize(file_name)
+            except OSError:
+                size = 0
+        with self._lock:
+            self._load()
+            return size * self._rate(key)
+
+    def is_slow(self, file_name, key, threshold, min_runs=3,
+                max_age=SLOW_EXPIRY):
+        """ Return True if the recent runs of a file took longer than
+        `threshold` seconds, judging by at least `min_runs` runs of which the
+        last was at most `max_age` seconds ago """
+        with self._lock:
+            self._load()
+            entry = self._files.get(self._normalize(file_name))
+            runs = entry and entry["runs"].get(key)
+            last = entry and entry.get("last", {}).get(key, 0)
+        if not runs or len(runs) < min_runs:
+            return False
+        if time.time() - last > max_age:
+            return False
+        return stats.percentile(runs[-min_runs:], 50) > threshold
+
+    def save(self):
+        """ Store the history, if it has changed """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._files, separators=(",", ":"))
+            self._dirty = False
+            self._saved = stats.clock()
+
+        temp_path = "%s.%d.%d.tmp" % (self.path, os.getpid(), id(data))
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(temp_path, "w") as stored:
+                stored.write(data)
+            if os.name == "nt" and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+class ShardQueues(object):
+    """ Files to lint, split into shards and planned per job.
+
+    Files of similar expected durations are put in the same shards, and slow
+    files get shards of their own. The shards are spread over the jobs with
+    the longest first to the least loaded job, so the slow files are spread
+    evenly, and every job starts with its shortest shard, so the first
+    results come in quickly. A job that runs out of shards takes the longest
+    one left from the job with the most work left.
+    """
+
+    def __init__(self, history, file_names, key, jobs, shard_size,
+                 slow_threshold=0):
+        self._lock = threading.Lock()
+        estimates = dict((file_name, history.estimate(file_name, key))
+                         for file_name in file_names)
+
+        shards = []
+        shard = []
+        for file_name in sorted(file_names, key=lambda f: estimates[f]):
+            if slow_threshold and estimates[file_name] > slow_threshold:
+                shards.append([file_name])
+                continue
+            shard.append(file_name)
+            if len(shard) >= shard_size:
+                shards.append(shard)
+                shard = []
+        if shard:
+            shards.append(shard)
+
+        # [estimated seconds left, [(estimate, shard)]] per job
+        self._queues = [[0.0, []] for _ in range(max(1, jobs))]
+        shards = sorted(((sum(estimates[f] for f in s), s) for s in shards),
+                        reverse=True)
+        for planned in shards:
+            # The fewest shards between equally loaded jobs, which matters
+            # when nothing is known about the files
+            queue = min(self._queues, key=lambda q: (q[0], len(q[1])))
+            queue[0] += planned[0]
+            queue[1].append(planned)
+        for queue in self._queues:
+            # Longest last, so the shortest is popped first
+            queue[1].reverse()
+
+    def next_shard(self, job):
+        """ Return the next shard for the given job, or None if none are
+        left """
+        with self._lock:
+            queue = self._queues[job % len(self._queues)]
+            if queue[1]:
+                estimate, shard = queue[1].pop(0)
+            else:
+                # Estimates may be 0, so only queues with shards left count
+                queues = [q for q in self._queues if q[1]]
+                if not queues:
+                    return None
+                queue = max(queues, key=lambda q: q[0])
+                estimate, shard = queue[1].pop()
+            queue[0] -= estimate
+            return shard
+
+    def remaining(self):
+        """ Return the estimated seconds of work left, per job """
+        with self._lock:
+            return sum(q[0] for q in self._queues) / len(self._queues)
+
+    def clear(self):
+        with self._lock:
+            for queue in self._queues:
+                queue[0] = 0.0
+                queue[1] = []
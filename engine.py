@@ -0,0 +1,1203 @@
+# -*- coding: utf-8 -*-
+
+""" The PyLinter lint engine.
+
+Everything needed to lint files with Pylint outside of a view lives here:
+resolving the settings, finding Pylint, building its command line, running it
+in a long-lived worker or a one-shot process, parsing its messages and caching
+the results. The Sublime Text plugin (`pylinter.py`) and the command line
+entry point (`pylinter_cli.py`) both use it, so they come to the same results
+and share the same result cache.
+
+This module does not depend on Sublime Text.
+"""
+
+import os
+import sys
+import re
+import json
+import hashlib
+import threading
+import subprocess
+import fnmatch
+import collections
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+try:
+    from . import durations
+    from . import multiconf
+    from . import resultcache
+    from . import stats
+except (ImportError, ValueError):
+    # Not imported as part of the package, e.g. by Sublime Text 2 or the
+    # command line entry point
+    import durations
+    import multiconf
+    import resultcache
+    import stats
+
+# The version of Python that runs the engine
+PYTHON_VERSION = sys.version_info[0]
+
+# Whether `speak` logs anything, set from the 'verbose' setting
+VERBOSE = True
+
+# Prevent the console from popping up in Windows
+if os.name == "nt":
+    STARTUPINFO = subprocess.STARTUPINFO()
+    STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+else:
+    STARTUPINFO = None
+
+# The output format we want PyLint's error messages to be in
+PYLINT_FORMAT = '--msg-template={path}:{line}:{msg_id}:{msg}'
+# The first Pylint version whose JSON output includes the message ids; older
+# versions have their text output parsed with `P_PYLINT_ERROR`
+JSON_OUTPUT_VERSION = (1, 7, 0)
+PATH_SEPERATOR = ';' if os.name == "nt" else ':'
+
+# The following values are set by `set_pylint_command`
+PYLINT_VERSION = None
+# Regular expression to disect Pylint error messages
+P_PYLINT_ERROR = None
+# Either ["pylint"] or [<python_bin>, <path_to_lint.py>] if the former is not
+# found
+DEFAULT_PYLINT_COMMAND = None
+
+# python_bin -> its (major, minor) version, see `get_python_version`
+PYTHON_BIN_VERSIONS = {}
+
+# The script that is run by the long-lived Pylint worker processes
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "pylint_worker.py")
+
+
+class SettingsError(Exception):
+    pass
+
+
+class PylintWorkerException(Exception):
+    pass
+
+
+class PylintCancelled(Exception):
+    pass
+
+
+def speak(*msg):
+    """ Log messages to stderr (Sublime Text's console) if VERBOSE is True """
+    if VERBOSE:
+        sys.stderr.write(" - PyLinter: " + " ".join(msg) + "\n")
+
+def set_pylint_command(command, version):
+    """ Set the default Pylint command and the Pylint version, along with the
+    regular expression that matches the messages of that version """
+
+    global PYLINT_VERSION, P_PYLINT_ERROR, DEFAULT_PYLINT_COMMAND
+
+    DEFAULT_PYLINT_COMMAND = command
+    PYLINT_VERSION = version
+
+    # Pylint version < 1.0
+    if PYLINT_VERSION[0] == 0:
+        # Regular expression to disect Pylint error messages
+        P_PYLINT_ERROR = re.compile(r"""
+            ^(?P<file>.+?):(?P<line>[0-9]+):\ # file name and line number
+            \[(?P<type>[a-z])(?P<errno>\d+)   # message type and error number
+                                              # e.g. E0101
+            (,\ (?P<hint>.+))?\]\             # optional class or function name
+            (?P<msg>.*)                       # finally, the error message
+            """, re.IGNORECASE | re.VERBOSE)
+    # Pylint version 1.0 or greater
+    else:
+        P_PYLINT_ERROR = re.compile(r"""
+            ^(?P<file>.+?):(?P<line>[0-9]+): # file name and line number
+            (?P<type>[a-z])(?P<errno>\d+):   # message type and error number,
+                                             # e.g. E0101
+            (?P<msg>.*)                      # finally, the error message
+            """, re.IGNORECASE | re.VERBOSE)
+
+def find_executable(name):
+    """ Return the full path of an executable, searching PATH if needed """
+    if os.path.dirname(name):
+        return name if os.path.isfile(name) else None
+
+    extensions = [""]
+    if os.name == "nt":
+        extensions += os.environ.get("PATHEXT", ".EXE").lower().split(";")
+
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        for extension in extensions:
+            path = os.path.join(directory, name + extension)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+    return None
+
+def limit_process(command, memory_limit, background):
+    """ Return the command and the `preexec_fn` to start a Pylint process
+    with, so it can use at most `memory_limit` megabytes of address space and,
+    if it runs in the `background`, gets a lower CPU and I/O priority. The
+    limits are only applied on Linux. """
+    if not sys.platform.startswith("linux") or resource is None:
+        return command, None
+
+    if background:
+        ionice = find_executable("ionice")
+        if ionice:
+            # The idle I/O scheduling class
+            command = [ionice, "-c", "3"] + command
+    if not memory_limit and not background:
+        return command, None
+
+    def preexec():
+        """ Runs in the child process, before Pylint is started """
+        if memory_limit:
+            limit = memory_limit * 1024 * 1024
+            hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+            if hard != resource.RLIM_INFINITY:
+                limit = min(limit, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+        if background:
+            os.nice(10)
+
+    return command, preexec
+
+
+def parse_line(line):
+    """ Return the Pylint message on the given output line, in the form
+    returned by `parse_record`, or None """
+    mdic = P_PYLINT_ERROR.match(line)
+    if mdic is None:
+        return None
+    m = mdic.groupdict()
+    return (m['file'], int(m['line']) - 1, m['type'], m['errno'],
+            m['msg'].strip(), 0, -1, -1, None)
+
+def parse_record(record):
+    """ Return the (file name, line number, type, error number, message,
+    column, end line number, end column, symbol) of a message in Pylint's JSON
+    format. Line numbers are zero based, missing end positions are -1. """
+    msg_id = record["message-id"]
+    end_line = record.get("endLine")
+    end_column = record.get("endColumn")
+    return (record["path"], record["line"] - 1, msg_id[0], msg_id[1:],
+            record["message"].strip(), record.get("column") or 0,
+            -1 if end_line is None else end_line - 1,
+            -1 if end_column is None else end_column,
+            record.get("symbol"))
+
+def find_python_files(folders, exclude):
+    """ Yield the Python files in the given folders, skipping the files and
+    directories that match any of the `exclude` glob patterns """
+    def excluded(name, rel_path):
+        return any(fnmatch.fnmatch(name, pattern) or
+                   fnmatch.fnmatch(rel_path, pattern)
+                   for pattern in exclude)
+
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            rel_root = os.path.relpath(root, folder)
+            dirs[:] = [d for d in dirs
+                       if not excluded(d, os.path.join(rel_root, d))]
+            for name in files:
+                if (name.endswith('.py') and
+                        not excluded(name, os.path.join(rel_root, name))):
+                    yield os.path.normpath(os.path.join(root, name))
+
+def find_pylint_command(python_bin, pylint_path, on_error=None):
+    """ Return the command that runs Pylint. This is the `pylint` command if
+    it is available, otherwise the path to the `lint.py` file is determined
+    and run with `python_bin`. `on_error` is called with a description of
+    the problem if neither can be found.
+
+    This runs Pylint, so it's slow, see `probe_pylint`.
+    """
+    on_error = on_error or speak
+
+    if pylint_path is not None:
+        return [python_bin, pylint_path]
+
+    # Look for the executable instead of starting it
+    if find_executable("pylint"):
+        speak("Pylint executable found")
+        return ["pylint"]
+
+    speak("Pylint executable *not* found")
+    speak("Seaching for lint.py module...")
+
+    cmd = ["python", "-c"]
+
+    if PYTHON_VERSION == 2:
+        cmd.append("import pylint; print pylint.__path__[0]")
+    else:
+        cmd.append("import pylint; print(pylint.__path__[0])")
+
+    proc = subprocess.Popen(cmd,
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            startupinfo=STARTUPINFO)
+
+    out, _ = proc.communicate()
+
+    pylint_path = None
+    if out != b"":
+        pylint_path = os.path.join(out.strip(),
+                                   b"lint.py").decode("utf-8")
+
+    if not pylint_path:
+        msg = ("Pylinter could not automatically determined the path to `lint.py`.\n\n"
+               "Please provide one in the settings file using the `pylint_path` variable.\n\n"
+               "NOTE:\nIf you are using a Virtualenv, the problem might be resolved by "
+               "launching Sublime Text from correct Virtualenv.")
+        on_error(msg)
+    elif not os.path.exists(pylint_path):
+        msg = ("Pylinter could not find `lint.py` at the given path:\n\n'{0}'.".format(pylint_path))
+        on_error(msg)
+    else:
+        speak("Pylint path {0} found".format(pylint_path))
+        return [python_bin, pylint_path]
+
+def get_pylint_version(python_bin, pylint_path, default_command,
+                       on_error=None):
+    """ Return the Pylint version as a (x, y, z) tuple """
+    found = None
+
+    regex = re.compile(b"[lint.py|pylint] ([0-9]+).([0-9]+).([0-9]+)")
+
+    if pylint_path:
+        command = [python_bin, pylint_path]
+    else:
+        command = list(default_command or ["pylint"])
+
+    command.append("--version")
+
+    try:
+        p = subprocess.Popen(command,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE,
+                         startupinfo=STARTUPINFO)
+        output, _ = p.communicate()
+        found = regex.search(output)
+    except OSError:
+        msg = "Pylinter could not find '%s'" % command[-2]
+        (on_error or speak)(msg)
+
+    if found:
+        found = found.groups()
+        if len(found) == 3:
+            version = tuple(int(v) for v in found)
+            speak("Pylint version %s found" % str(version))
+            return version
+
+    speak("Could not determine Pylint version")
+    return (1, 0, 0)
+
+def get_python_version(python_bin):
+    """ Return the (major, minor) version of the given Python, or None if it
+    can't be run. Every Python is only run once. """
+    if python_bin not in PYTHON_BIN_VERSIONS:
+        version = None
+        try:
+            p = subprocess.Popen(
+                [python_bin, "-c",
+                 "import sys; print('%d.%d' % sys.version_info[:2])"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                startupinfo=STARTUPINFO)
+            output, _ = p.communicate()
+            version = tuple(int(v) for v in
+                            output.decode("ascii").strip().split("."))
+        except (OSError, ValueError):
+            speak("Could not determine the version of %s" % python_bin)
+        PYTHON_BIN_VERSIONS[python_bin] = version
+    return PYTHON_BIN_VERSIONS[python_bin]
+
+def _probe_file(cache_dir):
+    return os.path.join(cache_dir, "probe", "pylint.json")
+
+def _probe_key(python_bin, pylint_path):
+    """ Return the key of the stored probe outcome for the given settings.
+    It includes the paths and modification times of the Python interpreter,
+    the `pylint` executable and `lint.py`, so a new outcome is needed once
+    one of those changes. """
+    key = [python_bin, pylint_path]
+    for name in (python_bin, "pylint", pylint_path):
+        path = find_executable(name) if name else None
+        if path:
+            path = os.path.realpath(path)
+            key.extend([path, os.path.getmtime(path)])
+        else:
+            key.extend([None, None])
+    return json.dumps(key)
+
+def load_probe(cache_dir, python_bin, pylint_path):
+    """ Return the stored (command, version) outcome of an earlier
+    `probe_pylint`, or None """
+    try:
+        with open(_probe_file(cache_dir)) as stored:
+            outcome = json.load(stored).get(_probe_key(python_bin,
+                                                       pylint_path))
+    except (IOError, OSError, ValueError):
+        outcome = None
+
+    if not outcome:
+        return None
+    return outcome["command"], tuple(outcome["version"])
+
+def probe_pylint(cache_dir, python_bin, pylint_path, on_error=None):
+    """ Determine the default Pylint command and the Pylint version, and
+    store the outcome for `load_probe`. Returns (command, version). """
+    command = find_pylint_command(python_bin, pylint_path, on_error)
+    version = get_pylint_version(python_bin, pylint_path, command, on_error)
+    if not command:
+        return command, version
+
+    store = _probe_file(cache_dir)
+    try:
+        with open(store) as stored:
+            outcomes = json.load(stored)
+    except (IOError, OSError, ValueError):
+        outcomes = {}
+
+    outcomes[_probe_key(python_bin, pylint_path)] = {
+        "command": command, "version": list(version)}
+    try:
+        if not os.path.isdir(os.path.dirname(store)):
+            os.makedirs(os.path.dirname(store))
+        with open(store, "w") as stored:
+            json.dump(outcomes, stored)
+    except (IOError, OSError) as exc:
+        speak("Could not store Pylint probe: %s" % exc)
+    return command, version
+
+def resolve_setting(project_settings, plugin_settings, setting_name, default):
+    """ Return a setting from the project's 'pylinter' settings, falling back
+    to the plugin settings, with multiconf qualifiers resolved """
+    settings_obj = plugin_settings
+    if project_settings and setting_name in project_settings:
+        settings_obj = project_settings
+    return multiconf.get(settings_obj, setting_name, default)
+
+def read_settings(get_or):
+    """ Return the settings of a lint run, given a function that returns a
+    setting or the default passed to it, i.e. `get_or(setting_name,
+    default)`. Raises SettingsError if the settings can't be used. """
+    python_bin = get_or('python_bin', 'python')
+    python_path = get_or('python_path', [])
+    python_path = PATH_SEPERATOR.join([str(p) for p in python_path])
+    working_dir = get_or('working_dir', None)
+    pylint_path = get_or('pylint_path', None)
+    pylint_rc = get_or('pylint_rc', None) or ""
+    ignore = [t.lower() for t in get_or('ignore', [])]
+    plugins = get_or('plugins', None)
+
+    # Add custom runtime settings
+    pylint_extra = get_or('pylint_extra', None)
+
+    disable = list(get_or('disable', []))
+    # Added ignore for trailing whitespace (false positives bug in
+    # pylint 1.0.0)
+    if PYLINT_VERSION[0] != 0:
+        disable.append('C0303')
+    disable_msgs = ",".join(disable)
+
+    if pylint_rc and not os.path.exists(pylint_rc):
+        raise SettingsError("Pylint configuration not found at '%s'." %
+                            pylint_rc)
+
+    return (python_bin,
+            python_path,
+            working_dir,
+            pylint_path,
+            pylint_rc,
+            ignore,
+            disable_msgs,
+            pylint_extra,
+            plugins)
+
+def runner_options(get_or):
+    """ Return the keyword arguments for a `LintRunner`, other than the
+    cache, given a `get_or` function as taken by `read_settings` """
+    return {"use_worker": get_or('use_worker', True),
+            "worker_max_memory": get_or('worker_max_memory', 1024),
+            "lint_timeout": get_or('lint_timeout', 60),
+            "memory_limit": get_or('memory_limit', 4096),
+            "lower_background_priority": get_or('lower_background_priority',
+                                                True)}
+
+
+class ExecEnvironment(object):
+    """ The environment Pylint runs in for a project configuration.
+
+    An environment is built once per combination of Python interpreter,
+    `python_path` and working directory, and kept until the settings change.
+    It is never modified once it has been built, so concurrent runs can share
+    it. It is handed to the Pylint processes and workers as their `env`,
+    `os.environ` itself is left alone.
+    """
+    _lock = threading.Lock()
+    # (python_bin, python_path, working_dir) -> ExecEnvironment
+    _cache = {}
+
+    def __init__(self, python_bin, python_path, working_dir):
+        self.key = (python_bin, python_path, working_dir)
+        self.python_bin = python_bin
+        self.working_dir = working_dir
+        # The full path of the interpreter, which tells apart interpreters
+        # found on PATH by the same name
+        executable = find_executable(python_bin)
+        self.executable = os.path.abspath(executable) if executable else None
+
+        env = dict(os.environ)
+        paths = []
+        for path in (env.get('PYTHONPATH', '').split(os.pathsep) +
+                     python_path.split(PATH_SEPERATOR)):
+            if path and path not in paths:
+                paths.append(path)
+        if paths:
+            env['PYTHONPATH'] = self._env_value(os.pathsep.join(paths))
+
+        self.virtualenv = self.find_virtualenv(python_bin)
+        if self.virtualenv:
+            # What activating the virtualenv would do
+            bin_dir = os.path.dirname(find_executable(python_bin))
+            env['VIRTUAL_ENV'] = self._env_value(self.virtualenv)
+            env['PATH'] = self._env_value(
+                os.pathsep.join([bin_dir, env.get('PATH', '')]))
+            env.pop('PYTHONHOME', None)
+
+        self.env = env
+
+    @staticmethod
+    def _env_value(value):
+        """ Environment values have to be byte strings on Python 2 """
+        if PYTHON_VERSION == 2 and not isinstance(value, str):
+            return value.encode(sys.getfilesystemencoding() or 'utf-8')
+        return value
+
+    @staticmethod
+    def find_virtualenv(python_bin):
+        """ Return the root of the virtualenv the interpreter belongs to, or
+        None """
+        executable = find_executable(python_bin)
+        if executable is None:
+            return None
+        bin_dir = os.path.dirname(os.path.abspath(executable))
+        root = os.path.dirname(bin_dir)
+        if (os.path.isfile(os.path.join(root, 'pyvenv.cfg')) or
+                os.path.isfile(os.path.join(bin_dir, 'activate_this.py'))):
+            return root
+        return None
+
+    @classmethod
+    def get(cls, python_bin, python_path, working_dir):
+        """ Return the environment for the given configuration """
+        key = (python_bin, python_path, working_dir)
+        with cls._lock:
+            environment = cls._cache.get(key)
+            if environment is None:
+                environment = cls(python_bin, python_path, working_dir)
+                cls._cache[key] = environment
+                speak("PYTHONPATH for %s is '%s'" % (
+                    python_bin, environment.env.get('PYTHONPATH', '')))
+        return environment
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._cache = {}
+
+
+class PylintWorker(object):
+    """ A long-lived process that runs Pylint jobs in-process.
+
+    Starting a new Pylint process for every lint means paying for interpreter
+    startup, importing Pylint and rebuilding astroid's module cache each time.
+    A worker does all of that once and keeps its cache warm between jobs. See
+    `pylint_worker.py` for the other end of the pipe.
+    """
+
+    def __init__(self, key, environment, pylint_path, memory_limit=0,
+                 background=False):
+        self.key = key
+        self.job_id = 0
+        # Jobs are sent by the lint thread, cancellations by any thread
+        self._write_lock = threading.Lock()
+        # Set if the last job was cancelled before it was done
+        self.cancelled = False
+        self.rss = 0
+        self.peak_size = 0
+        # The checker timings of the last job, if it was profiled
+        self.profile = None
+        # The time spent decoding, and the size of, the last job's output
+        self.decode_time = 0.0
+        self.received_bytes = 0
+
+        command = [environment.python_bin, WORKER_SCRIPT, pylint_path or ""]
+        command, preexec = limit_process(command, memory_limit, background)
+        speak("Starting Pylint worker:", " ".join(command))
+
+        self.devnull = open(os.devnull, "w")
+        self.proc = subprocess.Popen(command,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=self.devnull,
+                                     startupinfo=STARTUPINFO,
+                                     env=environment.env,
+                                     preexec_fn=preexec)
+
+        handshake = self._receive()
+        if not handshake.get("ready"):
+            self.close()
+            raise PylintWorkerException(handshake.get("error",
+                                                      "Unknown worker error"))
+
+    def _receive(self):
+        """ Read a single protocol message from the worker """
+        line = self.proc.stdout.readline()
+        if not line:
+            raise PylintWorkerException("Pylint worker exited unexpectedly")
+        started = stats.clock()
+        self.received_bytes += len(line)
+        if PYTHON_VERSION != 2:
+            line = line.decode("utf-8")
+        message = json.loads(line)
+        self.decode_time += stats.clock() - started
+        return message
+
+    def is_alive(self):
+        return self.proc.poll() is None
+
+    def lint(self, args, files, cwd, stdin, on_line, on_record=None,
+             profile=None):
+        """ Run a lint job, passing every line Pylint writes to stdout to
+        `on_line` as soon as it has been written. If `on_record` is given,
+        Pylint's messages are passed to it as records in Pylint's JSON format
+        instead. Return Pylint's stderr output.
+
+        `profile` is "checkers" or "cprofile" to have the checkers timed, see
+        `pylint_worker.py`; the timings are kept in `profile` afterwards. """
+        self.job_id += 1
+        self.decode_time = 0.0
+        self.received_bytes = 0
+        job = json.dumps({"id": self.job_id,
+                          "args": args,
+                          "files": files,
+                          "cwd": cwd,
+                          "stdin": stdin,
+                          "structured": on_record is not None,
+                          "profile": profile}) + "\n"
+
+        try:
+            with self._write_lock:
+                self.proc.stdin.write(job.encode("utf-8"))
+                self.proc.stdin.flush()
+            while True:
+                result = self._receive()
+                if "out" in result:
+                    on_line(result["out"])
+                elif "msg" in result:
+                    on_record(result["msg"])
+                else:
+                    break
+        except (IOError, OSError, ValueError):
+            raise PylintWorkerException("Lost connection to Pylint worker")
+
+        self.rss = result.get("rss", 0)
+        self.peak_size = result.get("peak", 0)
+        self.profile = result.get("profile")
+        self.cancelled = result.get("cancelled", False)
+        return result["err"]
+
+    def cancel(self):
+        """ Have the worker stop the job it's running. `lint` returns as soon
+        as it has, and the worker can take the next job. """
+        request = json.dumps({"cancel": self.job_id}) + "\n"
+        with self._write_lock:
+            try:
+                self.proc.stdin.write(request.encode("utf-8"))
+                self.proc.stdin.flush()
+            except (IOError, OSError, ValueError):
+                pass
+
+    def close(self):
+        """ Stop the worker process """
+        try:
+            self.proc.stdin.close()
+            self.proc.terminate()
+            self.proc.wait()
+        except (IOError, OSError):
+            pass
+        self.devnull.close()
+
+
+class WorkerPool(object):
+    """ Keep idle Pylint workers around, one pool per configuration """
+    _lock = threading.Lock()
+    _idle = {}
+    # Configurations for which a worker could not be started; these will use
+    # the one-shot Pylint process instead
+    _broken = set()
+
+    @classmethod
+    def acquire(cls, environment, pylint_path, memory_limit=0,
+                background=False):
+        """ Return an idle or newly started worker, or None if no worker can
+        be started for the given configuration. Runs in the `background` get
+        workers of their own, see `limit_process`. """
+        key = environment.key + (pylint_path, memory_limit, background)
+
+        with cls._lock:
+            if key in cls._broken:
+                return None
+            idle = cls._idle.get(key, [])
+            while idle:
+                worker = idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.close()
+
+        try:
+            return PylintWorker(key, environment, pylint_path, memory_limit,
+                                background)
+        except (PylintWorkerException, OSError) as exc:
+            speak("Pylint worker unavailable, falling back:", str(exc))
+            with cls._lock:
+                cls._broken.add(key)
+            return None
+
+    @classmethod
+    def release(cls, worker, max_memory):
+        """ Hand a worker back to the pool, or retire it when it has died or
+        grown beyond `max_memory` megabytes """
+        if not worker.is_alive():
+            worker.close()
+        elif max_memory and worker.rss > max_memory * 1024:
+            speak("Restarting Pylint worker using %d MB" %
+                  (worker.rss // 1024))
+            worker.close()
+        else:
+            with cls._lock:
+                cls._idle.setdefault(worker.key, []).append(worker)
+
+    @classmethod
+    def trim(cls, keep):
+        """ Stop the idle workers beyond `keep` per configuration, the ones
+        that have been idle the longest first """
+        surplus = []
+        with cls._lock:
+            for workers in cls._idle.values():
+                if len(workers) > keep:
+                    surplus.extend(workers[:len(workers) - keep])
+                    del workers[:len(workers) - keep]
+        if surplus:
+            speak("Stopping %d idle Pylint workers" % len(surplus))
+        for worker in surplus:
+            worker.close()
+
+    @classmethod
+    def shutdown(cls):
+        """ Stop all idle workers """
+        with cls._lock:
+            for workers in cls._idle.values():
+                for worker in workers:
+                    worker.close()
+            cls._idle = {}
+            cls._broken = set()
+
+
+class LintRunner(object):
+    """ Runs Pylint with the settings returned by `read_settings`.
+
+    `cache` is the result cache to use, if any, and `history` the
+    `durations.DurationHistory` to record how long Pylint took in; the other
+    keyword arguments are the values of the settings with the same names.
+    """
+
+    def __init__(self, pbin, ppath, cwd, lpath, lrc, ignore, disable_msgs,
+                 extra_pylint_args, plugins, cache=None, history=None,
+                 use_worker=True,
+                 worker_max_memory=1024, lint_timeout=60, memory_limit=4096,
+                 lower_background_priority=True):
+        # Set when the run has completed, was cancelled or was superseded
+        # before it got started
+        self.finished = threading.Event()
+        # Set when the run was stopped, by `cancel` or by hitting a limit
+        self.cancelled = False
+        # Set when the run was cancelled, as opposed to stopped by a limit
+        self.cancel_requested = False
+        # The Pylint process or worker doing the work for this run
+        self.proc = None
+        self.worker = None
+        self.python_bin = pbin
+        self.python_path = ppath
+        self.working_dir = cwd
+        self.environment = ExecEnvironment.get(pbin, ppath, cwd)
+        self.pylint_path = lpath
+        self.pylint_rc = lrc
+        self.ignore = ignore
+        self.disable_msgs = disable_msgs
+        self.extra_pylint_args = extra_pylint_args
+        self.plugins = plugins
+        # The name and options of the lint profile, see the 'profiles'
+        # setting
+        self.profile = None
+        self.profile_options = {}
+        # Set to "checkers" or "cprofile" to have the checkers timed, which
+        # needs a worker; the timings end up in `checker_profile`
+        self.profile_checkers = None
+        self.checker_profile = None
+        self.use_worker = use_worker
+        self.worker_max_memory = worker_max_memory
+        self.timeout = lint_timeout
+        self.memory_limit = memory_limit
+        self.lower_priority = lower_background_priority
+        # "timeout" or "memory" if the run hit one of the limits above
+        self.limit_hit = None
+        self.cache = cache
+        self.history = history
+        # Have Pylint report its messages as JSON instead of text
+        self.structured = PYLINT_VERSION >= JSON_OUTPUT_VERSION
+        self.stats = stats.RunStats()
+
+    def cancel(self):
+        """ Stop the run for good, see `stop` """
+        self.cancel_requested = True
+        self.stop()
+
+    def stop(self):
+        """ Stop the Pylint run in progress. A one-shot Pylint process is
+        killed, a worker is only asked to stop the job, so it stays warm for
+        the next run, unless the run hit one of its limits. """
+        self.cancelled = True
+        proc, worker = self.proc, self.worker
+        if proc is not None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        if worker is not None:
+            if self.limit_hit:
+                worker.close()
+            else:
+                worker.cancel()
+
+    def expire(self):
+        """ Stop a run that is taking longer than the `lint_timeout` """
+        if not self.finished.is_set():
+            self.limit_hit = "timeout"
+            self.stop()
+
+    def in_background(self):
+        """ Return True if Pylint should run at a lower CPU and I/O
+        priority """
+        return False
+
+    def describe_limit(self):
+        """ Return a description of the limit the run hit """
+        if self.limit_hit == "timeout":
+            return ("Pylint was stopped after %s seconds, the results are "
+                    "incomplete" % self.timeout)
+        return ("Pylint ran out of memory (%s MB), the results may be "
+                "incomplete" % self.memory_limit)
+
+    def check_memory_error(self, errors):
+        """ Note whether Pylint ran out of memory, given its stderr output or
+        messages """
+        if self.memory_limit and "MemoryError" in errors:
+            self.limit_hit = "memory"
+
+    def duration_key(self):
+        """ Return the key under which the durations of this kind of run
+        are recorded """
+        return durations.run_key(self.profile, self.profile_options)
+
+    def duration_mark(self):
+        """ Return the moment a run starts, for `record_duration` """
+        return stats.clock(), self.stats.phases.get("spawn", 0.0)
+
+    def record_duration(self, file_names, mark, content=None):
+        """ Record how long Pylint took to lint the given files since the
+        `duration_mark`, dividing the time between them by their sizes.
+        Starting Pylint or a worker doesn't count, it has nothing to do with
+        the files. """
+        if self.history is None:
+            return
+        seconds = (stats.clock() - mark[0] -
+                   (self.stats.phases.get("spawn", 0.0) - mark[1]))
+        if content is not None:
+            sizes = [len(content)]
+        else:
+            sizes = []
+            for file_name in file_names:
+                try:
+                    sizes.append(os.path.getsize(file_name))
+                except OSError:
+                    sizes.append(0)
+        total = float(sum(sizes))
+        key = self.duration_key()
+        for file_name, size in zip(file_names, sizes):
+            share = size / total if total else 1.0 / len(file_names)
+            self.history.record(file_name, key, seconds * share, size)
+
+    def get_options(self):
+        """ Return the Pylint command line options for this run """
+        if PYLINT_VERSION[0] == 0:
+            options = ['--output-format=parseable',
+                       '--include-ids=y']
+        else:
+            options = ['--reports=n']
+            if not self.structured:
+                options.append(PYLINT_FORMAT)
+
+            if self.plugins:
+                options.extend(["--load-plugins",
+                                ",".join(self.plugins)])
+
+        if self.pylint_rc:
+            options.append('--rcfile=%s' % self.pylint_rc)
+
+        # Enabling only some checkers must come before the messages that are
+        # disabled on top of those
+        enable = self.profile_options.get('enable')
+        if enable:
+            options.extend(['--disable=all', '--enable=%s' % ','.join(enable)])
+        disable = self.profile_options.get('disable')
+        if disable:
+            options.append('--disable=%s' % ','.join(disable))
+
+        if self.disable_msgs:
+            options.append('--disable=%s' % self.disable_msgs)
+
+        return options
+
+    def get_cache_key(self, file_name, content, options):
+        """ Return the result cache key for linting `file_name`, or None if
+        the results should not be cached. `content` holds the unsaved buffer
+        contents, if those are being linted instead of the file on disk. """
+        if self.cache is None:
+            return None
+
+        try:
+            if content is not None:
+                content = content.encode("utf-8")
+            else:
+                with open(file_name, "rb") as source:
+                    content = source.read()
+            rc_digest = None
+            if self.pylint_rc:
+                with open(self.pylint_rc, "rb") as rcfile:
+                    rc_digest = hashlib.sha1(rcfile.read()).hexdigest()
+        except (IOError, OSError):
+            return None
+
+        if self.pylint_path:
+            command = [self.python_bin, self.pylint_path]
+        else:
+            command = DEFAULT_PYLINT_COMMAND
+
+        return resultcache.make_key(content, {
+            "file": file_name,
+            "pylint": list(PYLINT_VERSION),
+            "command": command,
+            # Pylint runs in the interpreter's environment even when it's
+            # started by the `pylint` command
+            "python": self.environment.executable or self.python_bin,
+            "options": options,
+            "rc": rc_digest,
+            "python_path": self.python_path,
+            "working_dir": self.working_dir,
+            "extra": self.extra_pylint_args})
+
+    @staticmethod
+    def get_fatal_error(errlines):
+        """ Return the error Pylint reported on stderr, if any """
+        if len(errlines) > 1:
+            err = errlines[-2]
+            if not err.startswith("No config file found"):
+                return err
+        return None
+
+    def run_worker(self, options, targets, stdin, on_message):
+        """ Lint the file using a long-lived Pylint worker, passing Pylint's
+        messages to `on_message` one by one, as returned by `parse_record`.
+        Return Pylint's stderr output.
+
+        Returns None if no worker could do the job, in which case the caller
+        should fall back to a one-shot Pylint process.
+        """
+        received = [0]
+        run_stats = self.stats
+
+        def on_line(line):
+            if self.cancelled:
+                return
+            started = stats.clock()
+            message = parse_line(line)
+            if message is not None:
+                received[0] += 1
+                on_message(message)
+            run_stats.add("parse", stats.clock() - started)
+
+        def on_record(record):
+            if self.cancelled:
+                return
+            started = stats.clock()
+            received[0] += 1
+            on_message(parse_record(record))
+            run_stats.add("parse", stats.clock() - started)
+
+        # A worker that died since its last job is only noticed once we try
+        # to use it, so give a fresh worker a second chance
+        for _ in range(2):
+            started = stats.clock()
+            worker = WorkerPool.acquire(self.environment, self.pylint_path,
+                                        self.memory_limit,
+                                        self.in_background())
+            run_stats.add("spawn", stats.clock() - started)
+            if worker is None:
+                return None
+
+            if self.cancelled:
+                WorkerPool.release(worker, self.worker_max_memory)
+                raise PylintCancelled()
+
+            speak("Linting in worker:", " ".join(targets))
+            self.worker = worker
+            parsing = run_stats.phases.get("parse", 0.0)
+            started = stats.clock()
+            try:
+                result = worker.lint(options, targets, self.working_dir,
+                                     stdin, on_line,
+                                     on_record if self.structured else None,
+                                     self.profile_checkers)
+            except PylintWorkerException as exc:
+                worker.close()
+                if self.cancelled:
+                    raise PylintCancelled()
+                speak(str(exc))
+                if received[0]:
+                    # Retrying would report the same messages twice, keep
+                    # the partial results instead
+                    return "%s\n" % exc
+                continue
+            finally:
+                self.worker = None
+                run_stats.add("decode", worker.decode_time)
+                run_stats.add("pylint", stats.clock() - started -
+                              worker.decode_time -
+                              (run_stats.phases.get("parse", 0.0) - parsing))
+                run_stats.bytes += worker.received_bytes
+
+            if self.cancelled:
+                # The worker has stopped the job, and can take the next one
+                WorkerPool.release(worker, self.worker_max_memory)
+                raise PylintCancelled()
+
+            run_stats.mode = "worker"
+            self.checker_profile = worker.profile
+            self.check_memory_error(result)
+            # Pylint reports most failed allocations as parse errors or
+            # crashes, so also look at how close the worker got to the limit
+            if (self.memory_limit and
+                    worker.peak_size >= self.memory_limit * 1024 * 0.9):
+                self.limit_hit = "memory"
+            if self.limit_hit == "memory":
+                # Don't trust a worker that may be left in a broken state
+                worker.close()
+            else:
+                WorkerPool.release(worker, self.worker_max_memory)
+            return result
+
+        return None
+
+    def run_process(self, options, targets, stdin, on_message):
+        """ Lint the file using a one-shot Pylint process, passing Pylint's
+        messages to `on_message` one by one, as returned by `parse_record`.
+        Return Pylint's stderr output.
+
+        Text output is parsed line by line while Pylint is running, JSON
+        output is only written once Pylint is done and decoded in one go.
+        """
+        if self.pylint_path:
+            command = [self.python_bin, self.pylint_path]
+        else:
+            command = list(DEFAULT_PYLINT_COMMAND)
+
+        command.extend(options)
+        if self.structured:
+            command.append('--output-format=json')
+        command.extend(targets)
+        command, preexec = limit_process(command, self.memory_limit,
+                                         self.in_background())
+
+        speak(" ".join(command))
+
+        run_stats = self.stats
+        run_stats.mode = "process"
+        started = stats.clock()
+        p = subprocess.Popen(command,
+                             stdin=subprocess.PIPE if stdin is not None
+                             else None,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             startupinfo=STARTUPINFO,
+                             cwd=self.working_dir,
+                             env=self.environment.env,
+                             preexec_fn=preexec)
+        self.proc = p
+        if self.cancelled:
+            p.kill()
+        run_stats.add("spawn", stats.clock() - started)
+        started = stats.clock()
+        # Time spent on our side while Pylint was running
+        overlap = 0.0
+
+        # Only the tail of stderr is of interest, see `get_fatal_error`
+        elines = collections.deque(maxlen=20)
+
+        def feed_and_drain():
+            """ Write stdin and read stderr without blocking stdout """
+            try:
+                if stdin is not None:
+                    p.stdin.write(stdin.encode("utf-8"))
+                    p.stdin.close()
+                for line in iter(p.stderr.readline, b""):
+                    elines.append(line)
+            except (IOError, OSError):
+                pass
+
+        helper = threading.Thread(target=feed_and_drain)
+        helper.start()
+        if self.structured:
+            output = p.stdout.read()
+        else:
+            for line in iter(p.stdout.readline, b""):
+                line_started = stats.clock()
+                run_stats.bytes += len(line)
+                line = line.decode("utf-8", "replace").rstrip("\r\n")
+                decoded = stats.clock()
+                message = parse_line(line)
+                if message is not None:
+                    on_message(message)
+                done = stats.clock()
+                run_stats.add("decode", decoded - line_started)
+                run_stats.add("parse", done - decoded)
+                overlap += done - line_started
+        helper.join()
+        p.wait()
+        run_stats.add("pylint", stats.clock() - started - overlap)
+
+        if self.cancelled:
+            raise PylintCancelled()
+
+        if self.structured:
+            started = stats.clock()
+            run_stats.bytes += len(output)
+            try:
+                output = output.decode("utf-8", "replace")
+                records = json.loads(output) if output.strip() else []
+            except ValueError:
+                speak("Could not decode Pylint's output")
+                records = []
+            decoded = stats.clock()
+            for record in records:
+                on_message(parse_record(record))
+            run_stats.add("decode", decoded - started)
+            run_stats.add("parse", stats.clock() - decoded)
+
+        return b"".join(elines).decode("utf-8", "replace")
+
+    def lint_files(self, file_names, options):
+        """ Lint a list of files, using the result cache where possible.
+        Return (results, error): a dictionary of file name -> messages and
+        the error Pylint failed with, if any. Return None if the run was
+        cancelled. The file names should be absolute and normalized.
+
+        Pylint is stopped if it takes longer than the `lint_timeout` for the
+        files, in which case their results are incomplete and the error says
+        so. The runner can lint the next files after that. """
+        results = {}
+        keys = {}
+        for file_name in file_names:
+            keys[file_name] = self.get_cache_key(file_name, None, options)
+            if keys[file_name]:
+                cached = self.cache.get(keys[file_name])
+                if cached is not None:
+                    results[file_name] = cached["messages"]
+
+        targets = [f for f in file_names if f not in results]
+        if not targets:
+            return results, None
+
+        # normalized file name -> messages
+        found = {}
+        base_dir = self.working_dir or os.getcwd()
+
+        def on_message(message):
+            path = os.path.normcase(os.path.normpath(
+                os.path.join(base_dir, message[0])))
+            found.setdefault(path, []).append(message[1:])
+
+        # Set once the files are done, after which the watchdog must not
+        # stop the runner anymore
+        done = [False]
+        done_lock = threading.Lock()
+
+        def expire():
+            with done_lock:
+                if not done[0]:
+                    self.expire()
+
+        watchdog = None
+        if self.timeout:
+            watchdog = threading.Timer(self.timeout, expire)
+            watchdog.start()
+
+        mark = self.duration_mark()
+        failed = None
+        try:
+            eoutput = None
+            if self.use_worker:
+                eoutput = self.run_worker(options, targets, None, on_message)
+            if eoutput is None:
+                eoutput = self.run_process(options, targets, None,
+                                           on_message)
+        except PylintCancelled:
+            if self.limit_hit != "timeout":
+                return None
+            failed = self.describe_limit()
+            # Get ready for the next files, unless the runner was cancelled
+            # in the meantime
+            self.limit_hit = None
+            self.cancelled = False
+            if self.cancel_requested:
+                self.cancelled = True
+                return None
+        finally:
+            with done_lock:
+                done[0] = True
+            if watchdog is not None:
+                watchdog.cancel()
+        # Files that timed out took at least this long
+        self.record_duration(targets, mark)
+
+        if not failed:
+            elines = eoutput.split('\n')  # pylint: disable=E1103
+            failed = self.get_fatal_error(elines)
+        if failed:
+            speak("Pylint failed on files starting with %s: %s" % (
+                targets[0], failed))
+
+        for file_name in targets:
+            results[file_name] = found.get(os.path.normcase(file_name), [])
+            if keys[file_name] and not failed:
+                self.cache.put(keys[file_name],
+                               {"messages": results[file_name]})
+
+        return results, failed
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+""" The import graph of the modules being edited.
+
+An `ImportGraph` knows which local modules every module imports, so it can
+tell which modules are affected by a change to another one. Imports are found
+by parsing the module source with `ast`; they are resolved to files using the
+module's own directory, the root of its package and a list of extra search
+directories, such as the project folders. Modules that can't be found there,
+the standard library and installed packages for instance, are left out.
+
+The graph is maintained incrementally: a module is only parsed again once its
+file has changed.
+
+This module does not depend on Sublime Text.
+"""
+
+import os
+import ast
+import threading
+
+
+def file_stamp(path):
+    """ Return a value that changes whenever the given file changes """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def find_imports(source):
+    """ Return the (module name, imported names, level) of every import
+    statement in the source. `imported names` is empty for plain imports, the
+    level is the number of leading dots of a relative import. """
+    tree = ast.parse(source)
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, (), 0))
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module or "",
+                            tuple(alias.name for alias in node.names),
+                            node.level or 0))
+    return imports
+
+
+def package_root(path):
+    """ Return the directory from which the module at `path` is imported,
+    i.e. the parent of its outermost package """
+    directory = os.path.dirname(path)
+    while os.path.isfile(os.path.join(directory, "__init__.py")):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return directory
+
+
+class ImportGraph(object):
+    """ The local imports of a set of modules """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # path -> (stamp, set of imported paths)
+        self._modules = {}
+        # path -> set of paths of the modules that import it
+        self._importers = {}
+
+    @staticmethod
+    def _module_file(directory, dotted_name):
+        """ Return the file of a module relative to `directory`, or None """
+        base = os.path.join(directory, *dotted_name.split("."))
+        for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(candidate):
+                return os.path.normcase(os.path.abspath(candidate))
+        return None
+
+    def _resolve(self, path, imports, search_path):
+        """ Return the files of the local modules imported by `path` """
+        own_dir = os.path.dirname(path)
+        roots = [own_dir, package_root(path)] + list(search_path)
+        found = set()
+
+        for module, names, level in imports:
+            if level:
+                base = own_dir
+                for _ in range(level - 1):
+                    base = os.path.dirname(base)
+                bases = [base]
+            else:
+                bases = roots
+
+            # Importing a.b.c imports a and a.b as well; the imported names
+            # may be submodules too
+            parts = module.split(".") if module else []
+            dotted = [".".join(parts[:i + 1]) for i in range(len(parts))]
+            dotted.extend(".".join(parts + [name]) for name in names
+                          if name != "*")
+
+            for base in bases:
+                resolved = [self._module_file(base, name) for name in dotted]
+                resolved = [f for f in resolved if f]
+                if resolved or (level and not module):
+                    found.update(resolved)
+                    break
+
+        found.discard(path)
+        return found
+
+    def update(self, path, search_path=()):
+        """ Parse the module at `path` again if it has changed, and return
+        the files it imports """
+        path = os.path.normcase(os.path.abspath(path))
+        stamp = file_stamp(path)
+        with self._lock:
+            known = self._modules.get(path)
+        if known is not None and known[0] == stamp:
+            return known[1]
+
+        imported = set()
+        if stamp is not None:
+            try:
+                with open(path, "rb") as source:
+                    imports = find_imports(source.read())
+                imported = self._resolve(path, imports, search_path)
+            except (IOError, OSError, SyntaxError, ValueError, TypeError):
+                # Keep what we knew about a module that doesn't parse
+                if known is not None:
+                    imported = known[1]
+
+        with self._lock:
+            if known is not None:
+                for target in known[1] - imported:
+                    self._importers.get(target, set()).discard(path)
+            for target in imported:
+                self._importers.setdefault(target, set()).add(path)
+            self._modules[path] = (stamp, imported)
+        return imported
+
+    def refresh(self, paths, search_path=()):
+        """ Bring the modules at `paths`, and everything they import
+        (transitively), up to date """
+        seen = set()
+        todo = [os.path.normcase(os.path.abspath(p)) for p in paths]
+        while todo:
+            path = todo.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            todo.extend(self.update(path, search_path))
+
+    def dependents(self, path):
+        """ Return the known modules that import `path`, directly or
+        transitively """
+        path = os.path.normcase(os.path.abspath(path))
+        found = set()
+        with self._lock:
+            todo = [path]
+            while todo:
+                for importer in self._importers.get(todo.pop(), ()):
+                    if importer not in found:
+                        found.add(importer)
+                        todo.append(importer)
+        found.discard(path)
+        return found
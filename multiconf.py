@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import socket
-import sublime
+import sys
 import re
 
+try:
+    import sublime
+except ImportError:
+    # Used outside of Sublime Text, e.g. by the command line entry point
+    sublime = None
+
 """ Multiconf is a module that allows you to read platforma and/or host
 specific configuration values to be used by Sublime Text 2 plugins.
 
@@ -39,9 +45,26 @@ machine it's on. On an MS Windows machine the value returned by `get` will be
 __version__ = "1.0"
 
 __CURRENT_HOSTNAME = socket.gethostname().lower()
-__CURRENT_PLATFORM = sublime.platform()
+
+def _current_platform():
+    """ Return the platform name the way `sublime.platform` does """
+    if sublime is not None:
+        return sublime.platform()
+    if sys.platform.startswith(("win", "cygwin")):
+        return "windows"
+    if sys.platform == "darwin":
+        return "osx"
+    return "linux"
+
+__CURRENT_PLATFORM = _current_platform()
 
 QUALIFIERS = r"""([A-Za-z\d_]*):([^;]*)(?:;|$)"""
+P_QUALIFIERS = re.compile(QUALIFIERS)
+
+# Qualifier string -> whether it applies to this machine. Qualifier functions
+# are expected to give the same answer every time they're asked, see
+# `Qualifications.add_qual`.
+_QUALIFIER_MATCHES = {}
 
 def isstr(s):
     try:
@@ -63,7 +86,8 @@ def get(settings_obj, key, default=None, callback=None):
 
     """
     # Parameter validation
-    if not isinstance(settings_obj, (dict, sublime.Settings)):
+    if not (isinstance(settings_obj, dict) or
+            sublime is not None and isinstance(settings_obj, sublime.Settings)):
         raise AttributeError("Invalid settings object")
     if not isstr(key):
         raise AttributeError("Invalid callback function")
@@ -74,35 +98,43 @@ def get(settings_obj, key, default=None, callback=None):
     final_val = None
 
     if isinstance(setting, dict) and "#multiconf#" in setting:
-        reject_item = False
+        final_val = default
         for entry in setting["#multiconf#"]:
-            reject_item = False if isinstance(entry, dict) and len(entry) else True
-
-            k, v = entry.popitem()
-
-            if reject_item:
+            if not isinstance(entry, dict) or len(entry) != 1:
                 continue
 
-            for qual in re.compile(QUALIFIERS).finditer(k):
-                if Qualifications.exists(qual.group(1)):
-                    reject_item = not Qualifications.eval_qual(qual.group(1), qual.group(2))
-                else:
-                    reject_item = True
-                if reject_item:
-                    break
+            k, v = next(iter(entry.items()))
 
-            if not reject_item:
+            if qualifier_matches(k):
                 final_val = v
                 break
-
-        if reject_item:
-            final_val = default
     else:
         final_val = setting
 
     return callback(final_val, default) if callback else final_val
 
 
+def qualifier_matches(qualifier):
+    """
+    Return True if all qualifications in a qualifier string, e.g.
+    "os:linux;host:his_pc", hold for this machine. The outcome is memoized.
+    """
+    try:
+        return _QUALIFIER_MATCHES[qualifier]
+    except KeyError:
+        pass
+
+    matches = True
+    for qual in P_QUALIFIERS.finditer(qualifier):
+        if not (Qualifications.exists(qual.group(1)) and
+                Qualifications.eval_qual(qual.group(1), qual.group(2))):
+            matches = False
+            break
+
+    _QUALIFIER_MATCHES[qualifier] = matches
+    return matches
+
+
 class QualException(Exception):
     pass
 
@@ -120,6 +152,8 @@ class Qualifications(object):
             raise QualException("'%s' qualifier already exists." % key)
 
         cls.__qualifiers[key] = callback
+        # Outcomes may depend on the new qualifier
+        _QUALIFIER_MATCHES.clear()
 
     @classmethod
     def exists(cls, key):
@@ -0,0 +1,570 @@
+# -*- coding: utf-8 -*-
+
+""" PyLinter worker process
+
+    This module is *not* a Sublime Text plugin. It is started by PyLinter as a
+    long-lived child process, using the Python interpreter that has Pylint
+    installed, i.e.
+
+        <python_bin> pylint_worker.py [<path to lint.py>]
+
+    The worker imports Pylint once and then runs lint jobs in-process, so every
+    job after the first one skips the interpreter startup, the Pylint/astroid
+    imports and, most importantly, rebuilding astroid's module cache for the
+    whole import graph.
+
+    Jobs and their results are exchanged as JSON documents, one per line, over
+    the worker's stdin and stdout:
+
+        request:  {"id": 1, "args": [...], "files": [...], "cwd": "/some/dir",
+                   "stdin": "<optional source for --from-stdin>",
+                   "structured": true, "profile": null}
+        response: {"id": 1, "out": "<a line of Pylint output>"}
+                  {"id": 1, "msg": {<a Pylint message>}}
+                  ...
+                  {"id": 1, "err": "...", "rss": 123456, "peak": 234567}
+
+    Pylint's output is sent line by line, as soon as each line is written, so
+    the first messages can be shown while Pylint is still running. For
+    "structured" jobs the messages are sent as records instead, with the same
+    fields as Pylint's own JSON output. The final response carries Pylint's
+    stderr output, the worker's memory use and the peak size of its address
+    space, in kilobytes.
+
+    A job whose "profile" is "checkers" has the methods of every checker
+    timed, see `CheckerTimer`; "cprofile" additionally runs Pylint under
+    cProfile. The final response of such a job carries a "profile" with the
+    timings.
+
+    Right after starting, the worker sends a single handshake line that is
+    either {"ready": true} or {"error": "<reason>"}.
+
+    A job can be cancelled by sending {"cancel": <id>} while it's running.
+    Pylint is then interrupted, like by Ctrl+C, and the final response carries
+    "cancelled": true. The worker stays ready for the next job, and keeps
+    its caches, except for the astroid modules cached during the cancelled
+    job, which may be incomplete.
+
+    Cached astroid modules whose source files have changed since the previous
+    job are dropped before a job is run, everything else stays warm.
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import signal
+import threading
+import traceback
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import queue
+    from _thread import interrupt_main
+except ImportError:
+    # Python 2
+    import Queue as queue
+    from thread import interrupt_main
+
+# The most precise clock available
+clock = getattr(time, "perf_counter", time.time)
+
+# The protocol channel, Pylint's own output is captured per job
+CHANNEL_IN = sys.stdin
+CHANNEL_OUT = sys.stdout
+
+# The modification times of the cached astroid modules, as seen after the
+# previous job
+MODULE_MTIMES = {}
+
+# The ids of the jobs the client has cancelled, see `cancel_job`, and the id
+# of the job Pylint is running, if it may be interrupted
+JOB_LOCK = threading.Lock()
+CANCELLED_JOBS = set()
+RUNNING_JOB = [None]
+
+
+def cancel_job(job_id):
+    """ Cancel a job, interrupting Pylint if it's running the job """
+    with JOB_LOCK:
+        CANCELLED_JOBS.add(job_id)
+        if RUNNING_JOB[0] == job_id:
+            RUNNING_JOB[0] = None
+            interrupt_main()
+
+
+def run_interruptible(job_id, function, *args, **kwargs):
+    """ Call `function`, unless the job has been cancelled already. Return
+    True if the job was cancelled before or while it ran. """
+    try:
+        try:
+            with JOB_LOCK:
+                if job_id in CANCELLED_JOBS:
+                    return True
+                RUNNING_JOB[0] = job_id
+            function(*args, **kwargs)
+        finally:
+            with JOB_LOCK:
+                RUNNING_JOB[0] = None
+                CANCELLED_JOBS.discard(job_id)
+    except KeyboardInterrupt:
+        return True
+    return False
+
+
+def send(message):
+    """ Write a single protocol message """
+    CHANNEL_OUT.write(json.dumps(message) + "\n")
+    CHANNEL_OUT.flush()
+
+
+def file_stamp(path):
+    """ Return a value that changes whenever the given file changes """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def get_rss():
+    """ Return the resident memory size of this process in kilobytes """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # OS X reports bytes instead of kilobytes
+        return rss // 1024 if sys.platform == "darwin" else rss
+    except (ImportError, AttributeError):
+        return 0
+
+
+def get_peak_size():
+    """ Return the peak address space size of this process in kilobytes, or
+    0 if it's not known """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmPeak:"):
+                    return int(line.split()[1])
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def get_run_exit_keyword(run_class):
+    """ Return the keyword argument that prevents `Run` from exiting """
+    try:
+        from inspect import getfullargspec as getargspec
+    except ImportError:
+        from inspect import getargspec
+
+    try:
+        args = getargspec(run_class.__init__)[0]
+    except TypeError:
+        return "exit"
+
+    if "exit" in args:
+        return "exit"
+    return "do_exit"
+
+
+def invalidate_changed_modules(manager):
+    """ Drop cached astroid modules whose source file has changed """
+    cache = manager.astroid_cache
+    invalidated = False
+
+    for name, stamp in list(MODULE_MTIMES.items()):
+        module = cache.get(name)
+        if module is None:
+            del MODULE_MTIMES[name]
+            continue
+        if file_stamp(module.file) != stamp:
+            del cache[name]
+            del MODULE_MTIMES[name]
+            invalidated = True
+
+    if invalidated:
+        clear_inference_cache()
+
+
+def clear_inference_cache():
+    """ Drop astroid's inference results, which may refer to dropped
+    modules """
+    try:
+        from astroid import context
+        context._INFERENCE_CACHE.clear()  # pylint: disable=W0212
+    except (ImportError, AttributeError):
+        pass
+
+
+def drop_new_modules(manager, known):
+    """ Drop the astroid modules that were cached during a cancelled job,
+    i.e. those not in `known`.
+
+    Pylint may have been interrupted while astroid was building them, after
+    it cached a module but before it applied its transforms, so they can't
+    be trusted by later jobs.
+    """
+    cache = manager.astroid_cache
+    dropped = False
+    for name in list(cache):
+        if name not in known:
+            del cache[name]
+            MODULE_MTIMES.pop(name, None)
+            dropped = True
+    if dropped:
+        clear_inference_cache()
+
+
+def record_module_mtimes(manager, linted_files):
+    """ Remember the state of the cached astroid modules.
+
+    The modules that have just been linted are dropped from the cache, since
+    they are the ones most likely to be edited before the next job.
+    """
+    linted = set(os.path.normcase(os.path.abspath(f)) for f in linted_files)
+    cache = manager.astroid_cache
+
+    for name, module in list(cache.items()):
+        path = getattr(module, "file", None)
+        if not path or not os.path.isfile(path):
+            continue
+        if os.path.normcase(os.path.abspath(path)) in linted:
+            del cache[name]
+            MODULE_MTIMES.pop(name, None)
+        elif name not in MODULE_MTIMES:
+            MODULE_MTIMES[name] = file_stamp(path)
+
+
+class LineStream(object):
+    """ A stdout replacement that sends every complete line it receives """
+    encoding = "utf-8"
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.pending = ""
+
+    def write(self, text):
+        self.pending += text
+        if "\n" in self.pending:
+            lines = self.pending.split("\n")
+            self.pending = lines.pop()
+            for line in lines:
+                send({"id": self.job_id, "out": line})
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def close(self):
+        """ Send whatever is left of the last line """
+        if self.pending:
+            send({"id": self.job_id, "out": self.pending})
+            self.pending = ""
+
+
+def make_reporter_class():
+    """ Return a Pylint reporter class that sends every message as a record,
+    or None if this Pylint version doesn't support it """
+    try:
+        from pylint.reporters import BaseReporter
+    except ImportError:
+        return None
+    if not hasattr(BaseReporter, "handle_message"):
+        return None
+
+    class RecordReporter(BaseReporter):
+        """ Send the messages of a job as soon as Pylint reports them """
+        name = "pylinter-records"
+
+        def __init__(self, job_id):
+            BaseReporter.__init__(self)
+            self.job_id = job_id
+
+        def handle_message(self, msg):
+            send({"id": self.job_id, "msg": {
+                "path": msg.path,
+                "line": msg.line,
+                "column": msg.column,
+                "endLine": getattr(msg, "end_line", None),
+                "endColumn": getattr(msg, "end_column", None),
+                "message-id": msg.msg_id,
+                "symbol": msg.symbol,
+                "message": msg.msg}})
+
+        def display_messages(self, layout):
+            pass
+
+        def _display(self, layout):
+            pass
+
+    try:
+        # Pylint < 2.14 checks the interfaces a reporter implements
+        from pylint.interfaces import IReporter
+        RecordReporter.__implements__ = IReporter
+    except ImportError:
+        pass
+
+    return RecordReporter
+
+
+class CheckerTimer(object):
+    """ Time the methods of every checker that is registered while the timer
+    is installed.
+
+    The visit and leave methods, and the methods Pylint calls for raw and
+    token checkers, are replaced by timed wrappers on the checker instances.
+    Only the time spent in a method itself is counted, a method called by
+    another timed method is not counted twice.
+    """
+    TIMED = ("open", "close", "process_module", "process_tokens")
+
+    def __init__(self):
+        # (checker name, checker module, method name) ->
+        # [seconds, calls, ids of the messages the method checks]
+        self.timings = {}
+        # checker name -> {message id: symbol} of the checker's messages
+        self.checkers = {}
+        # The time spent in nested timed calls, per level
+        self._stack = []
+        self._saved = None
+
+    def install(self, linter_class):
+        original = linter_class.register_checker
+        timer = self
+
+        def register_checker(linter, checker, *args, **kwargs):
+            timer.instrument(checker)
+            return original(linter, checker, *args, **kwargs)
+
+        linter_class.register_checker = register_checker
+        self._saved = (linter_class, original)
+
+    def uninstall(self):
+        if self._saved is not None:
+            linter_class, original = self._saved
+            linter_class.register_checker = original
+            self._saved = None
+
+    def instrument(self, checker):
+        """ Replace the methods of a checker by timed ones """
+        name = getattr(checker, "name", type(checker).__name__)
+        module = type(checker).__module__
+        messages = self.checkers.setdefault(name, {})
+        for msg_id, definition in (getattr(checker, "msgs", None) or
+                                   {}).items():
+            # (template, symbol, description[, options]) since Pylint 1.0
+            symbol = definition[1] if len(definition) > 2 else None
+            messages[msg_id] = symbol
+
+        for attr in dir(checker):
+            if not (attr.startswith("visit_") or attr.startswith("leave_") or
+                    attr in self.TIMED):
+                continue
+            try:
+                method = getattr(checker, attr)
+            except Exception:  # pylint: disable=W0703
+                continue
+            if callable(method):
+                setattr(checker, attr, self.wrap(method, (name, module, attr)))
+
+    def wrap(self, method, key):
+        checks_msgs = getattr(method, "checks_msgs", None)
+        timing = self.timings.setdefault(key, [0.0, 0,
+                                               sorted(checks_msgs or ())])
+        stack = self._stack
+
+        def timed(*args, **kwargs):
+            started = clock()
+            stack.append(0.0)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - started
+                timing[0] += elapsed - stack.pop()
+                timing[1] += 1
+                if stack:
+                    stack[-1] += elapsed
+
+        # Pylint skips the methods whose messages are all disabled
+        if checks_msgs is not None:
+            timed.checks_msgs = checks_msgs
+        return timed
+
+    def results(self):
+        """ Return the timings, with the messages a method checks given by
+        their ids (Pylint 2 and later name them by their symbols) """
+        ids = {}
+        for messages in self.checkers.values():
+            for msg_id, symbol in messages.items():
+                ids[msg_id] = msg_id
+                if symbol:
+                    ids[symbol] = msg_id
+        timings = []
+        for key, (seconds, calls, checks) in self.timings.items():
+            timings.append(list(key) + [seconds, calls,
+                                        sorted(set(ids.get(m, m)
+                                                   for m in checks))])
+        return {"timings": timings, "checkers": self.checkers}
+
+
+def make_stdin(source):
+    """ Return a stdin replacement that provides `source`.
+
+    Pylint detaches the buffer of `sys.stdin` before reading it, so a plain
+    StringIO won't do.
+    """
+    if sys.version_info[0] == 2:
+        return StringIO(source.encode("utf-8"))
+    return io.TextIOWrapper(io.BytesIO(source.encode("utf-8")),
+                            encoding="utf-8")
+
+
+def run_job(run_class, exit_keyword, manager, reporter_class, job):
+    """ Run Pylint for a single job, streaming its output, and return the
+    final response """
+    files = job.get("files", [])
+    invalidate_changed_modules(manager)
+
+    kwargs = {exit_keyword: False}
+    if job.get("structured") and reporter_class is not None:
+        kwargs["reporter"] = reporter_class(job.get("id"))
+
+    timer = profiler = None
+    if job.get("profile"):
+        from pylint.lint import PyLinter
+        timer = CheckerTimer()
+        timer.install(PyLinter)
+        if job["profile"] == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+
+    out, err = LineStream(job.get("id")), StringIO()
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+    saved_cwd = os.getcwd()
+    sys.stdout, sys.stderr = out, err
+    if job.get("stdin") is not None:
+        sys.stdin = make_stdin(job["stdin"])
+
+    cancelled = False
+    known_modules = set(manager.astroid_cache)
+    started = clock()
+    try:
+        if job.get("cwd"):
+            os.chdir(job["cwd"])
+        if profiler is not None:
+            profiler.enable()
+        cancelled = run_interruptible(job.get("id"), run_class,
+                                      job["args"] + files, **kwargs)
+    except SystemExit:
+        pass
+    except Exception:  # pylint: disable=W0703
+        err.write(traceback.format_exc())
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if timer is not None:
+            timer.uninstall()
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+        os.chdir(saved_cwd)
+        if not cancelled:
+            out.close()
+    total = clock() - started
+
+    if cancelled:
+        drop_new_modules(manager, known_modules)
+    record_module_mtimes(manager, files)
+
+    response = {"id": job.get("id"),
+                "err": err.getvalue(),
+                "rss": get_rss(),
+                "peak": get_peak_size()}
+    if cancelled:
+        response["cancelled"] = True
+    elif timer is not None:
+        response["profile"] = timer.results()
+        response["profile"]["total"] = total
+        if profiler is not None:
+            import pstats
+            stream = StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats(
+                "cumulative").print_stats(30)
+            response["profile"]["cprofile"] = stream.getvalue()
+    return response
+
+
+def read_requests(jobs):
+    """ Queue the jobs the client sends until stdin is closed, runs in a
+    thread of its own so cancellations take effect while a job runs """
+    while True:
+        line = CHANNEL_IN.readline()
+        if not line:
+            break
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        if "cancel" in request:
+            cancel_job(request["cancel"])
+        else:
+            jobs.put(request)
+    jobs.put(None)
+
+
+def main():
+    """ Import Pylint and serve lint jobs until stdin is closed """
+    if len(sys.argv) > 1 and sys.argv[1]:
+        # We've been given the path to `lint.py`, make sure its package is
+        # the one that gets imported
+        sys.path.insert(0, os.path.dirname(os.path.dirname(sys.argv[1])))
+
+    try:
+        from pylint.lint import Run
+        try:
+            from astroid import MANAGER
+        except ImportError:
+            # Pylint < 1.0
+            from logilab.astng import MANAGER
+    except ImportError:
+        send({"error": "Pylint could not be imported by %s" % sys.executable})
+        return
+
+    exit_keyword = get_run_exit_keyword(Run)
+    reporter_class = make_reporter_class()
+    # Cancelling a job interrupts Pylint, even if the worker was started
+    # with Ctrl+C ignored
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    send({"ready": True})
+
+    jobs = queue.Queue()
+    reader = threading.Thread(target=read_requests, args=(jobs,))
+    reader.daemon = True
+    reader.start()
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        send(run_job(Run, exit_keyword, MANAGER, reporter_class, job))
+
+
+if __name__ == "__main__":
+    main()
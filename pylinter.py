@@ -10,11 +10,9 @@
 """
 
 import os.path
-import sys
-import re
+import time
 import threading
-import subprocess
-import collections
+import multiprocessing
 import sublime
 import sublime_plugin
 
@@ -24,265 +22,655 @@ import sublime_plugin
 ST3 = int(sublime.version()) > 3000
 
 if ST3:
-    from . import multiconf
+    from . import engine
+    from . import resultcache
+    from . import stats
+    from . import importgraph
+    from . import quickcheck
+    from . import checkerprofile
+    from . import durations
+    from .diagnostics import Diagnostic, DiagnosticStore, ViewState
+    from .diagnostics import CATEGORIES
 else:
-    import multiconf
-
-# The version of Python that SublimeText is using
-PYTHON_VERSION = sys.version_info[0]
-
-# To override this, set the 'verbose' setting in the configuration file
-PYLINTER_VERBOSE = True
-
-# Prevent the console from popping up in Windows
-if os.name == "nt":
-    STARTUPINFO = subprocess.STARTUPINFO()
-    STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-else:
-    STARTUPINFO = None
-
-# The output format we want PyLint's error messages to be in
-PYLINT_FORMAT = '--msg-template={path}:{line}:{msg_id}:{msg}'
-# Pylint error cache
+    import engine
+    import resultcache
+    import stats
+    import importgraph
+    import quickcheck
+    import checkerprofile
+    import durations
+    from diagnostics import Diagnostic, DiagnosticStore, ViewState
+    from diagnostics import CATEGORIES
+
+# The parts of the engine the plugin uses directly
+speak = engine.speak
+parse_line = engine.parse_line
+parse_record = engine.parse_record
+set_pylint_command = engine.set_pylint_command
+
+# Pylint error cache: view id -> DiagnosticStore
 PYLINTER_ERRORS = {}
-PATH_SEPERATOR = ';' if os.name == "nt" else ':'
-SEPERATOR_PATTERN = ';' if os.name == "nt" else '[:;]'
+# view id -> ViewState
+PYLINTER_VIEWS = {}
 
 # The last line selected (i.e. the one we need to display status info for)
 LAST_SELECTED_LINE = -1
 # Indicates if we're displaying info in the status line
 STATUS_ACTIVE = False
 
-# The followig global values will be set by the `set_globals` function
-PYLINT_VERSION = None
-PYLINT_SETTINGS = None
-# Regular expression to disect Pylint error messages
-P_PYLINT_ERROR = None
+# Marks settings that have no value
+_MISSING = object()
 
-# The default Pylint command will be stored in this variable. It will either be
-# ["pylint"] or [<python_bin>, <path_to_lint.py>] if the former is not found.
-DEFAULT_PYLINT_COMMAND = None
+# The plugin settings, set by `plugin_loaded`. The Pylint version and the
+# default Pylint command are kept by the engine, see
+# `engine.set_pylint_command`.
+PYLINT_SETTINGS = None
 
-def speak(*msg):
-    """ Log messages to the console if PYLINTER_VERBOSE is True """
-    if PYLINTER_VERBOSE:
-        print(" - PyLinter: " + " ".join(msg))
+# The on-disk result cache, see `get_result_cache`
+RESULT_CACHE = None
+
+# How long linting every file took recently, see `get_duration_history`
+DURATION_HISTORY = None
+
+# The timing statistics of the most recent runs of every file
+STATS_HISTORY = stats.StatsHistory()
+
+# The local imports of the modules that are open, see `lint_dependents`
+IMPORT_GRAPH = importgraph.ImportGraph()
+
+# The approximate memory used by the region of a marker, in bytes
+REGION_SIZE = 150
+
+# The key of the hidden regions that keep track of where the lines with
+# diagnostics move to, see `realign_diagnostics`
+ANCHOR_KEY = 'pylinter.anchors'
+
+# The minimum number of seconds between handing batches of messages over to
+# the main thread while Pylint is still running
+BATCH_INTERVAL = 0.2
+
+# The longest the main thread spends drawing markers in one go, in seconds,
+# and the number of markers drawn between checks of the time spent
+FRAME_BUDGET = 0.008
+MARKER_SLICE = 250
+
+def show_error(msg):
+    """ Show an error dialog, from any thread """
+    sublime.set_timeout(lambda: sublime.error_message(msg), 0)
+
+def get_cache_dir(view=None):
+    """ Return the directory in which PyLinter caches its data, for the given
+    view or the active view """
+    return (PylSet.get_or('cache_dir', None, view) or
+            resultcache.default_cache_dir())
+
+def get_result_cache(view=None):
+    """ Return the on-disk result cache for the given view or the active
+    view, or None if caching is disabled """
+    global RESULT_CACHE
+
+    if not PylSet.get_or('use_cache', True, view):
+        return None
+
+    directory = get_cache_dir(view)
+    max_size = int(PylSet.get_or('cache_size', 50, view) * 1024 * 1024)
+
+    if (RESULT_CACHE is None or RESULT_CACHE.directory != directory or
+            RESULT_CACHE.max_size != max_size):
+        RESULT_CACHE = resultcache.ResultCache(directory, max_size)
+    return RESULT_CACHE
+
+def get_duration_history(view=None):
+    """ Return the lint durations of the recent runs of every file, kept in
+    the cache directory of the given view or the active view """
+    global DURATION_HISTORY
+
+    path = durations.history_file(get_cache_dir(view))
+    if DURATION_HISTORY is None or DURATION_HISTORY.path != path:
+        if DURATION_HISTORY is not None:
+            DURATION_HISTORY.save()
+        DURATION_HISTORY = durations.DurationHistory(path)
+    return DURATION_HISTORY
+
+def get_save_profile(view):
+    """ Return the lint profile to use when a file is saved or modified. That
+    is the `slow_file_profile` instead of the `save_profile` for files that
+    have recently been taking longer than the `slow_file_threshold` with the
+    latter; their runs with the `idle_profile` then only happen once the view
+    is idle. """
+    profile = PylSet.get_or('save_profile', None, view)
+    slow_profile = PylSet.get_or('slow_file_profile', 'fast', view)
+    threshold = PylSet.get_or('slow_file_threshold', 5, view)
+    file_name = view.file_name()
+    if not threshold or not file_name or slow_profile == profile:
+        return profile
+
+    options = PylSet.get_or('profiles', {}, view).get(profile) or {}
+    if not get_duration_history(view).is_slow(
+            file_name, durations.run_key(profile, options), threshold):
+        return profile
+    speak("%s is slow to lint, using the %s profile" % (file_name,
+                                                         slow_profile))
+    return slow_profile
 
 def plugin_loaded():
     """ Set all global values """
 
-    global PYLINT_VERSION, PYLINT_SETTINGS, P_PYLINT_ERROR, DEFAULT_PYLINT_COMMAND
+    global PYLINT_SETTINGS
 
     PYLINT_SETTINGS = sublime.load_settings('Pylinter.sublime-settings')
-    DEFAULT_PYLINT_COMMAND = PylSet.get_default_pylint_command()
-    PYLINT_VERSION = PylSet.get_lint_version()
-
-    # Pylint version < 1.0
-    if PYLINT_VERSION[0] == 0:
-        # Regular expression to disect Pylint error messages
-        P_PYLINT_ERROR = re.compile(r"""
-            ^(?P<file>.+?):(?P<line>[0-9]+):\ # file name and line number
-            \[(?P<type>[a-z])(?P<errno>\d+)   # message type and error number
-                                              # e.g. E0101
-            (,\ (?P<hint>.+))?\]\             # optional class or function name
-            (?P<msg>.*)                       # finally, the error message
-            """, re.IGNORECASE | re.VERBOSE)
-    # Pylint version 1.0 or greater
-    else:
-        P_PYLINT_ERROR = re.compile(r"""
-            ^(?P<file>.+?):(?P<line>[0-9]+): # file name and line number
-            (?P<type>[a-z])(?P<errno>\d+):   # message type and error number,
-                                             # e.g. E0101
-            (?P<msg>.*)                      # finally, the error message
-            """, re.IGNORECASE | re.VERBOSE)
+    PYLINT_SETTINGS.add_on_change('pylinter', on_settings_changed)
+    PylintProbe.start()
+
+def on_settings_changed():
+    """ Drop the resolved settings and re-probe Pylint if needed """
+    PylSet.invalidate()
+    engine.ExecEnvironment.invalidate()
+    PylintProbe.start()
+
+
+class PylintProbe(object):
+    """ Determine the default Pylint command and the Pylint version.
+
+    Finding out requires running Pylint, which is slow, so it's done in a
+    background thread and the outcome is stored on disk. The stored outcome
+    is keyed on the paths and modification times of the Python interpreter,
+    the `pylint` executable and `lint.py`, so later startups don't have to
+    run anything until one of those changes.
+
+    Lint runs requested before the probe has finished are postponed, see
+    `when_ready`.
+    """
+    _lock = threading.Lock()
+    _callbacks = []
+    # The (python_bin, pylint_path) settings that were probed last
+    _config = None
+
+    @classmethod
+    def start(cls):
+        """ Probe Pylint if the relevant settings have changed, called from
+        the main thread """
+        python_bin = PylSet.get_or('python_bin', 'python')
+        pylint_path = PylSet.get_or('pylint_path', None)
+        if cls._config == (python_bin, pylint_path):
+            return
+        cls._config = (python_bin, pylint_path)
+
+        cache_dir = get_cache_dir()
+        outcome = engine.load_probe(cache_dir, python_bin, pylint_path)
+        if outcome:
+            speak("Using stored Pylint probe for %s" % python_bin)
+            cls._ready(*outcome)
+            return
+
+        def probe():
+            command, version = engine.probe_pylint(cache_dir, python_bin,
+                                                   pylint_path, show_error)
+            sublime.set_timeout(lambda: cls._ready(command, version), 0)
+
+        threading.Thread(target=probe).start()
+
+    @classmethod
+    def _ready(cls, command, version):
+        """ Apply the outcome of a probe and run the postponed callbacks """
+        set_pylint_command(command, version)
+        with cls._lock:
+            callbacks, cls._callbacks = cls._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    @classmethod
+    def when_ready(cls, callback):
+        """ Call `callback` once the Pylint version is known. Returns True if
+        it was called right away. """
+        with cls._lock:
+            if engine.PYLINT_VERSION is None:
+                cls._callbacks.append(callback)
+                return False
+        callback()
+        return True
+
 
 class PylSet(object):
-    """ Pylinter Settings class"""
+    """ Pylinter Settings class
+
+    Resolved setting values are kept in a snapshot per view, so that looking
+    up a setting on a hot path is a plain dictionary read. A view's snapshot
+    is dropped when the view's settings change (which includes changes to the
+    project settings), all snapshots are dropped when the plugin settings
+    change.
+    """
+    # view id (None when there is no view) -> (project settings, resolved
+    # values)
+    _snapshots = {}
+    # The ids of the views whose settings are watched for changes
+    _watched = set()
+
     @classmethod
-    def _get_settings_obj(cls):
+    def _get_view(cls):
         try:
-            view_settings = sublime.active_window().active_view().settings()
-            view_settings = view_settings.get('pylinter')
-            if view_settings:
-                return view_settings
+            return sublime.active_window().active_view()
         except AttributeError:
-            pass
+            return None
 
-        return PYLINT_SETTINGS
+    @classmethod
+    def _get_project_settings(cls, view):
+        if view is not None:
+            return view.settings().get('pylinter')
+        return None
 
     @classmethod
-    def get(cls, setting_name):
-        value = cls.get_or(setting_name, None)
+    def _get_snapshot(cls, view):
+        view_id = view.id() if view is not None else None
+        snapshot = cls._snapshots.get(view_id)
+        if snapshot is None:
+            snapshot = (cls._get_project_settings(view), {})
+            cls._snapshots[view_id] = snapshot
+            if view is not None and view_id not in cls._watched:
+                cls._watched.add(view_id)
+                view.settings().add_on_change(
+                    'pylinter-snapshot', lambda: cls.invalidate(view_id))
+        return snapshot
+
+    @classmethod
+    def forget(cls, view):
+        """ Drop the snapshot of a view that is closed, and stop watching its
+        settings """
+        view_id = view.id()
+        cls.invalidate(view_id)
+        if view_id in cls._watched:
+            cls._watched.discard(view_id)
+            view.settings().clear_on_change('pylinter-snapshot')
+
+    @classmethod
+    def invalidate(cls, view_id=_MISSING):
+        """ Drop the snapshot of the given view, or all snapshots """
+        if view_id is _MISSING:
+            cls._snapshots = {}
+        else:
+            cls._snapshots.pop(view_id, None)
+
+    @classmethod
+    def get(cls, setting_name, view=None):
+        value = cls.get_or(setting_name, None, view)
         if value is None:
             raise PylSetException("No value found for '%s'" % setting_name)
         return value
 
     @classmethod
-    def get_or(cls, setting_name, default):
-        settings_obj = cls._get_settings_obj()
+    def get_or(cls, setting_name, default, view=None):
+        """ Return a setting for the given view, or the active view """
+        if view is None:
+            view = cls._get_view()
+        project_settings, values = cls._get_snapshot(view)
 
-        if isinstance(settings_obj, collections.Iterable):
-            if not setting_name in settings_obj:
-                settings_obj = PYLINT_SETTINGS
-        return multiconf.get(settings_obj, setting_name, default)
+        try:
+            value = values[setting_name]
+        except KeyError:
+            value = engine.resolve_setting(project_settings, PYLINT_SETTINGS,
+                                           setting_name, _MISSING)
+            values[setting_name] = value
+
+        return default if value is _MISSING else value
 
     @classmethod
-    def read_settings(cls):
-        global PYLINTER_VERBOSE
+    def read_settings(cls, view=None):
+        """ Return the settings of a lint run for the given view, or the
+        active view """
+        engine.VERBOSE = cls.get_or('verbose', False, view)
 
-        PYLINTER_VERBOSE = cls.get_or('verbose', False)
+        speak("Verbose is", str(engine.VERBOSE))
+        try:
+            return engine.read_settings(
+                lambda name, default: cls.get_or(name, default, view))
+        except engine.SettingsError as exc:
+            sublime.error_message(str(exc))
+            return False
 
-        speak("Verbose is", str(PYLINTER_VERBOSE))
-        python_bin = cls.get_or('python_bin', 'python')
-        python_path = cls.get_or('python_path', [])
-        python_path = PATH_SEPERATOR.join([str(p) for p in python_path])
-        working_dir = cls.get_or('working_dir', None)
-        pylint_path = cls.get_or('pylint_path', None)
-        pylint_rc = cls.get_or('pylint_rc', None) or ""
-        ignore = [t.lower() for t in cls.get_or('ignore', [])]
-        plugins = cls.get_or('plugins', None)
 
-        # Add custom runtime settings
-        pylint_extra = PylSet.get_or('pylint_extra', None)
+class PylSetException(Exception):
+    pass
 
-        disable = cls.get_or('disable', [])
-        # Added ignore for trailing whitespace (false positives bug in
-        # pylint 1.0.0)
-        if PYLINT_VERSION[0] != 0:
-            disable.append('C0303')
-        disable_msgs = ",".join(disable)
 
-        if pylint_rc and not os.path.exists(pylint_rc):
-            msg = "Pylint configuration not found at '%s'." % pylint_rc
-            sublime.error_message(msg)
-            return False
+class LintScheduler(object):
+    """ Decide when lint runs are started.
+
+    There is at most one run in flight per view. A run requested while
+    another one for the same view is in flight supersedes it: the old run is
+    cancelled (stopping its Pylint process or worker job) and the new one is
+    queued. Queued runs for the same view are merged, only the latest one is
+    kept. Runs that only restore results, see `PylintThread.cache_only`, are
+    dropped instead if a run for the view is already queued or in flight. The
+    total number of runs in flight is capped by the `max_workers` setting.
+
+    Runs have a priority. Queued runs of normal priority are started before
+    any of low priority, and runs of low priority never take up the last free
+    slot, unless `max_workers` is 1, so they don't hold up the user's own
+    lint requests. Among runs of the same priority, the one expected to take
+    the least time is started first, see `PylintThread.estimate`, so a slow
+    file doesn't hold up the results of all others.
+    """
+    NORMAL = 0
+    LOW = 1
+
+    _lock = threading.Lock()
+    # view id -> the run in flight
+    _running = {}
+    # view id -> the run waiting for a free slot
+    _pending = {}
+    # The order in which the waiting views were queued
+    _queue = []
+    # view id -> the generation of the latest run that was requested
+    _generation = {}
+    max_workers = 2
+
+    @classmethod
+    def submit(cls, thread):
+        """ Schedule a run, superseding all earlier runs for its view """
+        cls.max_workers = max(1, PylSet.get_or('max_workers', 2))
+        view_id = thread.view_id
+
+        with cls._lock:
+            if thread.cache_only and (view_id in cls._running or
+                                      view_id in cls._pending):
+                # The run in flight brings newer results than a restore
+                thread.finished.set()
+                return
+            generation = cls._generation.get(view_id, 0) + 1
+            cls._generation[view_id] = generation
+            thread.generation = generation
+
+            superseded = cls._pending.pop(view_id, None)
+            if superseded is not None:
+                # Don't demote a run the user asked for
+                thread.priority = min(thread.priority, superseded.priority)
+                superseded.finished.set()
+            else:
+                cls._queue.append(view_id)
+            cls._pending[view_id] = thread
+
+            running = cls._running.get(view_id)
 
-        return (python_bin,
-                python_path,
-                working_dir,
-                pylint_path,
-                pylint_rc,
-                ignore,
-                disable_msgs,
-                pylint_extra,
-                plugins)
+        if running is not None:
+            speak("Cancelling superseded run for %s" % running.file_name)
+            running.cancel()
+
+        cls._start_pending()
 
     @classmethod
-    def get_default_pylint_command(cls):
-        """ This class method will check if the `pylint` command is available.
+    def is_current(cls, thread):
+        """ Return True if no newer run was requested for the thread's view """
+        return cls._generation.get(thread.view_id) == thread.generation
 
-        If it is not, it will try and determine the path to the `lint.py` file
-        directly.
-        """
+    @classmethod
+    def cancel(cls, view_id):
+        """ Cancel all runs for the given view """
+        with cls._lock:
+            pending = cls._pending.pop(view_id, None)
+            if pending is not None:
+                cls._queue.remove(view_id)
+                pending.finished.set()
+            running = cls._running.get(view_id)
+            cls._generation.pop(view_id, None)
+
+        if running is not None:
+            running.cancel()
 
-        try:
-            python_bin = cls.get_or('python_bin', 'python')
-            pylint_path = cls.get_or('pylint_path', None)
-            if pylint_path is None:
-                _ = subprocess.Popen("pylint",
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.PIPE,
-                                 startupinfo=STARTUPINFO)
-                speak("Pylint executable found")
-                return ["pylint"]
-            else:
-                return [python_bin, pylint_path]
-        except OSError:
-            speak("Pylint executable *not* found")
-            speak("Seaching for lint.py module...")
+    @classmethod
+    def done(cls, thread):
+        """ Called by a run when it has finished """
+        with cls._lock:
+            if cls._running.get(thread.view_id) is thread:
+                del cls._running[thread.view_id]
+        cls._start_pending()
 
-        cmd = ["python", "-c"]
+    @classmethod
+    def _start_pending(cls):
+        """ Start queued runs while there are free slots """
+        to_start = []
+        low_slots = max(1, cls.max_workers - 1)
+        with cls._lock:
+            for priority in (cls.NORMAL, cls.LOW):
+                # Shortest first, in the order they were queued otherwise.
+                # Views with a superseded run still in flight wait for it to
+                # wind down.
+                waiting = sorted(
+                    (cls._pending[view_id].estimate, index, view_id)
+                    for index, view_id in enumerate(cls._queue)
+                    if view_id not in cls._running and
+                    cls._pending[view_id].priority == priority)
+                for _, _, view_id in waiting:
+                    if len(cls._running) >= cls.max_workers:
+                        break
+                    if priority == cls.LOW and low_slots <= len(
+                            [t for t in cls._running.values()
+                             if t.priority == cls.LOW]):
+                        break
+                    cls._queue.remove(view_id)
+                    thread = cls._pending.pop(view_id)
+                    cls._running[view_id] = thread
+                    to_start.append(thread)
+
+        for thread in to_start:
+            thread.start()
+
+
+class DiagnosticBudget(object):
+    """ Keep the memory used by the diagnostics of all views within the
+    `memory_budget` setting.
+
+    When the budget is exceeded, the diagnostics of the least recently used
+    views that aren't visible are replaced by a compact snapshot. Their
+    markers stay where they are, and the diagnostics are restored from the
+    snapshot once the view is activated again. If the snapshots alone exceed
+    the budget, the oldest ones are dropped as well; those views look for
+    their results in the result cache when they are activated.
+    """
+    # view id -> (snapshot, {category: (uses spans, icon, flags)})
+    _snapshots = {}
+    # The views whose snapshot has been dropped
+    _dropped = set()
+    # view id -> the tick of the view's last use
+    _last_used = {}
+    _tick = 0
 
-        if PYTHON_VERSION == 2:
-            cmd.append("import pylint; print pylint.__path__[0]")
-        else:
-            cmd.append("import pylint; print(pylint.__path__[0])")
-
-        proc = subprocess.Popen(cmd,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                startupinfo=STARTUPINFO)
-
-        out, _ = proc.communicate()
-
-        pylint_path = None
-        if out != b"":
-            pylint_path = os.path.join(out.strip(),
-                                       b"lint.py").decode("utf-8")
-
-        if not pylint_path:
-            msg = ("Pylinter could not automatically determined the path to `lint.py`.\n\n"
-                   "Please provide one in the settings file using the `pylint_path` variable.\n\n"
-                   "NOTE:\nIf you are using a Virtualenv, the problem might be resolved by "
-                   "launching Sublime Text from correct Virtualenv.")
-            sublime.error_message(msg)
-        elif not os.path.exists(pylint_path):
-            msg = ("Pylinter could not find `lint.py` at the given path:\n\n'{}'.".format(pylint_path))
-            sublime.error_message(msg)
-        else:
-            speak("Pylint path {0} found".format(pylint_path))
-            python_bin = cls.get_or('python_bin', 'python')
-            return [python_bin, pylint_path]
+    @classmethod
+    def touch(cls, view_id):
+        """ Mark the diagnostics of a view as used """
+        cls._tick += 1
+        cls._last_used[view_id] = cls._tick
 
     @classmethod
-    def get_lint_version(cls):
-        """ Return the Pylint version as a (x, y, z) tuple """
-        pylint_path = cls.get_or('pylint_path', None)
-        python_bin = cls.get_or('python_bin', 'python')
-        found = None
+    def has_results(cls, view_id):
+        return view_id in PYLINTER_ERRORS or view_id in cls._snapshots
 
-        regex = re.compile(b"[lint.py|pylint] ([0-9]+).([0-9]+).([0-9]+)")
+    @classmethod
+    def view_size(cls, view_id):
+        """ Return the approximate memory used by the diagnostics and markers
+        of a view """
+        store = PYLINTER_ERRORS.get(view_id)
+        size = store.memory_size() if store is not None else 0
+        state = PYLINTER_VIEWS.get(view_id)
+        if state is not None:
+            size += REGION_SIZE * sum(len(drawn[0])
+                                      for drawn in state.drawn.values())
+        return size
 
-        if pylint_path:
-            command = [python_bin, pylint_path]
-        else:
-            command = list(DEFAULT_PYLINT_COMMAND)
+    @classmethod
+    def usage(cls):
+        """ Return the number of views with diagnostics, the memory they use,
+        the number of snapshots and the memory those use """
+        live = sum(cls.view_size(view_id) for view_id in PYLINTER_ERRORS)
+        snapshots = sum(len(entry[0]) for entry in cls._snapshots.values())
+        return len(PYLINTER_ERRORS), live, len(cls._snapshots), snapshots
 
-        command.append("--version")
+    @classmethod
+    def stored(cls, view_id):
+        """ Called when a view got new diagnostics """
+        cls._snapshots.pop(view_id, None)
+        cls._dropped.discard(view_id)
+        cls.touch(view_id)
+        cls.enforce()
 
-        try:
-            p = subprocess.Popen(command,
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             startupinfo=STARTUPINFO)
-            output, _ = p.communicate()
-            found = regex.search(output)
-        except OSError:
-            msg = "Pylinter could not find '%s'" % command[-2]
-            sublime.error_message(msg)
+    @classmethod
+    def _visible_view_ids(cls):
+        visible = set()
+        for window in sublime.windows():
+            for group in range(window.num_groups()):
+                view = window.active_view_in_group(group)
+                if view is not None:
+                    visible.add(view.id())
+        return visible
 
-        if found:
-            found = found.groups()
-            if len(found) == 3:
-                version = tuple(int(v) for v in found)
-                speak("Pylint version %s found" % str(version))
-                return version
+    @classmethod
+    def enforce(cls):
+        """ Evict diagnostics until the memory used is within budget """
+        budget = PylSet.get_or('memory_budget', 50) * 1024 * 1024
+        _, live, _, snapshots = cls.usage()
+        if live + snapshots <= budget:
+            return
 
-        speak("Could not determine Pylint version")
-        return (1, 0, 0)
+        visible = cls._visible_view_ids()
+        for _, view_id in sorted((cls._last_used.get(view_id, 0), view_id)
+                                 for view_id in PYLINTER_ERRORS
+                                 if view_id not in visible):
+            if live + snapshots <= budget:
+                return
+            live -= cls.view_size(view_id)
+            snapshots += len(cls._evict(view_id))
 
+        for _, view_id in sorted((cls._last_used.get(view_id, 0), view_id)
+                                 for view_id in cls._snapshots):
+            if live + snapshots <= budget:
+                return
+            snapshots -= len(cls._snapshots.pop(view_id)[0])
+            cls._dropped.add(view_id)
 
-class PylSetException(Exception):
-    pass
+    @classmethod
+    def _evict(cls, view_id):
+        """ Replace the diagnostics of a view by a snapshot """
+        PylinterCommand.stop_painting(view_id)
+        store = PYLINTER_ERRORS.pop(view_id)
+        drawn = {}
+        state = PYLINTER_VIEWS.get(view_id)
+        if state is not None:
+            for key, entry in state.drawn.items():
+                uses_spans = bool(entry[0]) and isinstance(entry[0][0], tuple)
+                drawn[key] = (uses_spans, entry[1], entry[2])
+            state.drawn = {}
+
+        data = store.snapshot()
+        cls._snapshots[view_id] = (data, drawn)
+        speak("Compacted the diagnostics of view %d to %d bytes" % (view_id,
+                                                                   len(data)))
+        return data
+
+    @classmethod
+    def restore(cls, view, reload_dropped=False):
+        """ Bring back the diagnostics of a view that have been evicted. If
+        `reload_dropped` is True and the snapshot was dropped as well, the
+        results are looked up in the result cache. """
+        view_id = view.id()
+        cls.touch(view_id)
+        entry = cls._snapshots.pop(view_id, None)
+        if entry is None:
+            if reload_dropped and view_id in cls._dropped:
+                cls._dropped.discard(view_id)
+                view.run_command('pylinter', {'action': 'restore'})
+            return
+
+        data, drawn = entry
+        store = DiagnosticStore.from_snapshot(data)
+        PYLINTER_ERRORS[view_id] = store
+        # The markers are still in place, don't draw them again
+        state = PYLINTER_VIEWS.setdefault(view_id, ViewState())
+        for key, (uses_spans, icon, flags) in drawn.items():
+            if uses_spans:
+                markers = store.spans_by_category()
+            else:
+                markers = store.lines_by_category()
+            state.drawn[key] = (markers.get(key, []), icon, flags, None, [])
+        # Catch up with edits made in the meantime
+        realign_diagnostics(view)
+        cls.enforce()
+
+    @classmethod
+    def forget(cls, view_id):
+        """ Drop everything kept for a view """
+        PylinterCommand.stop_painting(view_id)
+        PYLINTER_ERRORS.pop(view_id, None)
+        PYLINTER_VIEWS.pop(view_id, None)
+        cls._snapshots.pop(view_id, None)
+        cls._dropped.discard(view_id)
+        cls._last_used.pop(view_id, None)
 
 
 class PylinterCommand(sublime_plugin.TextCommand):
+    # view id -> the marker drawing job in progress, see `show_errors`
+    _painting = {}
 
     def run(self, edit, **kwargs):
         """ Run a Pylinter command """
-        settings = PylSet.read_settings()
+        if engine.PYLINT_VERSION is None:
+            # Try again once we know which Pylint we're dealing with
+            PylintProbe.when_ready(
+                lambda: self.view.run_command('pylinter', kwargs))
+            return
+
+        DiagnosticBudget.restore(self.view)
+
+        started = stats.clock()
+        settings = PylSet.read_settings(self.view)
+        settings_time = stats.clock() - started
 
         if not settings:
             return
 
+        def submit(thread):
+            """ Schedule a run, accounting for the time spent on settings """
+            thread.stats.add("settings", settings_time)
+            LintScheduler.submit(thread)
+            return thread
+
         action = kwargs.get('action', None)
+        idle_profile = PylSet.get_or('idle_profile', None, self.view)
 
         if action == 'toggle':
             self.toggle_regions()
         elif action == 'list':
-            self.popup_error_list()
+            self.popup_error_list(kwargs.get('filter', ''))
+        elif action == 'filter':
+            self.popup_filter_list()
+        elif action == 'next':
+            self.goto_error(forward=True)
+        elif action == 'previous':
+            self.goto_error(forward=False)
         elif action == 'dump':
             self.dump_errors()
+        elif action == 'clear_cache':
+            self.clear_cache()
+        elif action == 'stats':
+            self.show_stats()
+        elif action == 'profile':
+            if self.view.file_name().endswith('.py'):
+                target = kwargs.get('target',
+                                    PylSet.get_or('target_latency', 1.0,
+                                                  self.view))
+                sublime.status_message("Pylinter: profiling %s" %
+                                       os.path.basename(self.view.file_name()))
+                submit(ProfileThread(self.view, settings, target,
+                                     kwargs.get('cprofile', False)))
+        elif action == 'restore':
+            if self.view.file_name().endswith('.py'):
+                submit(PylintThread(self.view, *settings, cache_only=True,
+                                    profile=idle_profile))
+        elif action == 'live':
+            if self.view.file_name().endswith('.py'):
+                content = self.view.substr(sublime.Region(0, self.view.size()))
+                self.start_quick_check(
+                    submit(PylintThread(self.view, *settings,
+                                        content=content,
+                                        profile=get_save_profile(self.view))))
         elif action == 'ignore':
             if not ST3:
                 edit = self.view.begin_edit()
@@ -291,20 +679,76 @@ class PylinterCommand(sublime_plugin.TextCommand):
             speak("Running Pylinter on %s" % self.view.file_name())
 
             if self.view.file_name().endswith('.py'):
-                thread = PylintThread(self.view, *settings)
-                thread.start()
-                self.progress_tracker(thread)
+                thread = PylintThread(self.view, *settings,
+                                      profile=kwargs.get('profile',
+                                                         idle_profile))
+                if kwargs.get('background'):
+                    thread.priority = LintScheduler.LOW
+                submit(thread)
+                if not kwargs.get('background'):
+                    self.start_quick_check(thread)
+                    self.progress_tracker(thread)
+
+    def start_quick_check(self, thread):
+        """ Run the quick check for a lint run alongside Pylint, unless it's
+        disabled """
+        if PylSet.get_or('quick_check', True, self.view):
+            QuickCheckThread(thread).start()
 
     def dump_errors(self):
         """ Print the found pylint errors """
         import pprint
-        pprint.pprint(PYLINTER_ERRORS)
+        pprint.pprint(dict((view_id, [str(d) for d in store])
+                           for view_id, store in PYLINTER_ERRORS.items()))
+
+    def show_stats(self):
+        """ Show the timing statistics of the recent runs in a panel """
+        window = self.view.window()
+        # Both start out with an empty panel
+        if ST3:
+            panel = window.create_output_panel("pylinter_stats")
+        else:
+            panel = window.get_output_panel("pylinter_stats")
+        views, live, snapshots, snapshot_size = DiagnosticBudget.usage()
+        append_to_panel(panel, STATS_HISTORY.report() + (
+            "\nDiagnostics in memory: %d views, %s; %d snapshots, %s; "
+            "budget %s MiB\n" % (views, stats.format_size(live), snapshots,
+                                  stats.format_size(snapshot_size),
+                                  PylSet.get_or('memory_budget', 50))))
+        window.run_command("show_panel", {"panel": "output.pylinter_stats"})
+
+    @staticmethod
+    def show_profile(window, report):
+        """ Show the report of a `ProfileThread` in a panel """
+        if ST3:
+            panel = window.create_output_panel("pylinter_profile")
+        else:
+            panel = window.get_output_panel("pylinter_profile")
+        append_to_panel(panel, report)
+        window.run_command("show_panel", {"panel": "output.pylinter_profile"})
+
+    def clear_cache(self):
+        """ Remove all cached Pylint results """
+        cache = get_result_cache()
+        if cache:
+            cache.clear()
+            speak("Cleared result cache at %s" % cache.directory)
+        sublime.status_message("Pylinter: result cache cleared")
 
     @classmethod
     def show_errors(cls, view):
-        """ Display the errors for the given view """
+        """ Display the errors for the given view.
+
+        Only the categories whose markers differ from the ones already drawn
+        are updated, and the regions of lines or spans that are already marked
+        are reused as long as the buffer hasn't changed since.
+
+        The regions are worked out in slices that take at most
+        `FRAME_BUDGET`, the main thread is yielded between slices. A newer
+        call for the same view takes over from a job that is in progress.
+        """
         # Icons to be used in the margin
-        if PylSet.get_or('use_icons', False):
+        if PylSet.get_or('use_icons', False, view):
             if ST3:
                 icons = {"C": "Packages/Pylinter/icons/convention.png",
                          "E": "Packages/Pylinter/icons/error.png",
@@ -327,75 +771,240 @@ class PylinterCommand(sublime_plugin.TextCommand):
                      "R": "dot",
                      "W": "dot"}
 
-        if PylSet.get_or('disable_outline', False):
+        if PylSet.get_or('disable_outline', False, view):
             region_flag = sublime.HIDDEN
         else:
             region_flag = sublime.DRAW_OUTLINED
 
-        outlines = {"C": [], "E": [], "F": [], "I": [], "R": [], "W": []}
+        view_id = view.id()
+        store = PYLINTER_ERRORS[view_id]
+        if PylSet.get_or('highlight_spans', True, view):
+            markers = store.spans_by_category()
+        else:
+            markers = store.lines_by_category()
+        state = PYLINTER_VIEWS.setdefault(view_id, ViewState())
+
+        job = cls._draw_markers(view, store, state, markers, icons,
+                                region_flag)
+        cls._painting[view_id] = job
+        cls._continue_painting(view, job)
 
-        for line_num, error in PYLINTER_ERRORS[view.id()].items():
-            if not isinstance(line_num, int):
+    @classmethod
+    def _continue_painting(cls, view, job):
+        """ Run a drawing job for one slice, and schedule the next one """
+        view_id = view.id()
+        if cls._painting.get(view_id) is not job:
+            # Superseded or stopped
+            return
+
+        deadline = stats.clock() + FRAME_BUDGET
+        for restart in job:
+            if restart:
+                # The buffer changed in the meantime
+                cls.show_errors(view)
+                return
+            if stats.clock() >= deadline:
+                sublime.set_timeout(lambda: cls._continue_painting(view, job),
+                                    0)
+                return
+        del cls._painting[view_id]
+
+    @classmethod
+    def stop_painting(cls, view_id):
+        """ Abandon the drawing job of a view, if any """
+        cls._painting.pop(view_id, None)
+
+    @classmethod
+    def _draw_markers(cls, view, store, state, markers, icons, region_flag):
+        """ Draw the markers that changed, see `show_errors`. Yields every
+        `MARKER_SLICE` markers: True if the job must be started over, since
+        the buffer has changed. """
+        change_count = view.change_count()
+
+        for key in CATEGORIES:
+            key_markers = markers.get(key, [])
+            drawn = state.drawn.get(key)
+            if drawn is not None and drawn[:3] == (key_markers, icons[key],
+                                                   region_flag):
                 continue
-            line = view.line(view.text_point(line_num, 0))
-            outlines[error[0]].append(line)
 
-        for key, regions in outlines.items():
+            known = {}
+            if drawn is not None and drawn[3] == change_count:
+                known = dict(zip(drawn[0], drawn[4]))
+
+            regions = []
+            for start in range(0, len(key_markers), MARKER_SLICE):
+                if start:
+                    yield view.change_count() != change_count
+                regions.extend(known.get(marker) or
+                               cls.get_marker_region(view, marker)
+                               for marker in
+                               key_markers[start:start + MARKER_SLICE])
             view.add_regions('pylinter.' + key, regions,
                              'pylinter.' + key, icons[key],
                              region_flag)
-
-    def popup_error_list(self):
-        """ Display a popup list of the errors found """
+            state.drawn[key] = (key_markers, icons[key], region_flag,
+                                change_count, regions)
+            yield False
+
+        lines = store.lines()
+        if state.anchored != lines:
+            anchors = []
+            for start in range(0, len(lines), MARKER_SLICE):
+                if start:
+                    yield view.change_count() != change_count
+                anchors.extend(view.line(view.text_point(line, 0))
+                               for line in lines[start:start + MARKER_SLICE])
+            view.add_regions(ANCHOR_KEY, anchors, '', '', sublime.HIDDEN)
+            state.anchored = list(lines)
+            state.line_count = view.rowcol(view.size())[0]
+
+    @staticmethod
+    def get_marker_region(view, marker):
+        """ Return the region to mark for a line number or a span, see
+        `Diagnostic.span` """
+        if not isinstance(marker, tuple):
+            return view.line(view.text_point(marker, 0))
+
+        line, column, end_line, end_column = marker
+        start = view.text_point(line, column)
+        if end_column < 0:
+            end = view.line(start).end()
+        else:
+            end = view.text_point(end_line, end_column)
+        if column == 0 and end_column < 0 or end <= start:
+            # Nothing more precise than the line itself
+            return view.line(start)
+        return sublime.Region(start, end)
+
+    def popup_error_list(self, msg_filter=''):
+        """ Display a popup list of the errors found, optionally only those
+        whose message id starts with `msg_filter`, e.g. "E" or "W0611" """
         view_id = self.view.id()
 
         if not view_id in PYLINTER_ERRORS:
             return
 
         # No errors were found
-        if len(PYLINTER_ERRORS[view_id]) == 1:
+        if not PYLINTER_ERRORS[view_id]:
             sublime.message_dialog("No Pylint errors found")
             return
 
-        errors = [(key + 1, value)
-                  for key, value in PYLINTER_ERRORS[view_id].items()
-                  if key != 'visible']
-        line_nums, panel_items = zip(*sorted(errors,
-                                             key=lambda error: error[1]))
+        diagnostics, panel_items = PYLINTER_ERRORS[view_id].in_id_order(
+            msg_filter)
+        if not diagnostics:
+            sublime.status_message("No %s Pylint errors found" % msg_filter)
+            return
 
         def on_done(selected_item):
             """ Jump to the line of the item that was selected from the list """
             if selected_item == -1:
                 return
-            self.view.run_command("goto_line",
-                                  {"line": line_nums[selected_item]})
+            self.goto_diagnostic(diagnostics[selected_item])
+
+        self.view.window().show_quick_panel(panel_items, on_done)
 
-        self.view.window().show_quick_panel(list(panel_items), on_done)
+    def popup_filter_list(self):
+        """ Let the user pick a category or message id, then display the
+        errors of that kind """
+        view_id = self.view.id()
+        if not PYLINTER_ERRORS.get(view_id):
+            sublime.message_dialog("No Pylint errors found")
+            return
+
+        store = PYLINTER_ERRORS[view_id]
+        filters = [""]
+        items = ["All (%d)" % len(store)]
+        for category in CATEGORIES:
+            count = len(store.by_category(category))
+            if count:
+                filters.append(category)
+                items.append("%s (%d)" % (category, count))
+        for msg_id, symbol, count in store.id_counts():
+            filters.append(msg_id)
+            if symbol:
+                items.append("%s %s (%d)" % (msg_id, symbol, count))
+            else:
+                items.append("%s (%d)" % (msg_id, count))
+
+        def on_done(selected_item):
+            if selected_item != -1:
+                # Let the first panel close before opening the next one
+                sublime.set_timeout(lambda: self.popup_error_list(
+                    filters[selected_item]), 10)
+
+        self.view.window().show_quick_panel(items, on_done)
+
+    def goto_error(self, forward):
+        """ Move the caret to the next or previous line with errors """
+        store = PYLINTER_ERRORS.get(self.view.id())
+        if not store:
+            sublime.status_message("No Pylint errors found")
+            return
+
+        current = self.view.rowcol(self.view.sel()[0].begin())[0]
+        if forward:
+            line = store.next_line(current)
+        else:
+            line = store.previous_line(current)
+        self.goto_diagnostic(store.at_line(line)[0])
+        sublime.status_message(" | ".join(str(diagnostic) for diagnostic
+                                          in store.at_line(line)))
+
+    def goto_diagnostic(self, diagnostic):
+        """ Put the caret on the code a diagnostic is about """
+        point = self.view.text_point(diagnostic.line, diagnostic.column)
+        selection = self.view.sel()
+        selection.clear()
+        selection.add(sublime.Region(point))
+        self.view.show_at_center(point)
 
     def progress_tracker(self, thread, i=0):
         """ Display spinner while Pylint is running """
         icons = [u"◐", u"◓", u"◑", u"◒"]
-        sublime.status_message("PyLinting %s" % icons[i])
-        if thread.is_alive():
+        left = thread.time_left()
+        if left is not None and left >= 1:
+            # As judged by the recent runs of the file
+            sublime.status_message("PyLinting %s (about %d s left)" % (
+                icons[i], int(left + 0.5)))
+        else:
+            sublime.status_message("PyLinting %s" % icons[i])
+        if not thread.finished.is_set():
             i = (i + 1) % 4
             sublime.set_timeout(lambda: self.progress_tracker(thread, i), 100)
+        elif thread.limit_hit:
+            sublime.status_message("Pylinter: " + thread.describe_limit())
         else:
             sublime.status_message("")
 
     def toggle_regions(self):
         """ Show/hide the errors found """
         view_id = self.view.id()
-        try:
-            if PYLINTER_ERRORS[view_id]['visible']:
-                speak("Hiding errors")
-                for category in ["C", "E", "F", "I", "R", "W"]:
-                    self.view.erase_regions('pylinter.' + category)
-            else:
-                speak("Showing errors")
-                self.show_errors(self.view)
-            PYLINTER_ERRORS[view_id]['visible'] ^= True
-        except KeyError:
-            pass
+        state = PYLINTER_VIEWS.get(view_id)
+        if state is None or view_id not in PYLINTER_ERRORS:
+            return
+
+        if state.visible:
+            speak("Hiding errors")
+            self.stop_painting(view_id)
+            # Remember where the markers were; Sublime Text has kept their
+            # regions up to date with any edits
+            for category, drawn in state.drawn.items():
+                key = 'pylinter.' + category
+                state.hidden[category] = drawn[:3] + (
+                    None, self.view.get_regions(key))
+                self.view.erase_regions(key)
+            state.drawn = {}
+        else:
+            speak("Showing errors")
+            for category, hidden in state.hidden.items():
+                key = 'pylinter.' + category
+                self.view.add_regions(key, hidden[4], key, hidden[1],
+                                      hidden[2])
+            state.drawn, state.hidden = state.hidden, {}
+            # Update whatever changed while the markers were hidden
+            self.show_errors(self.view)
+        state.visible ^= True
 
     def add_ignore(self, edit):
         """ Make pylint ignore the line that the carret is on """
@@ -409,13 +1018,17 @@ class PylinterCommand(sublime_plugin.TextCommand):
         pylint_statement = "".join(("#", "pyl", "int: ", "disable="))
 
         # If an error is registered for that line
-        if current_line in PYLINTER_ERRORS[view_id]:
+        store = PYLINTER_ERRORS.get(view_id)
+        if store is not None and current_line in store:
             #print position
             line_region = self.view.line(point)
             line_txt = self.view.substr(line_region)
 
-            err_code = PYLINTER_ERRORS[view_id][current_line]
-            err_code = err_code[:err_code.find(':')]
+            err_codes = []
+            for diagnostic in store.at_line(current_line):
+                if diagnostic.msg_id not in err_codes:
+                    err_codes.append(diagnostic.msg_id)
+            err_code = ",".join(err_codes)
 
             if pylint_statement not in line_txt:
                 line_txt += " " + pylint_statement + err_code
@@ -433,132 +1046,912 @@ class PylinterCommand(sublime_plugin.TextCommand):
         return False
 
 
-class PylintThread(threading.Thread):
+class PylintRunner(engine.LintRunner, threading.Thread):
+    """ The base class of the threads that run Pylint. The settings that
+    aren't passed in are those of the given view, or the active view. """
+
+    def __init__(self, pbin, ppath, cwd, lpath, lrc, ignore, disable_msgs,
+                 extra_pylint_args, plugins, view=None):
+        options = engine.runner_options(
+            lambda name, default: PylSet.get_or(name, default, view))
+        engine.LintRunner.__init__(self, pbin, ppath, cwd, lpath, lrc, ignore,
+                                   disable_msgs, extra_pylint_args, plugins,
+                                   get_result_cache(view),
+                                   get_duration_history(view), **options)
+        threading.Thread.__init__(self)
+
+
+class ProfileThread(PylintRunner):
+    """ Lints a file with the time spent by every checker measured, and shows
+    the ranked timings, see `checkerprofile`. It's scheduled like a lint run
+    of the view, see `LintScheduler`. """
+
+    def __init__(self, view, settings, target, use_cprofile=False):
+        self.window = view.window()
+        self.file_name = view.file_name()
+        self.view_id = view.id()
+        # Set by the scheduler
+        self.generation = None
+        self.priority = LintScheduler.NORMAL
+        self.cache_only = False
+        # The latency, in seconds, to suggest messages to disable for
+        self.target = target
+        PylintRunner.__init__(self, *settings, view=view)
+        self.profile_checkers = "cprofile" if use_cprofile else "checkers"
+        self.estimate = self.history.estimate(self.file_name,
+                                              self.duration_key(),
+                                              view.size())
+
+    def run(self):
+        report = None
+        try:
+            report = self.run_profile()
+        except engine.PylintCancelled:
+            speak("Profiling of %s was cancelled" % self.file_name)
+        except Exception as exc:  # pylint: disable=W0703
+            report = "Could not profile %s: %s\n" % (self.file_name, exc)
+        finally:
+            self.finished.set()
+            LintScheduler.done(self)
+        if report is not None:
+            sublime.set_timeout(
+                lambda: PylinterCommand.show_profile(self.window, report), 0)
+
+    def run_profile(self):
+        """ Lint the file and return the report """
+        message_count = [0]
+
+        def on_message(message):
+            message_count[0] += 1
+
+        # Always run Pylint, the cached results have no timings
+        result = self.run_worker(self.get_options(), [self.file_name], None,
+                                 on_message)
+        if result is None or self.checker_profile is None:
+            return ("Could not profile %s, profiling needs a Pylint worker\n" %
+                    self.file_name)
+
+        profile = checkerprofile.CheckerProfile(self.checker_profile,
+                                                self.plugins)
+        return "Profile of %s, %d messages\n\n%s" % (
+            self.file_name, message_count[0], profile.report(self.target))
+
+
+class QuickCheckThread(threading.Thread):
+    """ Checks the code being linted by a `PylintThread` for syntax errors
+    and undefined names, see `quickcheck`, so those can be shown before
+    Pylint has finished """
+
+    def __init__(self, lint_thread):
+        self.lint_thread = lint_thread
+        threading.Thread.__init__(self)
+
+    def run(self):
+        thread = self.lint_thread
+        try:
+            if thread.content is not None:
+                source = thread.content.encode("utf-8")
+            else:
+                with open(thread.file_name, "rb") as source_file:
+                    source = source_file.read()
+        except (IOError, OSError):
+            return
+
+        messages = quickcheck.check(
+            source, engine.get_python_version(thread.python_bin))
+        sublime.set_timeout(lambda: thread.process_quick(messages), 0)
+
+
+class PylintThread(PylintRunner):
     """ This class creates a seperate thread to run Pylint in """
 
     def __init__(self, view, pbin, ppath, cwd, lpath, lrc, ignore,
-                 disable_msgs, extra_pylint_args, plugins):
+                 disable_msgs, extra_pylint_args, plugins, cache_only=False,
+                 content=None, profile=None, force=False):
         self.view = view
         # Grab the file name here, since view cannot be accessed
         # from anywhere but the main application thread
         self.file_name = view.file_name()
-        self.python_bin = pbin
-        self.python_path = ppath
-        self.working_dir = cwd
-        self.pylint_path = lpath
-        self.pylint_rc = lrc
-        self.ignore = ignore
-        self.disable_msgs = disable_msgs
-        self.extra_pylint_args = extra_pylint_args
-        self.plugins = plugins
-
-        threading.Thread.__init__(self)
+        self.view_id = view.id()
+        self.change_count = view.change_count()
+        # Set by the scheduler, see `LintScheduler.is_current`
+        self.generation = None
+        self.priority = LintScheduler.NORMAL
+        # Only look for cached results, don't run Pylint
+        self.cache_only = cache_only
+        # Run Pylint even if there are cached results, which don't account
+        # for changes to the modules the file imports
+        self.force = force
+        # The unsaved buffer contents to lint instead of the file on disk
+        self.content = content
+        # Set once the complete results have been handed to the main thread
+        self.completed = False
+        # The results shown before the run, and the diagnostics of the run
+        # that came in so far, see `handle_batch`
+        self.previous = None
+        self.streamed = []
+        self._stream_lock = threading.Lock()
+        self.highlight_spans = PylSet.get_or('highlight_spans', True, view)
+
+        PylintRunner.__init__(self, pbin, ppath, cwd, lpath, lrc, ignore,
+                              disable_msgs, extra_pylint_args, plugins,
+                              view=view)
+        self.stats.file_name = self.file_name
+
+        # The name of the lint profile, which becomes the origin of the
+        # diagnostics. A profile that only enables some checkers has its
+        # results merged with those of other profiles, instead of replacing
+        # them.
+        self.profile = profile
+        if profile:
+            profiles = PylSet.get_or('profiles', {}, view)
+            if profile in profiles:
+                self.profile_options = profiles[profile] or {}
+            else:
+                speak("Unknown lint profile %s" % profile)
+        self.origin = profile or "pylint"
+        self.partial = bool(self.profile_options.get('enable'))
+
+        # How long Pylint is expected to take, judging by the recent runs,
+        # and the estimate the scheduler goes by, which falls back on the
+        # size of the file
+        key = self.duration_key()
+        self.expected = self.history.expected(self.file_name, key)
+        self.estimate = self.history.estimate(
+            self.file_name, key,
+            view.size() if content is None else len(content))
+        # When Pylint was started, if it was, see `duration_mark`
+        self.lint_started = None
+
+    def in_background(self):
+        return self.lower_priority and self.priority == LintScheduler.LOW
+
+    def time_left(self):
+        """ Return the number of seconds Pylint is expected to take still, or
+        None if that isn't known """
+        if self.expected is None:
+            return None
+        if self.lint_started is None:
+            return self.expected
+        return max(0.0, self.expected -
+                   (stats.clock() - self.lint_started[0]))
 
     def run(self):
         """ Run the pylint command """
-        if self.pylint_path:
-            command = [self.python_bin, self.pylint_path]
-        else:
-            command = list(DEFAULT_PYLINT_COMMAND)
+        self.stats.add("queue", stats.clock() - self.stats.started)
+        try:
+            self.lint()
+        finally:
+            self.finished.set()
+            LintScheduler.done(self)
+
+    def lint(self):
+        """ Lint the file and hand the results to the main thread """
+        options = self.get_options()
+
+        started = stats.clock()
+        cache_key = self.get_cache_key(self.file_name, self.content, options)
+        cached = None
+        if cache_key and not self.force:
+            cached = self.cache.get(cache_key)
+        self.stats.add("cache", stats.clock() - started)
+        if cached is not None:
+            speak("Using cached results for %s" % self.file_name)
+            self.stats.mode = "cache"
+            self.handle_messages(cached["messages"], [])
+            return
+        if self.cache_only:
+            messages = ProjectLint.get_results(self.file_name)
+            if messages is not None:
+                self.stats.mode = "project"
+                self.handle_messages(messages, [])
+            return
 
-        if PYLINT_VERSION[0] == 0:
-            options = ['--output-format=parseable',
-                       '--include-ids=y']
+        speak("Running command with Pylint", str(engine.PYLINT_VERSION))
+        # Have the results to lay the first messages over ready by the time
+        # they come in
+        sublime.set_timeout(self.capture_previous, 0)
+
+        temp_file = None
+        if self.content is None:
+            targets, stdin = [self.file_name], None
+        elif engine.PYLINT_VERSION >= (2, 4, 0):
+            # Pylint reads the source from stdin, but treats it as the real
+            # module, so imports (relative ones included) resolve as usual
+            targets, stdin = ['--from-stdin', self.file_name], self.content
         else:
-            options = ['--reports=n',
-                       PYLINT_FORMAT]
+            temp_file = self.write_temp_file()
+            if temp_file is None:
+                return
+            targets, stdin = [temp_file], None
+
+        messages = []
+        batch = []
+        last_batch = [time.time()]
+
+        def on_message(message):
+            """ Collect the messages, and hand them over to the main thread in
+            small batches while Pylint is still running """
+            messages.append(message[1:])
+            batch.append(message[1:])
+            now = time.time()
+            if now - last_batch[0] >= BATCH_INTERVAL:
+                last_batch[0] = now
+                self.handle_batch(list(batch))
+                del batch[:]
+
+        watchdog = None
+        if self.timeout:
+            watchdog = threading.Timer(self.timeout, self.expire)
+            watchdog.start()
+
+        self.lint_started = self.duration_mark()
+        try:
+            eoutput = None
+            if self.use_worker:
+                eoutput = self.run_worker(options, targets, stdin,
+                                          on_message)
+            if eoutput is None:
+                eoutput = self.run_process(options, targets, stdin,
+                                           on_message)
+        except engine.PylintCancelled:
+            if self.limit_hit is None:
+                speak("Run for %s was cancelled" % self.file_name)
+                return
+            # A run that hit a limit took at least this long
+            self.record_duration([self.file_name], self.lint_started,
+                                 self.content)
+            # Keep the results that came in before the run was stopped
+            if batch:
+                self.handle_batch(list(batch))
+            sublime.set_timeout(self.process_limit, 0)
+            return
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            if temp_file:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
+        self.record_duration([self.file_name], self.lint_started,
+                             self.content)
+
+        elines = eoutput.split('\n')  # pylint:disable=E1103
+        self.check_memory_error(eoutput)
+        for message in messages:
+            if message[1] == "F":
+                # Pylint reports crashes while checking a module as fatal
+                # messages
+                self.check_memory_error(message[3])
+
+        # Results are only worth keeping if Pylint did not fail
+        if (cache_key and not self.get_fatal_error(elines) and
+                self.limit_hit is None):
+            self.cache.put(cache_key, {"messages": messages})
+
+        self.handle_messages(messages, elines)
+
+    def capture_previous(self):
+        """ Keep the results shown before the run, for `handle_batch`. Called
+        from the main thread. """
+        if self.previous is not None or not LintScheduler.is_current(self):
+            return
+        # Lay the results over the previous ones, even if they have been
+        # evicted
+        DiagnosticBudget.restore(self.view)
+        # A copy, since the main thread may change the shown store
+        previous = DiagnosticStore(PYLINTER_ERRORS.get(self.view_id, ()))
+        with self._stream_lock:
+            self.previous = previous
+
+    def handle_batch(self, batch):
+        """ Lay some of the results over the previous ones, and hand them
+        over to the main thread, while Pylint is still running.
+
+        The messages are laid over the results of the previous run, which are
+        only replaced once the run has finished, so markers don't flicker.
+        Where the run reports a message id on a line, it replaces what the
+        previous run reported there, see `DiagnosticStore.overlay`. Messages
+        that come in before the previous results are known, see
+        `capture_previous`, are shown along with the next batch.
+        """
+        if self.cancelled and self.limit_hit is None:
+            return
+        started = stats.clock()
+        diagnostics = self.make_diagnostics(batch, self.origin)
+        with self._stream_lock:
+            self.streamed.extend(diagnostics)
+            previous = self.previous
+            streamed = list(self.streamed)
+        if previous is None:
+            return
+        store = previous.overlay(streamed)
+        self.index_markers(store)
+        self.stats.add("parse", stats.clock() - started)
+        sublime.set_timeout(lambda: self.process_batch(store, previous), 0)
+
+    def index_markers(self, store):
+        """ Have the markers of a store worked out, rather than on the main
+        thread """
+        if self.highlight_spans:
+            store.spans_by_category()
+        else:
+            store.lines_by_category()
 
-            if self.plugins:
-                options.extend(["--load-plugins",
-                                ",".join(self.plugins)])
+    def handle_messages(self, messages, elines):
+        """ Index the results, and hand them over to the main thread """
+        started = stats.clock()
+        store = DiagnosticStore(self.make_diagnostics(messages, self.origin))
+        self.index_markers(store)
+        self.stats.add("parse", stats.clock() - started)
 
-        if self.pylint_rc:
-            options.append('--rcfile=%s' % self.pylint_rc)
+        if engine.VERBOSE:
+            for diagnostic in store:
+                speak(str(diagnostic))
 
-        if self.disable_msgs:
-            options.append('--disable=%s' % self.disable_msgs)
+        # Call set_timeout to have the error processing done
+        # from the main thread
+        sublime.set_timeout(
+            lambda: self.process_errors(store, len(messages), elines), 0)
 
-        options.append(self.file_name)
-        command.extend(options)
+    def write_temp_file(self):
+        """ Write the buffer contents to a private file next to the real one.
 
-        self.set_path()
+        Older Pylint versions can't read from stdin. Putting the copy in the
+        same directory keeps its imports resolving like the real module's.
+        """
+        directory, base_name = os.path.split(self.file_name)
+        temp_file = os.path.join(directory, "_pylinter_%d_%s" % (os.getpid(),
+                                                                 base_name))
+        try:
+            with open(temp_file, "wb") as temp:
+                temp.write(self.content.encode("utf-8"))
+        except (IOError, OSError) as exc:
+            speak("Could not write %s: %s" % (temp_file, exc))
+            return None
+        return temp_file
+
+    def process_batch(self, store, previous):
+        """ Show the first results of a run that is still in progress, as
+        laid over the `previous` results by `handle_batch` """
+        if (not LintScheduler.is_current(self) or
+                self.cancelled and self.limit_hit is None):
+            return
+        if previous is not self.previous:
+            # The quick check's results came in since, and were shown along
+            # with these, see `process_quick`
+            return
 
-        speak("Running command with Pylint", str(PYLINT_VERSION))
-        speak(" ".join(command))
+        started = stats.clock()
+        DiagnosticBudget.restore(self.view)
+        PYLINTER_ERRORS[self.view_id] = store
+        state = PYLINTER_VIEWS.setdefault(self.view_id, ViewState())
+
+        if state.visible:
+            PylinterCommand.show_errors(self.view)
+        self.stats.add("render", stats.clock() - started)
+
+    def process_limit(self):
+        """ Tell the user the run was stopped by one of its limits. The
+        results that came in before are kept on top of the previous ones, see
+        `process_batch`. """
+        self.completed = True
+        if not LintScheduler.is_current(self):
+            return
+        message = "%s: %s" % (os.path.basename(self.file_name),
+                              self.describe_limit())
+        speak(message)
+        sublime.status_message("Pylinter: " + message)
+
+    def make_diagnostics(self, messages, origin):
+        """ Return the diagnostics of the messages of the types that aren't
+        ignored """
+        return [Diagnostic.from_message(message, origin)
+                for message in messages
+                if message[1].lower() not in self.ignore]
+
+    def process_quick(self, messages):
+        """ Show the results of the quick check, see `QuickCheckThread`.
+
+        They replace those of an earlier quick check, but are added to the
+        previous Pylint results, which Pylint's messages on the same line and
+        with the same id take precedence over. Once the run has finished, its
+        results replace these.
+        """
+        if (self.completed or self.cancelled or
+                not LintScheduler.is_current(self)):
+            return
+        if (self.content is not None and
+                self.view.change_count() != self.change_count):
+            return
 
-        p = subprocess.Popen(command,
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             startupinfo=STARTUPINFO,
-                             cwd=self.working_dir)
-        output, eoutput = p.communicate()
+        DiagnosticBudget.restore(self.view)
+        quick = self.make_diagnostics(messages, "quick")
+        if self.previous is not None:
+            # Lay the run's own results over these. The previous results are
+            # replaced rather than changed, since the lint thread reads them.
+            previous = DiagnosticStore(self.previous)
+            previous.merge(quick, replace=("quick",))
+            with self._stream_lock:
+                self.previous = previous
+                streamed = list(self.streamed)
+            PYLINTER_ERRORS[self.view_id] = previous.overlay(streamed)
+        else:
+            store = PYLINTER_ERRORS.setdefault(self.view_id,
+                                               DiagnosticStore())
+            store.merge(quick, replace=("quick",))
+        state = PYLINTER_VIEWS.setdefault(self.view_id, ViewState())
+        speak("Quick check found %d errors in %s" % (len(messages),
+                                                     self.file_name))
+
+        if state.visible:
+            PylinterCommand.show_errors(self.view)
+
+    def process_errors(self, found, message_count, errlines):
+        """ Show the diagnostics found, as indexed by `handle_messages` """
+        self.completed = True
+        # Drop results that a newer run will replace
+        if not LintScheduler.is_current(self):
+            speak("Dropping outdated results for %s" % self.file_name)
+            return
+        if (self.content is not None and
+                self.view.change_count() != self.change_count):
+            speak("Dropping results for modified buffer %s" % self.file_name)
+            return
 
-        if PYTHON_VERSION == 2:
-            lines = [line for line in output.split('\n')]  # pylint: disable=E1103
-            elines = [line for line in eoutput.split('\n')]  # pylint:disable=E1103
+        started = stats.clock()
+        view_id = self.view.id()
+        if self.partial:
+            DiagnosticBudget.restore(self.view)
+        if self.partial and view_id in PYLINTER_ERRORS:
+            # Keep what other profiles found
+            store = PYLINTER_ERRORS[view_id]
+            store.merge(found, replace=("quick", self.origin))
         else:
-            lines = [line for line in output.decode().split('\n')]  # pylint: disable=E1103
-            elines = [line for line in eoutput.decode().split('\n')]  # pylint:disable=E1103
+            store = found
+        PYLINTER_ERRORS[view_id] = store
+        state = PYLINTER_VIEWS.setdefault(view_id, ViewState())
+        if not state.visible:
+            state.visible = True
+            state.hidden = {}
+        DiagnosticBudget.stored(view_id)
 
-        # Call set_timeout to have the error processing done
-        # from the main thread
-        sublime.set_timeout(lambda: self.process_errors(lines, elines), 100)
+        # if pylint raised any exceptions, propogate those to the user, for
+        # instance, trying to disable a messaage id that does not exist
+        err = self.get_fatal_error(errlines)
+        if err:
+            sublime.error_message("Fatal pylint error:\n%s" % err)
 
-    def set_path(self):
-        """ Adjust the PYTHONPATH variable for this thread """
-        original = os.environ.get('PYTHONPATH', '')
+        if not store:
+            speak("No errors found")
 
-        speak("Current PYTHONPATH is '%s'" % original)
+        if self.limit_hit:
+            speak(self.describe_limit())
+            sublime.status_message("Pylinter: %s: %s" % (
+                os.path.basename(self.file_name), self.describe_limit()))
 
-        org_path_lst = [p for p in re.split(SEPERATOR_PATTERN, original) if p]
-        pyl_path_lst = [p for p in re.split(SEPERATOR_PATTERN,
-                                            self.python_path) if p]
+        PylinterCommand.show_errors(self.view)
+        self.record_stats(message_count, stats.clock() - started)
 
-        pythonpaths = set(org_path_lst + pyl_path_lst)
-        os.environ['PYTHONPATH'] = PATH_SEPERATOR.join(pythonpaths)
+    def record_stats(self, message_count, render_time):
+        """ Complete the statistics of the run and keep them """
+        run_stats = self.stats
+        run_stats.add("render", render_time)
+        run_stats.messages = message_count
+        run_stats.finish()
+        speak("Timing for %s: %s" % (self.file_name, run_stats.summary()))
 
-        speak("Updated PYTHONPATH is '{0}'".format(os.environ['PYTHONPATH']))
+        log_file = PylSet.get_or('stats_log', None, self.view)
+        try:
+            STATS_HISTORY.record(run_stats, log_file)
+        except (IOError, OSError) as exc:
+            speak("Could not write to %s: %s" % (log_file, exc))
 
 
-    def process_errors(self, lines, errlines):
-        """ Process the error found """
-        view_id = self.view.id()
-        PYLINTER_ERRORS[view_id] = {"visible": True}
+class ProjectLintThread(PylintRunner):
+    """ A thread that lints shards of project files until none are left """
 
-        # if pylint raised any exceptions, propogate those to the user, for
-        # instance, trying to disable a messaage id that does not exist
-        if len(errlines) > 1:
-            err = errlines[-2]
-            if not err.startswith("No config file found"):
-                sublime.error_message("Fatal pylint error:\n%s" % (errlines[-2]))
-
-        for line in lines:
-            mdic = re.match(P_PYLINT_ERROR, line)
-            if mdic:
-                m = mdic.groupdict()
-                line_num = int(m['line']) - 1
-                if m['type'].lower() not in self.ignore:
-                    PYLINTER_ERRORS[view_id][line_num] = \
-                        "%s%s: %s " % (m['type'], m['errno'],
-                        m['msg'].strip())
-                    speak(PYLINTER_ERRORS[view_id][line_num])
-
-        if len(PYLINTER_ERRORS[view_id]) <= 1:
-            speak("No errors found")
+    def __init__(self, project, job, *settings):
+        self.project = project
+        # The number of the thread, which has a queue of shards of its own
+        self.job = job
+        PylintRunner.__init__(self, *settings)
 
-        PylinterCommand.show_errors(self.view)
+    def run(self):
+        try:
+            options = self.get_options()
+            while not self.cancelled:
+                shard = self.project.next_shard(self.job)
+                if shard is None:
+                    break
+                outcome = self.lint_files(shard, options)
+                if outcome is None:
+                    break
+                self.project.shard_done(shard, *outcome)
+        finally:
+            self.history.save()
+            self.finished.set()
+
+
+class ProjectLint(object):
+    """ Lint all Python files in the project folders.
+
+    The files are split into shards which are handed out to one thread per
+    CPU core, each running Pylint (or a Pylint worker) on a whole shard at a
+    time. The shards are planned by how long their files took to lint before,
+    see `durations.ShardQueues`. Results are collected in an output panel,
+    stored in the result cache and kept in memory, so files that are opened
+    later on immediately show their markers.
+    """
+    PANEL_NAME = "pylinter_project"
+    _lock = threading.Lock()
+    _threads = []
+    # The shards left to lint, a `durations.ShardQueues`
+    _queues = None
+    _window = None
+    _total = 0
+    _done = 0
+    _ignore = []
+    # normalized file name -> (modification time, messages)
+    _results = {}
+
+    @classmethod
+    def is_running(cls):
+        return any(not t.finished.is_set() for t in cls._threads)
+
+    @classmethod
+    def start(cls, window, settings):
+        """ Find the project's Python files and start linting them """
+        if cls.is_running():
+            sublime.status_message("Pylinter: the project is already being "
+                                   "linted")
+            return
+
+        folders = window.folders()
+        if not folders:
+            sublime.status_message("Pylinter: no project folders to lint")
+            return
+
+        exclude = PylSet.get_or('project_exclude', [])
+        shard_size = max(1, PylSet.get_or('project_shard_size', 20))
+        jobs = PylSet.get_or('project_jobs', 0) or multiprocessing.cpu_count()
+        slow_threshold = PylSet.get_or('slow_file_threshold', 5)
+
+        cls._window = window
+        cls._ignore = settings[5]
+        cls._threads = [ProjectLintThread(cls, job, *settings)
+                        for job in range(jobs)]
+        history = cls._threads[0].history
+        key = cls._threads[0].duration_key()
+
+        def collect():
+            files = sorted(engine.find_python_files(folders, exclude))
+            queues = durations.ShardQueues(history, files, key, jobs,
+                                           shard_size, slow_threshold)
+            with cls._lock:
+                cls._queues = queues
+                cls._total = len(files)
+                cls._done = 0
+            sublime.set_timeout(lambda: cls._begin(jobs), 0)
+
+        threading.Thread(target=collect).start()
+
+    @classmethod
+    def _begin(cls, jobs):
+        """ Start the lint threads, from the main thread """
+        panel = cls._get_panel()
+        append_to_panel(panel, "Pylinting %d files in %d processes\n\n" %
+                        (cls._total, jobs))
+        cls._window.run_command("show_panel",
+                                {"panel": "output." + cls.PANEL_NAME})
+        for thread in cls._threads:
+            thread.start()
+        cls._track_progress()
+
+    @classmethod
+    def _get_panel(cls):
+        if ST3:
+            panel = cls._window.find_output_panel(cls.PANEL_NAME)
+            if panel is None:
+                panel = cls._window.create_output_panel(cls.PANEL_NAME)
+        else:
+            panel = cls._window.get_output_panel(cls.PANEL_NAME)
+        panel.settings().set("result_file_regex",
+                             r"^(.+?):([0-9]+):([0-9]+): ")
+        return panel
+
+    @classmethod
+    def _track_progress(cls):
+        """ Show the progress in the status bar until all shards are done """
+        if cls.is_running():
+            progress = "linted %d of %d project files" % (cls._done,
+                                                          cls._total)
+            left = cls._queues.remaining()
+            if left >= 1:
+                progress += ", about %d s left" % int(left + 0.5)
+            sublime.status_message("Pylinter: " + progress)
+            sublime.set_timeout(cls._track_progress, 200)
+            return
+
+        cancelled = any(t.cancelled for t in cls._threads)
+        summary = "%s: linted %d of %d project files" % (
+            "Cancelled" if cancelled else "Done", cls._done, cls._total)
+        append_to_panel(cls._get_panel(), "\n" + summary + "\n")
+        sublime.status_message("Pylinter: " + summary.lower())
+        # The project lint started a worker per job, only keep as many as
+        # the lint runs of single files use
+        engine.WorkerPool.trim(max(1, PylSet.get_or('max_workers', 2)))
+
+        # Show the markers in the views that are already open
+        for view in cls._window.views():
+            file_name = view.file_name()
+            if (file_name and not view.is_dirty() and
+                    cls.get_results(file_name) is not None):
+                view.run_command('pylinter', {'action': 'restore'})
+
+    @classmethod
+    def next_shard(cls, job):
+        return cls._queues.next_shard(job)
+
+    @classmethod
+    def shard_done(cls, shard, results, error):
+        """ Store the results of a shard, called from the lint threads """
+        lines = []
+        if error:
+            lines.append("Pylint failed on %s: %s\n" % (", ".join(shard),
+                                                         error))
+        with cls._lock:
+            cls._done += len(shard)
+            for file_name in shard:
+                messages = results[file_name]
+                try:
+                    mtime = os.path.getmtime(file_name)
+                except OSError:
+                    continue
+                cls._results[os.path.normcase(file_name)] = (mtime, messages)
+                for message in sorted(messages, key=lambda m: m[:4]):
+                    line_num, err_type, errno, msg, column = message[:5]
+                    if err_type.lower() not in cls._ignore:
+                        lines.append("%s:%d:%d: %s%s: %s\n" % (
+                            file_name, line_num + 1, column + 1, err_type,
+                            errno, msg))
+
+        if lines:
+            text = "".join(lines)
+            sublime.set_timeout(
+                lambda: append_to_panel(cls._get_panel(), text), 0)
+
+    @classmethod
+    def get_results(cls, file_name):
+        """ Return the project lint messages for a file, if they are still
+        up to date """
+        file_name = os.path.normcase(os.path.normpath(file_name))
+        with cls._lock:
+            result = cls._results.get(file_name)
+        if result is None:
+            return None
+        try:
+            if os.path.getmtime(file_name) != result[0]:
+                return None
+        except OSError:
+            return None
+        return result[1]
+
+    @classmethod
+    def cancel(cls):
+        if cls._queues is not None:
+            cls._queues.clear()
+        for thread in cls._threads:
+            thread.cancel()
+
+
+def append_to_panel(panel, text):
+    """ Append text to an output panel """
+    if ST3:
+        panel.run_command('append', {'characters': text, 'force': True,
+                                     'scroll_to_end': True})
+    else:
+        edit = panel.begin_edit()
+        panel.insert(edit, panel.size(), text)
+        panel.end_edit(edit)
+
+
+def lint_dependents(view):
+    """ Re-lint the open views whose module imports the module of the given
+    view, directly or transitively, at low priority.
+
+    Only views that have markers are considered, since those are the ones
+    that could be showing stale results. The import graph is brought up to
+    date in a background thread.
+    """
+    saved = view.file_name()
+    candidates = {}
+    for window in sublime.windows():
+        for other in window.views():
+            file_name = other.file_name()
+            if (other.id() != view.id() and
+                    DiagnosticBudget.has_results(other.id()) and
+                    file_name and file_name.endswith('.py')):
+                path = os.path.normcase(os.path.abspath(file_name))
+                candidates[path] = other
+    if not candidates:
+        return
+
+    search_path = list(view.window().folders()) if view.window() else []
+    search_path.extend(PylSet.get_or('python_path', [], view))
+    working_dir = PylSet.get_or('working_dir', None, view)
+    if working_dir:
+        search_path.append(working_dir)
+
+    def find():
+        IMPORT_GRAPH.refresh(list(candidates) + [saved], search_path)
+        dependents = IMPORT_GRAPH.dependents(saved)
+        views = [v for path, v in candidates.items() if path in dependents]
+        if views:
+            sublime.set_timeout(lambda: relint(views), 0)
+
+    def relint(views):
+        for other in views:
+            if other.window() is None:
+                # Closed in the meantime
+                continue
+            settings = PylSet.read_settings(other)
+            if not settings:
+                continue
+            speak("Re-linting dependent %s" % other.file_name())
+            content = None
+            if other.is_dirty():
+                content = other.substr(sublime.Region(0, other.size()))
+            # The cached results are those from before the saved module
+            # changed
+            thread = PylintThread(other, *settings, content=content,
+                                  profile=PylSet.get_or('idle_profile', None,
+                                                        other),
+                                  force=True)
+            thread.priority = LintScheduler.LOW
+            LintScheduler.submit(thread)
+
+    threading.Thread(target=find).start()
+
+
+def realign_diagnostics(view):
+    """ Move the diagnostics of a view along with their lines, once lines
+    have been inserted or removed.
+
+    Sublime Text keeps the hidden anchor regions drawn by `show_errors`, one
+    per line with diagnostics, in place as the buffer is edited, so the line
+    a diagnostic belongs on now is the line its anchor is on.
+    """
+    global LAST_SELECTED_LINE
+    view_id = view.id()
+    store = PYLINTER_ERRORS.get(view_id)
+    state = PYLINTER_VIEWS.get(view_id)
+    if not store or state is None or not state.anchored:
+        return
+
+    line_count = view.rowcol(view.size())[0]
+    if line_count == state.line_count:
+        return
+    state.line_count = line_count
+
+    anchors = view.get_regions(ANCHOR_KEY)
+    if len(anchors) != len(state.anchored):
+        # Have them drawn again on the next update
+        state.anchored = None
+        return
+
+    lines = [view.rowcol(anchor.begin())[0] for anchor in anchors]
+    if lines != state.anchored:
+        store.move_lines(dict(zip(state.anchored, lines)))
+        state.anchored = lines
+        # Have the status line updated
+        LAST_SELECTED_LINE = -1
+
+
+class PylinterProjectCommand(sublime_plugin.WindowCommand):
+    """ Lint all Python files in the project """
+
+    def run(self, action=None):
+        if action == 'cancel':
+            ProjectLint.cancel()
+            return
+
+        if engine.PYLINT_VERSION is None:
+            PylintProbe.when_ready(
+                lambda: self.window.run_command('pylinter_project'))
+            return
+
+        settings = PylSet.read_settings()
+        if settings:
+            ProjectLint.start(self.window, settings)
 
 
 class BackgroundPylinter(sublime_plugin.EventListener):
     """ Process Sublime Text events """
+    # The views for which linting while typing was switched off, because
+    # their buffers are too large
+    _live_disabled = set()
+
     def _last_selected_lineno(self, view):
         return view.rowcol(view.sel()[0].end())[0]
 
+    def on_modified(self, view):
+        """ Keep the diagnostics on the right lines, and lint the buffer
+        contents once the user has stopped typing """
+        realign_diagnostics(view)
+
+        file_name = view.file_name()
+        if (not file_name or not file_name.endswith('.py') or
+                not PylSet.get_or('lint_on_modified', False, view)):
+            return
+
+        view_id = view.id()
+        if view.size() > PylSet.get_or('lint_max_size', 200000, view):
+            if view_id not in self._live_disabled:
+                self._live_disabled.add(view_id)
+                sublime.status_message("Pylinter: file too large, "
+                                       "linting while typing is disabled")
+            return
+        self._live_disabled.discard(view_id)
+
+        # Only the last of a series of modifications will find the change
+        # count unchanged when its timeout expires
+        change_count = view.change_count()
+
+        def lint_if_idle():
+            if view.change_count() == change_count:
+                view.run_command('pylinter', {'action': 'live'})
+
+        sublime.set_timeout(lint_if_idle,
+                            PylSet.get_or('lint_delay', 500, view))
+
+    def on_load(self, view):
+        """ Show cached results for files that have been linted before """
+        file_name = view.file_name()
+        if file_name and file_name.endswith('.py'):
+            view.run_command('pylinter', {'action': 'restore'})
+
+    def on_close(self, view):
+        """ Stop linting views that have been closed and forget their
+        results """
+        LintScheduler.cancel(view.id())
+        PylSet.forget(view)
+        DiagnosticBudget.forget(view.id())
+
+    def on_activated(self, view):
+        """ Restore the diagnostics of views that have been evicted """
+        DiagnosticBudget.restore(view, reload_dropped=True)
+
     def on_post_save(self, view):
         """ Run Pylint on file save """
-        if (view.file_name().endswith('.py') and
-            PylSet.get_or('run_on_save', False)):
-            view.run_command('pylinter')
+        if not view.file_name().endswith('.py'):
+            return
+        if PylSet.get_or('run_on_save', False, view):
+            save_profile = get_save_profile(view)
+            view.run_command('pylinter', {'profile': save_profile})
+            idle_profile = PylSet.get_or('idle_profile', None, view)
+            if idle_profile != save_profile:
+                self.lint_when_idle(view, idle_profile)
+        if PylSet.get_or('lint_dependents', True, view):
+            lint_dependents(view)
+
+    def lint_when_idle(self, view, profile):
+        """ Lint with the given profile in the background, once the view has
+        not been modified for `idle_delay` milliseconds """
+        delay = PylSet.get_or('idle_delay', 3000, view)
+        if delay <= 0:
+            return
+        change_count = view.change_count()
+
+        def lint_if_idle():
+            if view.window() is not None and not view.is_dirty() and \
+                    view.change_count() == change_count:
+                view.run_command('pylinter', {'profile': profile,
+                                              'background': True})
+
+        sublime.set_timeout(lint_if_idle, delay)
 
     def on_selection_modified(self, view):
         """ Show errors in the status line when the carret/selection moves """
@@ -569,8 +1962,9 @@ class BackgroundPylinter(sublime_plugin.EventListener):
             if new_selected_line != LAST_SELECTED_LINE:
                 LAST_SELECTED_LINE = new_selected_line
                 if LAST_SELECTED_LINE in PYLINTER_ERRORS[view_id]:
-                    err_str = PYLINTER_ERRORS[view_id][LAST_SELECTED_LINE]
-                    if PylSet.get_or("message_stay", False):
+                    err_str = " | ".join(str(diagnostic) for diagnostic in
+                        PYLINTER_ERRORS[view_id].at_line(LAST_SELECTED_LINE))
+                    if PylSet.get_or("message_stay", False, view):
                         view.set_status('Pylinter', err_str)
                         STATUS_ACTIVE = True
                     else:
@@ -579,6 +1973,14 @@ class BackgroundPylinter(sublime_plugin.EventListener):
                     view.erase_status('Pylinter')
                     STATUS_ACTIVE = False
 
+def plugin_unloaded():
+    """ Stop the Pylint workers when the plugin is unloaded """
+    if PYLINT_SETTINGS is not None:
+        PYLINT_SETTINGS.clear_on_change('pylinter')
+    engine.WorkerPool.shutdown()
+    if DURATION_HISTORY is not None:
+        DURATION_HISTORY.save()
+
 # In SublimeText 2, we need to call this manually.
 if not ST3:
     plugin_loaded()
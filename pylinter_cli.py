@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+""" PyLinter command line entry point
+
+    This module is *not* a Sublime Text plugin. It lints files with the same
+    engine, settings and result cache as the plugin, so it can be used in
+    pre-commit hooks and CI, i.e.
+
+        python pylinter_cli.py [--settings FILE]... [--project FILE]
+                               [--profile NAME] [--jobs N] [--no-cache]
+                               [--verbose] PATH...
+
+    Directories are searched for Python files, skipping the
+    `project_exclude` patterns. The settings are read from
+    `Pylinter.sublime-settings` next to this script, then from every
+    `--settings` file in turn, and finally from the "pylinter" settings of
+    the `--project` file, just like the plugin does. Multiconf qualifiers are
+    resolved for the machine the command runs on.
+
+    The files are linted in parallel, in shards of `project_shard_size`
+    files, by `project_jobs` Pylint runs. The shards are planned by how long
+    their files took to lint before, by the plugin or an earlier command, as
+    the plugin's project lint does. Every message is written to stdout
+    as soon as the shard it belongs to is done, as a JSON document on a line
+    of its own:
+
+        {"path": "/abs/path/module.py", "line": 12, "column": 4,
+         "endLine": 12, "endColumn": 9, "message-id": "E0602",
+         "symbol": "undefined-variable", "message": "Undefined variable 'x'"}
+
+    Line numbers are one based and columns zero based, like Pylint's own JSON
+    output; missing end positions are null. Messages of the types listed in
+    the `ignore` setting are left out.
+
+    Results are looked up in, and stored to, the plugin's result cache, under
+    the same keys. A file linted by one of them is a cache hit for the other
+    as long as the file and the settings are unchanged.
+
+    The exit status is 0 if no messages were written, 1 if there were
+    messages, and 2 if the settings are invalid or Pylint failed.
+"""
+
+import os
+import sys
+import re
+import json
+import threading
+import multiprocessing
+
+try:
+    from . import durations
+    from . import engine
+    from . import resultcache
+except (ImportError, ValueError):
+    import durations
+    import engine
+    import resultcache
+
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "Pylinter.sublime-settings")
+
+# Strings, which are kept, and comments, which are removed
+P_COMMENTS = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+# Strings, which are kept, and trailing commas, which are removed
+P_TRAILING_COMMAS = re.compile(r'("(?:\\.|[^"\\])*")|,(?=\s*[}\]])')
+
+# Marks settings that have no value
+_MISSING = object()
+
+
+def load_settings_file(path):
+    """ Return the contents of a Sublime Text settings or project file, which
+    is JSON with comments and trailing commas """
+    with open(path, "rb") as settings_file:
+        text = settings_file.read().decode("utf-8")
+    keep_strings = lambda match: match.group(1) or ""
+    text = P_COMMENTS.sub(keep_strings, text)
+    text = P_TRAILING_COMMAS.sub(keep_strings, text)
+    return json.loads(text)
+
+
+class Settings(object):
+    """ The settings of a command line run, looked up the way the plugin's
+    `PylSet` does """
+
+    def __init__(self, settings_files, project_file=None):
+        self.plugin_settings = {}
+        for path in settings_files:
+            self.plugin_settings.update(load_settings_file(path))
+        self.project_settings = None
+        if project_file:
+            project = load_settings_file(project_file)
+            self.project_settings = project.get("settings", {}).get("pylinter")
+
+    def get_or(self, setting_name, default):
+        value = engine.resolve_setting(self.project_settings,
+                                       self.plugin_settings, setting_name,
+                                       _MISSING)
+        return default if value is _MISSING else value
+
+
+def find_files(paths, exclude):
+    """ Return the absolute, normalized names of the Python files to lint """
+    found = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            found.extend(engine.find_python_files([path], exclude))
+        else:
+            found.append(os.path.normpath(path))
+    return sorted(set(found))
+
+
+def format_message(file_name, message):
+    """ Return a stored message as a line of JSON """
+    line_num, err_type, errno, msg, column, end_line, end_column = message[:7]
+    return json.dumps({
+        "path": file_name,
+        "line": line_num + 1,
+        "column": column,
+        "endLine": None if end_line == -1 else end_line + 1,
+        "endColumn": None if end_column == -1 else end_column,
+        "message-id": err_type + errno,
+        "symbol": message[7] if len(message) > 7 else None,
+        "message": msg}, sort_keys=True)
+
+
+class BatchLint(object):
+    """ Lint shards of files in parallel and write out the results """
+
+    def __init__(self, queues, ignore, output):
+        self._lock = threading.Lock()
+        # A `durations.ShardQueues`
+        self._queues = queues
+        self._ignore = ignore
+        self._output = output
+        self.message_count = 0
+        self.failed = False
+
+    def shard_done(self, shard, results, error):
+        """ Write out the messages of a shard, called from the lint threads """
+        lines = []
+        for file_name in shard:
+            for message in sorted(results[file_name], key=lambda m: m[:4]):
+                if message[1].lower() not in self._ignore:
+                    lines.append(format_message(file_name, message) + "\n")
+
+        with self._lock:
+            if error:
+                self.failed = True
+                sys.stderr.write("Pylint failed on %s: %s\n" % (
+                    ", ".join(shard), error))
+            self.message_count += len(lines)
+            self._output.write("".join(lines))
+            self._output.flush()
+
+    def work(self, runner, options, job):
+        """ Lint shards until none are left, runs in a lint thread """
+        try:
+            while True:
+                shard = self._queues.next_shard(job)
+                if shard is None:
+                    break
+                outcome = runner.lint_files(shard, options)
+                if outcome is None:
+                    break
+                self.shard_done(shard, *outcome)
+        except Exception as exc:  # pylint: disable=W0703
+            with self._lock:
+                self.failed = True
+                sys.stderr.write("Linting failed: %s\n" % exc)
+        finally:
+            runner.finished.set()
+
+
+def main(argv=None):
+    # argparse is not available on the Python 2.6 of Sublime Text 2, which
+    # loads this module as a plugin
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Lint Python files with PyLinter's settings and cache")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="the files and directories to lint")
+    parser.add_argument("--settings", action="append", default=[],
+                        metavar="FILE",
+                        help="a settings file that overrides the defaults, "
+                             "may be given more than once")
+    parser.add_argument("--project", metavar="FILE",
+                        help="a .sublime-project file whose 'pylinter' "
+                             "settings apply")
+    parser.add_argument("--profile", metavar="NAME",
+                        help="the lint profile to use, see the 'profiles' "
+                             "setting")
+    parser.add_argument("--jobs", type=int, default=0, metavar="N",
+                        help="the number of Pylint runs in parallel")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't use the result cache")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log what is going on to stderr")
+    args = parser.parse_args(argv)
+
+    engine.VERBOSE = args.verbose
+    try:
+        settings = Settings([SETTINGS_FILE] + args.settings, args.project)
+    except (IOError, OSError, ValueError) as exc:
+        sys.stderr.write("Could not read the settings: %s\n" % exc)
+        return 2
+    get_or = settings.get_or
+
+    cache_dir = get_or('cache_dir', None) or resultcache.default_cache_dir()
+    python_bin = get_or('python_bin', 'python')
+    pylint_path = get_or('pylint_path', None)
+    outcome = engine.load_probe(cache_dir, python_bin, pylint_path)
+    if outcome is None:
+        outcome = engine.probe_pylint(cache_dir, python_bin, pylint_path,
+                                      lambda msg: sys.stderr.write(msg + "\n"))
+    if not outcome[0]:
+        return 2
+    engine.set_pylint_command(*outcome)
+
+    try:
+        lint_settings = engine.read_settings(get_or)
+    except engine.SettingsError as exc:
+        sys.stderr.write("%s\n" % exc)
+        return 2
+
+    profile_options = {}
+    if args.profile:
+        profiles = get_or('profiles', {})
+        if args.profile not in profiles:
+            sys.stderr.write("Unknown lint profile %s\n" % args.profile)
+            return 2
+        profile_options = profiles[args.profile] or {}
+
+    cache = None
+    if get_or('use_cache', True) and not args.no_cache:
+        cache = resultcache.ResultCache(
+            cache_dir, int(get_or('cache_size', 50) * 1024 * 1024))
+
+    history = durations.DurationHistory(durations.history_file(cache_dir))
+
+    files = find_files(args.paths, get_or('project_exclude', []))
+    jobs = min(args.jobs or get_or('project_jobs', 0) or
+               multiprocessing.cpu_count(), len(files))
+    # Smaller shards than configured if that keeps every job busy
+    shard_size = max(1, min(get_or('project_shard_size', 20),
+                            -(-len(files) // max(1, jobs))))
+    queues = durations.ShardQueues(
+        history, files, durations.run_key(args.profile, profile_options),
+        jobs, shard_size, get_or('slow_file_threshold', 5))
+    batch = BatchLint(queues, lint_settings[5], sys.stdout)
+
+    threads = []
+    for job in range(jobs):
+        runner = engine.LintRunner(*lint_settings, cache=cache,
+                                   history=history,
+                                   **engine.runner_options(get_or))
+        runner.profile = args.profile
+        runner.profile_options = profile_options
+        thread = threading.Thread(target=batch.work,
+                                  args=(runner, runner.get_options(), job))
+        thread.start()
+        threads.append((thread, runner))
+
+    try:
+        for thread, _ in threads:
+            # A timeout keeps the main thread responsive to Ctrl+C
+            while thread.is_alive():
+                thread.join(0.2)
+    except KeyboardInterrupt:
+        for _, runner in threads:
+            runner.cancel()
+        return 2
+    finally:
+        engine.WorkerPool.shutdown()
+        history.save()
+
+    if batch.failed:
+        return 2
+    return 1 if batch.message_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+""" A quick, in-process check for the most glaring errors.
+
+Pylint takes a while to start and to analyse a module, but syntax errors and
+names that aren't defined anywhere are found by the Python parser and a single
+walk over the syntax tree in milliseconds. `check` reports those with the
+message ids Pylint uses for them, so they can be shown while Pylint is still
+running, and be replaced by Pylint's own messages once it's done.
+
+The check is deliberately conservative, since it knows nothing about scopes:
+a name is only reported if nothing in the module binds it and it isn't a
+builtin of either Python 2 or Python 3. Modules that may bind names the parser
+can't see are not checked for undefined names at all: those with a wildcard
+import, those that use `globals()` or `vars()` other than to read a name, and
+those that call an enum's `_convert`, which adds its members to a module.
+Names bound some other way, e.g. through `sys.modules[__name__].__dict__` or
+`setattr` on the module, are still reported.
+
+The source is parsed by the Python that runs the check, which may not be the
+one the module is written for. Syntax that one version rejects may be valid in
+the other, so syntax errors are not reported when the versions are known to
+differ. Undefined names are then not reported either, for lack of a syntax
+tree.
+
+This module does not depend on Sublime Text.
+"""
+
+import sys
+import ast
+
+try:
+    import builtins
+except ImportError:
+    # Python 2
+    import __builtin__ as builtins
+
+# Names that are available without being bound: the builtins of the running
+# Python, those of the other major version, and the attributes modules,
+# classes and methods get implicitly
+KNOWN_NAMES = frozenset(dir(builtins) + [
+    "apply", "basestring", "buffer", "cmp", "coerce", "execfile", "file",
+    "intern", "long", "raw_input", "reduce", "reload", "unichr", "unicode",
+    "xrange", "ascii", "exec", "print", "__annotations__", "__builtins__",
+    "__cached__", "__class__", "__doc__", "__file__", "__loader__",
+    "__module__", "__name__", "__package__", "__path__", "__qualname__",
+    "__spec__"])
+
+# The functions that return the namespace a module's names live in
+NAMESPACE_FUNCTIONS = ("globals", "vars")
+
+# The methods of a namespace that only read it
+READ_METHODS = ("get", "keys", "items", "values", "copy", "__contains__",
+                "__getitem__")
+
+# Enum methods that add the members of an enum to a module's namespace
+CONVERT_METHODS = ("_convert", "_convert_")
+
+
+def _syntax_error(exc):
+    """ Return the message for a syntax error """
+    line = max((exc.lineno or 1) - 1, 0)
+    column = max((exc.offset or 1) - 1, 0)
+    return (line, "E", "0001", "Parsing failed: '%s'" % exc.msg, column, -1,
+            -1, "syntax-error")
+
+
+def _is_namespace_call(node):
+    """ Return True if the node calls `globals()` or `vars()` """
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and
+            node.func.id in NAMESPACE_FUNCTIONS and not node.args)
+
+
+def _reads_namespace(parent):
+    """ Return True if the parent of a `globals()` or `vars()` call only
+    reads a name from it """
+    if isinstance(parent, ast.Subscript):
+        return isinstance(parent.ctx, ast.Load)
+    if isinstance(parent, ast.Attribute):
+        return parent.attr in READ_METHODS
+    return isinstance(parent, ast.Compare)
+
+
+def _bound_names(tree):
+    """ Return the names bound anywhere in the module, and whether it may
+    bind names dynamically, see the module's documentation """
+    bound = set()
+    dynamic = False
+    for parent in ast.walk(tree):
+        for child in ast.iter_child_nodes(parent):
+            if _is_namespace_call(child):
+                dynamic = dynamic or not _reads_namespace(parent)
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and
+                isinstance(node.func, ast.Attribute) and
+                node.func.attr in CONVERT_METHODS):
+            dynamic = True
+        elif isinstance(node, ast.Name):
+            if not isinstance(node.ctx, ast.Load):
+                bound.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    dynamic = True
+                elif alias.asname:
+                    bound.add(alias.asname)
+                else:
+                    bound.add(alias.name.split(".")[0])
+        elif isinstance(node, ast.arguments):
+            for arg in (node.args + getattr(node, "posonlyargs", []) +
+                        getattr(node, "kwonlyargs", []) +
+                        [node.vararg, node.kwarg]):
+                # Plain names on Python 2 (and 3.3), ast.arg nodes later on
+                name = getattr(arg, "arg", arg)
+                if isinstance(name, str):
+                    bound.add(name)
+        elif isinstance(node, (ast.Global, getattr(ast, "Nonlocal",
+                                                   ast.Global))):
+            bound.update(node.names)
+        else:
+            # Functions, classes, exception handlers, match captures and
+            # type parameters
+            for attr in ("name", "rest"):
+                name = getattr(node, attr, None)
+                if isinstance(name, str):
+                    bound.add(name)
+    return bound, dynamic
+
+
+def check(source, python_version=None):
+    """ Return the syntax errors and undefined names in the source, as
+    (line number, type, error number, message, column, end line, end column,
+    symbol) tuples with zero based line numbers.
+
+    `python_version` is the (major, minor) version of the Python the source
+    is written for, if known. Syntax errors are left to Pylint if it's not the
+    version that runs the check.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as exc:
+        if (python_version is not None and
+                tuple(python_version) != tuple(sys.version_info[:2])):
+            return []
+        return [_syntax_error(exc)]
+    except (ValueError, TypeError):
+        # E.g. null bytes, leave those to Pylint
+        return []
+
+    bound, dynamic = _bound_names(tree)
+    if dynamic:
+        return []
+
+    messages = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and
+                node.id not in bound and node.id not in KNOWN_NAMES):
+            end_line = getattr(node, "end_lineno", None)
+            end_column = getattr(node, "end_col_offset", None)
+            messages.append((node.lineno - 1, "E", "0602",
+                             "Undefined variable '%s'" % node.id,
+                             node.col_offset,
+                             -1 if end_line is None else end_line - 1,
+                             -1 if end_column is None else end_column,
+                             "undefined-variable"))
+    messages.sort()
+    return messages
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+""" A content-addressed, on-disk cache of Pylint results.
+
+Results are stored under a key that is derived from the contents of the linted
+file and everything else that can influence Pylint's verdict: the Pylint
+version, the command line options, the contents of the configuration file and
+so on. Linting a file that has been linted before with identical inputs can
+then be answered without running Pylint at all, even after a restart.
+
+Every entry is stored in its own small JSON file. The total size of the cache
+is capped; when it grows beyond its cap the least recently used entries are
+evicted. The modification time of an entry's file is used to track its last
+use, so no separate index has to be kept consistent.
+
+This module does not depend on Sublime Text.
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+# Bump this whenever the format of the stored results changes
+CACHE_FORMAT = 2
+
+ENTRY_SUFFIX = ".json"
+
+
+def default_cache_dir():
+    """ Return the platform's conventional location for the cache """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "Pylinter", "Cache")
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pylinter")
+
+
+def make_key(content, settings):
+    """ Return the cache key for the given file content and settings.
+
+    `content` is the raw (byte) content of the linted file, `settings` is a
+    JSON serializable object describing all other inputs of the lint run.
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([CACHE_FORMAT, settings],
+                             sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """ A size capped cache of lint results in `directory` """
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # The total size of all entries, determined on first use
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _entries(self):
+        """ Return (mtime, size, path) for every entry in the cache """
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+
+        for name in names:
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get(self, key):
+        """ Return the cached results for `key`, or None """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as entry:
+                results = json.loads(entry.read().decode("utf-8"))
+        except (IOError, OSError, ValueError):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return results
+
+    def put(self, key, results):
+        """ Store `results` under `key` and evict old entries if needed """
+        data = json.dumps(results, separators=(",", ":")).encode("utf-8")
+        path = self._path(key)
+        temp_path = "%s.%d.%d.tmp" % (path, os.getpid(), id(data))
+
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with open(temp_path, "wb") as entry:
+                entry.write(data)
+            if os.name == "nt" and os.path.exists(path):
+                os.remove(path)
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(e[1] for e in self._entries())
+            else:
+                self._size += len(data) - replaced
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """ Remove the least recently used entries until the cache is below
+        three quarters of its maximum size """
+        entries = sorted(self._entries())
+        self._size = sum(e[1] for e in entries)
+        target = self.max_size * 3 // 4
+
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """ Remove all entries """
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self):
+        """ Return the number of entries and their total size in bytes """
+        entries = self._entries()
+        return len(entries), sum(e[1] for e in entries)
+
+    def __repr__(self):
+        return "ResultCache(%r, %d)" % (self.directory, self.max_size)
+
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+""" Timing statistics of lint runs.
+
+Every run records how long each of its phases took in a `RunStats`, along
+with the number of messages and bytes of output it handled. The phases are:
+
+    settings  resolving the settings for the run
+    queue     waiting for the scheduler to start the run
+    cache     looking up the results in the result cache
+    spawn     starting the Pylint process, or acquiring a worker
+    pylint    Pylint itself, not counting the decode and parse phases
+    decode    decoding Pylint's output into text or records
+    parse     turning the output into messages
+    render    building the view's diagnostics and drawing the markers
+
+A `StatsHistory` keeps the most recent runs of every file, to provide rolling
+percentiles, and can append every run to a JSON lines log file.
+
+This module does not depend on Sublime Text.
+"""
+
+import time
+import json
+import threading
+import collections
+
+# The most precise clock available
+clock = getattr(time, "perf_counter", time.time)
+
+PHASES = ("settings", "queue", "cache", "spawn", "pylint", "decode", "parse",
+          "render")
+
+
+def percentile(values, pct):
+    """ Return the `pct` percentile of the values, using the nearest rank """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = int(round(pct / 100.0 * len(ordered) + 0.5)) - 1
+    return ordered[max(0, min(rank, len(ordered) - 1))]
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return "%.1f ms" % (seconds * 1000)
+    return "%.2f s" % seconds
+
+
+def format_size(size):
+    if size < 1024:
+        return "%d B" % size
+    return "%.1f KiB" % (size / 1024.0)
+
+
+class RunStats(object):
+    """ The timing breakdown of a single lint run """
+
+    def __init__(self, file_name=None):
+        self.file_name = file_name
+        self.timestamp = time.time()
+        self.started = clock()
+        self.phases = {}
+        # "cache", "worker", "process" or "project"
+        self.mode = None
+        self.messages = 0
+        self.bytes = 0
+        self.total = None
+
+    def add(self, phase, seconds):
+        """ Account `seconds` to `phase` """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish(self):
+        """ Mark the run as completed """
+        self.total = clock() - self.started
+
+    def summary(self):
+        """ Return a single line description of the run """
+        parts = ["%s %s" % (phase, format_duration(self.phases[phase]))
+                 for phase in PHASES if phase in self.phases]
+        return "%s total, %s; %d messages, %s (%s)" % (
+            format_duration(self.total), ", ".join(parts), self.messages,
+            format_size(self.bytes), self.mode)
+
+    def to_dict(self):
+        return {"file": self.file_name,
+                "time": self.timestamp,
+                "mode": self.mode,
+                "total": self.total,
+                "phases": self.phases,
+                "messages": self.messages,
+                "bytes": self.bytes}
+
+
+class StatsHistory(object):
+    """ The most recent runs of every file """
+
+    def __init__(self, size=50):
+        self.size = size
+        self._lock = threading.Lock()
+        # file name -> the most recent RunStats, oldest first
+        self._runs = {}
+
+    def record(self, run, log_file=None):
+        """ Add a completed run, and append it to `log_file` if given """
+        with self._lock:
+            runs = self._runs.get(run.file_name)
+            if runs is None:
+                runs = self._runs[run.file_name] = collections.deque(
+                    maxlen=self.size)
+            runs.append(run)
+
+        if log_file:
+            line = json.dumps(run.to_dict(), sort_keys=True) + "\n"
+            with open(log_file, "a") as log:
+                log.write(line)
+
+    def runs(self, file_name):
+        with self._lock:
+            return list(self._runs.get(file_name, ()))
+
+    def file_names(self):
+        with self._lock:
+            return sorted(self._runs)
+
+    def report(self):
+        """ Return a textual report of the recorded runs, with the
+        percentiles of the total time of every file and the median time of
+        every phase """
+        lines = []
+        for file_name in self.file_names():
+            runs = self.runs(file_name)
+            totals = [run.total for run in runs]
+            lines.append(file_name)
+            lines.append("  %d runs, total p50 %s, p90 %s, p99 %s" % (
+                len(runs), format_duration(percentile(totals, 50)),
+                format_duration(percentile(totals, 90)),
+                format_duration(percentile(totals, 99))))
+
+            medians = []
+            for phase in PHASES:
+                values = [run.phases[phase] for run in runs
+                          if phase in run.phases]
+                if values:
+                    medians.append("%s %s" % (
+                        phase, format_duration(percentile(values, 50))))
+            lines.append("  phase p50: " + ", ".join(medians))
+            lines.append("  last run: " + runs[-1].summary())
+            lines.append("")
+
+        if not lines:
+            return "No lint runs recorded yet\n"
+        return "\n".join(lines)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+""" Helpers for the tests: import PyLinter the way Sublime Text 3 does, using
+the stand-ins for the `sublime` and `sublime_plugin` modules that the
+benchmarks use """
+
+import os
+import sys
+import types
+import tempfile
+import importlib
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+
+
+def load_pylinter():
+    """ Return the `sublime` stand-in and the plugin module """
+    stubs = os.path.join(ROOT_DIR, "bench", "stubs")
+    if stubs not in sys.path:
+        sys.path.insert(0, stubs)
+    if "Pylinter" not in sys.modules:
+        package = types.ModuleType("Pylinter")
+        package.__path__ = [ROOT_DIR]
+        sys.modules["Pylinter"] = package
+
+    import sublime
+    settings = sublime.load_settings("Pylinter.sublime-settings")
+    settings.values.update({"verbose": False, "use_cache": False,
+                            "quick_check": False,
+                            "cache_dir": tempfile.mkdtemp()})
+
+    pylinter = importlib.import_module("Pylinter.pylinter")
+    # Skip probing for Pylint, unless a test sets it up itself
+    pylinter.PYLINT_SETTINGS = settings
+    if pylinter.engine.PYLINT_VERSION is None:
+        pylinter.set_pylint_command(["pylint"], (2, 12, 0))
+    return sublime, pylinter
+
+
+def make_thread(pylinter, view, **kwargs):
+    """ Return a lint thread for the view that is the current run, without
+    starting it """
+    thread = pylinter.PylintThread(view, *pylinter.PylSet.read_settings(view),
+                                   **kwargs)
+    # What `LintScheduler.submit` would do, minus starting the thread
+    generation = pylinter.LintScheduler._generation.get(view.id(), 0) + 1
+    pylinter.LintScheduler._generation[view.id()] = generation
+    thread.generation = generation
+    return thread
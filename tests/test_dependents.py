@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+""" Re-linting the files that import a saved file """
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+
+# The Python to run Pylint with
+PYTHON_BIN = os.environ.get("PYLINTER_TEST_PYTHON", sys.executable)
+
+
+def has_pylint():
+    return subprocess.call([PYTHON_BIN, "-c", "import pylint"],
+                           stdout=subprocess.PIPE,
+                           stderr=subprocess.PIPE) == 0
+
+
+def run_until(condition, timeout=60):
+    """ Run the queued callbacks until `condition()` holds """
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Timed out waiting for the lint runs")
+        sublime.run_timeouts()
+        time.sleep(0.05)
+
+
+@unittest.skipUnless(has_pylint(), "Pylint is not installed")
+class DependentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings = pylinter.PYLINT_SETTINGS
+        self.saved = dict(self.settings.values)
+        self.command = (pylinter.engine.DEFAULT_PYLINT_COMMAND,
+                        pylinter.engine.PYLINT_VERSION)
+        self.settings.values.update({
+            "python_bin": PYTHON_BIN, "working_dir": self.directory,
+            "use_cache": True, "use_worker": False, "run_on_save": False,
+            "lint_dependents": True, "profiles": {}, "idle_profile": None,
+            "disable": ["C", "R"]})
+        command = [PYTHON_BIN, "-m", "pylint"]
+        pylinter.set_pylint_command(
+            command, pylinter.engine.get_pylint_version(PYTHON_BIN, None,
+                                                        command))
+        pylinter.PylSet.invalidate()
+
+        self.module = self.write("helper.py", "VALUE = 1\n")
+        window = sublime.active_window()
+        self.views = [
+            window.add_view(sublime.View("", self.module, window)),
+            window.add_view(sublime.View("", self.write(
+                "user.py", "import helper\n\nprint(helper.VALUE)\n"),
+                window))]
+
+    def tearDown(self):
+        window = sublime.active_window()
+        for view in self.views:
+            window._views.remove(view)
+            pylinter.PYLINTER_ERRORS.pop(view.id(), None)
+            pylinter.PYLINTER_VIEWS.pop(view.id(), None)
+        self.settings.values.clear()
+        self.settings.values.update(self.saved)
+        pylinter.set_pylint_command(*self.command)
+        pylinter.PylSet.invalidate()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as module:
+            module.write(source)
+        return path
+
+    def shown(self, view):
+        store = pylinter.PYLINTER_ERRORS.get(view.id())
+        return sorted(d.msg_id for d in store) if store else []
+
+    def test_saving_a_module_relints_its_importers(self):
+        helper, user = self.views
+        pylinter.LintScheduler.submit(pylinter.PylintThread(
+            user, *pylinter.PylSet.read_settings(user)))
+        run_until(lambda: user.id() in pylinter.PYLINTER_ERRORS)
+        self.assertNotIn("E1101", self.shown(user))
+
+        self.write("helper.py", "OTHER_VALUE = 1\n")
+        pylinter.BackgroundPylinter().on_post_save(helper)
+        run_until(lambda: "E1101" in self.shown(user))
+
+
+if __name__ == '__main__':
+    unittest.main()
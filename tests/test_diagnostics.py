@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+""" Combining the diagnostics of different runs """
+
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+Diagnostic = pylinter.Diagnostic
+DiagnosticStore = pylinter.DiagnosticStore
+
+
+def diagnostics(origin, *messages):
+    return [Diagnostic.from_message((line, msg_id[0], msg_id[1:], text, 0,
+                                     -1, -1, None), origin)
+            for line, msg_id, text in messages]
+
+
+def listed(store):
+    return sorted((d.line, d.msg_id, d.origin) for d in store)
+
+
+class MergeTest(unittest.TestCase):
+
+    def test_profile_run_replaces_messages_of_another_profile(self):
+        store = DiagnosticStore(diagnostics(
+            "full", (0, "W0611", "Unused import os"),
+            (3, "R0913", "Too many arguments")))
+        store.merge(diagnostics("fast", (0, "W0611", "Unused import os")),
+                    replace=("quick", "fast"))
+        self.assertEqual(listed(store), [(0, "W0611", "fast"),
+                                         (3, "R0913", "full")])
+
+    def test_unrelated_messages_are_added(self):
+        store = DiagnosticStore(diagnostics(
+            "full", (0, "W0611", "Unused import os")))
+        store.merge(diagnostics("fast", (1, "W0611", "Unused import sys")),
+                    replace=("quick", "fast"))
+        self.assertEqual(listed(store), [(0, "W0611", "full"),
+                                         (1, "W0611", "fast")])
+
+    def test_quick_check_does_not_repeat_pylint_messages(self):
+        store = DiagnosticStore(diagnostics(
+            "pylint", (3, "E0602", "Undefined variable 'y'")))
+        store.merge(diagnostics("quick", (3, "E0602",
+                                          "Undefined variable 'y'"),
+                                (5, "E0602", "Undefined variable 'z'")),
+                    replace=("quick",))
+        self.assertEqual(listed(store), [(3, "E0602", "pylint"),
+                                         (5, "E0602", "quick")])
+
+
+if __name__ == '__main__':
+    unittest.main()
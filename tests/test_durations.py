@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+""" Telling slow files apart and planning the shards of a project lint """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+durations = pylinter.durations
+
+
+class ShardQueuesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history = durations.DurationHistory(
+            durations.history_file(self.directory))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def files(self, count):
+        # Empty files that haven't been linted are estimated at 0 seconds
+        names = []
+        for index in range(count):
+            name = os.path.join(self.directory, "mod%d.py" % index)
+            open(name, "w").close()
+            names.append(name)
+        return names
+
+    def drain(self, queues, job):
+        shards = []
+        while True:
+            shard = queues.next_shard(job)
+            if shard is None:
+                return shards
+            shards.append(shard)
+
+    def test_job_takes_shards_of_others_with_zero_estimates(self):
+        files = self.files(6)
+        queues = durations.ShardQueues(self.history, files, durations.FULL,
+                                       3, 1)
+        # Spread evenly, even though the jobs' queues are all estimated at 0
+        self.assertEqual([len(queue[1]) for queue in queues._queues],
+                         [2, 2, 2])
+        # Job 0 runs out of its own shards first and takes all the others
+        shards = self.drain(queues, 0)
+        self.assertEqual(sorted(f for shard in shards for f in shard), files)
+        self.assertIsNone(queues.next_shard(1))
+
+    def test_longest_shards_are_taken_from_the_busiest_job(self):
+        files = self.files(4)
+        for seconds, file_name in zip((1, 2, 3, 4), files):
+            self.history.record(file_name, durations.FULL, seconds)
+        queues = durations.ShardQueues(self.history, files, durations.FULL,
+                                       2, 1)
+        self.assertEqual(queues.next_shard(0), [files[0]])
+        self.assertEqual(queues.next_shard(0), [files[3]])
+        self.assertEqual(queues.next_shard(0), [files[2]])
+        self.assertEqual(queues.next_shard(1), [files[1]])
+        self.assertIsNone(queues.next_shard(1))
+
+
+class SlowFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history = durations.DurationHistory(
+            durations.history_file(self.directory))
+        self.file_name = os.path.join(self.directory, "big.py")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def age(self, seconds):
+        entry = self.history._files[self.history._normalize(self.file_name)]
+        entry["last"][durations.FULL] -= seconds
+
+    def test_slow_runs_make_a_file_slow(self):
+        for seconds in (6, 7, 8):
+            self.history.record(self.file_name, durations.FULL, seconds)
+        self.assertTrue(self.history.is_slow(self.file_name, durations.FULL,
+                                             5))
+
+    def test_slow_file_gets_another_chance(self):
+        for seconds in (6, 7, 8):
+            self.history.record(self.file_name, durations.FULL, seconds)
+        # It was only linted with the slow file profile since
+        self.age(durations.SLOW_EXPIRY + 1)
+        self.assertFalse(self.history.is_slow(self.file_name, durations.FULL,
+                                              5))
+        # The new run still takes too long
+        self.history.record(self.file_name, durations.FULL, 9)
+        self.assertTrue(self.history.is_slow(self.file_name, durations.FULL,
+                                             5))
+
+
+if __name__ == '__main__':
+    unittest.main()
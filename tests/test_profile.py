@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+""" Profiling the checkers on a file """
+
+import unittest
+
+from support import load_pylinter, make_thread
+
+sublime, pylinter = load_pylinter()
+
+
+class FailingProfile(pylinter.ProfileThread):
+
+    def run_profile(self):
+        raise RuntimeError("worker exploded")
+
+
+class ProfileThreadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = sublime.active_window()
+        self.view = self.window.add_view(sublime.View("import os\n",
+                                                      "/tmp/profiled.py",
+                                                      self.window))
+        self.settings = pylinter.PylSet.read_settings(self.view)
+
+    def tearDown(self):
+        self.window._views.remove(self.view)
+        pylinter.LintScheduler.cancel(self.view.id())
+
+    def test_failure_is_reported(self):
+        thread = FailingProfile(self.view, self.settings, 1.0)
+        thread.run()
+        sublime.run_timeouts()
+        self.assertTrue(thread.finished.is_set())
+        report = self.window.find_output_panel("pylinter_profile")
+        self.assertIn("Could not profile /tmp/profiled.py: worker exploded",
+                      report._text)
+
+    def test_superseded_by_a_lint_run(self):
+        scheduler = pylinter.LintScheduler
+        # Keep the runs from starting
+        running = make_thread(pylinter, self.view)
+        scheduler._running[self.view.id()] = running
+        try:
+            profile = pylinter.ProfileThread(self.view, self.settings, 1.0)
+            scheduler.submit(profile)
+            self.assertIs(scheduler._pending[self.view.id()], profile)
+            self.assertTrue(running.cancelled)
+
+            scheduler.submit(make_thread(pylinter, self.view))
+            self.assertTrue(profile.finished.is_set())
+        finally:
+            del scheduler._running[self.view.id()]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+""" The quick check for syntax errors and undefined names """
+
+import sys
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+quickcheck = pylinter.quickcheck
+
+HOST_VERSION = tuple(sys.version_info[:2])
+
+
+def found(source, python_version=None):
+    return [(m[0], m[1] + m[2]) for m in
+            quickcheck.check(source, python_version)]
+
+
+class QuickCheckTest(unittest.TestCase):
+
+    def test_undefined_name(self):
+        self.assertEqual(found("x = 1\nprint(y)\n"), [(1, "E0602")])
+
+    def test_names_read_from_globals_are_checked(self):
+        self.assertEqual(found("print(globals()['x'], y)\n"),
+                         [(0, "E0602")])
+        self.assertEqual(found("if 'x' in globals():\n    y\n"),
+                         [(1, "E0602")])
+
+    def test_dynamically_bound_names_are_not_reported(self):
+        for source in ("from os.path import *\nprint(join)\n",
+                       "globals().update(a=1)\nprint(a)\n",
+                       "globals()['a'] = 1\nprint(a)\n",
+                       "namespace = vars()\nnamespace['a'] = 1\nprint(a)\n",
+                       "import enum\n"
+                       "enum.IntEnum._convert_('Sig', __name__, bool)\n"
+                       "print(SIGINT)\n"):
+            self.assertEqual(found(source), [], source)
+
+    def test_syntax_error(self):
+        self.assertEqual(found("def f(:\n", HOST_VERSION), [(0, "E0001")])
+        self.assertEqual(found("def f(:\n"), [(0, "E0001")])
+
+    def test_syntax_of_other_python_versions_is_left_to_pylint(self):
+        self.assertEqual(found("print 'x'\n", (2, 7)), [])
+        newer = (HOST_VERSION[0], HOST_VERSION[1] + 1)
+        self.assertEqual(found("def f(:\n", newer), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+""" The on-disk result cache """
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+engine = pylinter.engine
+resultcache = pylinter.resultcache
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_rewritten_entry_is_counted_once(self):
+        cache = resultcache.ResultCache(self.directory, 1024 * 1024)
+        key = resultcache.make_key(b"x = 1\n", {})
+        cache.put(key, {"messages": []})
+        cache.put(key, {"messages": [[0, "C", "0114", "doc"]]})
+        cache.put(key, {"messages": [[0, "C", "0114", "Missing docstring"]]})
+        self.assertEqual(cache._size, cache.stats()[1])
+
+    def test_key_depends_on_the_interpreter(self):
+        module = os.path.join(self.directory, "mod.py")
+        other_python = os.path.join(self.directory, "python")
+        for name in (module, other_python):
+            with open(name, "w") as created:
+                created.write("x = 1\n")
+        cache = resultcache.ResultCache(self.directory, 1024 * 1024)
+
+        keys = set()
+        for python_bin in (sys.executable, other_python):
+            runner = engine.LintRunner(python_bin, "", self.directory, None,
+                                       None, [], "", [], [], cache=cache)
+            keys.add(runner.get_cache_key(module, None,
+                                          runner.get_options()))
+        self.assertEqual(len(keys), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
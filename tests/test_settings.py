@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+""" Looking up settings through `PylSet` """
+
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+
+
+class CountingSettings(sublime.Settings):
+    """ View settings that count the change callbacks registered """
+
+    def __init__(self):
+        sublime.Settings.__init__(self)
+        self.registered = 0
+
+    def add_on_change(self, key, callback):
+        self.registered += 1
+        sublime.Settings.add_on_change(self, key, callback)
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        window = sublime.active_window()
+        self.view = window.add_view(sublime.View("", "/tmp/settings.py",
+                                                 window))
+        self.view._settings = self.settings = CountingSettings()
+
+    def test_view_settings_change_drops_snapshot(self):
+        self.assertEqual(pylinter.PylSet.get_or('max_workers', 2,
+                                                self.view), 2)
+        self.settings.set('pylinter', {'max_workers': 5})
+        self.assertEqual(pylinter.PylSet.get_or('max_workers', 2,
+                                                self.view), 5)
+
+    def test_change_callback_is_registered_once(self):
+        for _ in range(3):
+            pylinter.PylSet.get_or('max_workers', 2, self.view)
+            pylinter.PylSet.invalidate()
+        pylinter.PylSet.get_or('max_workers', 2, self.view)
+        self.assertEqual(self.settings.registered, 1)
+
+    def test_closing_the_view_removes_the_callback(self):
+        pylinter.PylSet.get_or('max_workers', 2, self.view)
+        pylinter.BackgroundPylinter().on_close(self.view)
+        self.assertEqual(self.settings.callbacks, {})
+        self.assertNotIn(self.view.id(), pylinter.PylSet._snapshots)
+
+        pylinter.PylSet.get_or('max_workers', 2, self.view)
+        self.assertEqual(self.settings.registered, 2)
+
+
+
+class RunSettingsTest(unittest.TestCase):
+
+    def test_run_uses_the_settings_of_its_view(self):
+        window = sublime.active_window()
+        background = window.add_view(sublime.View("", "/tmp/background.py",
+                                                  window))
+        background.settings().set('pylinter', {'lint_timeout': 7,
+                                               'use_worker': False})
+        # Another view, of another project, has the focus
+        active = window.add_view(sublime.View("", "/tmp/active.py", window))
+        try:
+            thread = pylinter.PylintThread(
+                background, *pylinter.PylSet.read_settings(background))
+            self.assertEqual(thread.timeout, 7)
+            self.assertFalse(thread.use_worker)
+        finally:
+            window._views.remove(background)
+            window._views.remove(active)
+
+
+if __name__ == "__main__":
+    unittest.main()
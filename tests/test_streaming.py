@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+""" Results shown while a run is still in progress """
+
+import unittest
+
+from support import load_pylinter, make_thread
+
+sublime, pylinter = load_pylinter()
+
+SOURCE = "import os\n\ndef func(x):\n    return y\n"
+
+
+def message(line, msg_id, text):
+    return (line, msg_id[0], msg_id[1:], text, 0, -1, -1, None)
+
+
+class StreamedRunTest(unittest.TestCase):
+
+    def setUp(self):
+        window = sublime.active_window()
+        self.view = window.add_view(sublime.View(SOURCE, "/tmp/stream.py",
+                                                 window))
+        # The results of the previous run
+        previous = make_thread(pylinter, self.view)
+        previous.process_errors(pylinter.DiagnosticStore(
+            previous.make_diagnostics([
+                message(0, "W0611", "Unused import os"),
+                message(2, "C0116", "Missing function or method docstring"),
+                message(3, "E0602", "Undefined variable 'y'")], "pylint")),
+            3, [])
+        sublime.run_timeouts()
+
+    def tearDown(self):
+        pylinter.PYLINTER_ERRORS.pop(self.view.id(), None)
+        pylinter.PYLINTER_VIEWS.pop(self.view.id(), None)
+
+    def shown(self):
+        return sorted((d.line, d.msg_id) for d in
+                      pylinter.PYLINTER_ERRORS[self.view.id()])
+
+    def test_batches_replace_previous_messages(self):
+        thread = make_thread(pylinter, self.view)
+        # What the run does before it starts Pylint
+        thread.capture_previous()
+        thread.handle_batch([message(0, "W0611", "Unused import os")])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611"), (2, "C0116"),
+                                        (3, "E0602")])
+
+        thread.handle_batch([message(2, "C0116", "Missing function or "
+                                                 "method docstring"),
+                             message(3, "W0613", "Unused argument 'x'")])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611"), (2, "C0116"),
+                                        (3, "E0602"), (3, "W0613")])
+        store = pylinter.PYLINTER_ERRORS[self.view.id()]
+        self.assertEqual(len(store.at_line(0)), 1)
+
+    def test_completed_run_replaces_previous_results(self):
+        thread = make_thread(pylinter, self.view)
+        # What the run does before it starts Pylint
+        thread.capture_previous()
+        thread.handle_batch([message(0, "W0611", "Unused import os")])
+        sublime.run_timeouts()
+        thread.handle_messages([message(0, "W0611", "Unused import os")], [])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611")])
+
+    def test_batch_before_previous_results_are_known(self):
+        thread = make_thread(pylinter, self.view)
+        thread.handle_batch([message(3, "W0613", "Unused argument 'x'")])
+        sublime.run_timeouts()
+        self.assertNotIn((3, "W0613"), self.shown())
+
+        thread.capture_previous()
+        thread.handle_batch([message(0, "W0611", "Unused import os")])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611"), (2, "C0116"),
+                                        (3, "E0602"), (3, "W0613")])
+
+    def test_batches_and_quick_check(self):
+        thread = make_thread(pylinter, self.view)
+        thread.capture_previous()
+        thread.handle_batch([message(3, "W0613", "Unused argument 'x'")])
+        # The quick check's results come in before the batch is shown
+        thread.process_quick([message(1, "E0602", "Undefined variable 'z'")])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611"), (1, "E0602"),
+                                        (2, "C0116"), (3, "E0602"),
+                                        (3, "W0613")])
+
+    def test_quick_check_on_pylint_results(self):
+        thread = make_thread(pylinter, self.view)
+        thread.process_quick([message(3, "E0602", "Undefined variable 'y'")])
+        sublime.run_timeouts()
+        self.assertEqual(self.shown(), [(0, "W0611"), (2, "C0116"),
+                                        (3, "E0602")])
+
+
+if __name__ == "__main__":
+    unittest.main()
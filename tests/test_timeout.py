@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+""" Stopping Pylint runs that take too long """
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+engine = pylinter.engine
+
+# Stands in for Pylint: takes forever on files named slow*.py and reports a
+# message for every other file
+FAKE_PYLINT = """
+import os
+import sys
+import json
+import time
+
+files = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+if any(os.path.basename(f).startswith("slow") for f in files):
+    time.sleep(60)
+print(json.dumps([{"path": f, "line": 1, "column": 0, "message-id": "C0114",
+                   "symbol": "missing-module-docstring",
+                   "message": "Missing module docstring"} for f in files]))
+"""
+
+
+class LintFilesTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.command = (engine.DEFAULT_PYLINT_COMMAND, engine.PYLINT_VERSION)
+        engine.set_pylint_command([sys.executable, self.write("fake.py",
+                                                              FAKE_PYLINT)],
+                                  (2, 12, 0))
+
+    def tearDown(self):
+        engine.set_pylint_command(*self.command)
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source=""):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as module:
+            module.write(source)
+        return os.path.normcase(path)
+
+    def test_shard_that_times_out_does_not_stop_the_runner(self):
+        runner = engine.LintRunner(sys.executable, "", self.directory, None,
+                                   None, [], "", [], [], use_worker=False,
+                                   lint_timeout=1, memory_limit=0)
+        options = runner.get_options()
+        slow = self.write("slow.py")
+
+        started = time.time()
+        results, error = runner.lint_files([slow], options)
+        self.assertLess(time.time() - started, 30)
+        self.assertEqual(results, {slow: []})
+        self.assertIn("stopped after 1 seconds", error)
+
+        fast = self.write("fast.py")
+        results, error = runner.lint_files([fast], options)
+        self.assertIsNone(error)
+        self.assertEqual([m[1] + m[2] for m in results[fast]], ["C0114"])
+
+    def test_cancelled_runner_stops(self):
+        runner = engine.LintRunner(sys.executable, "", self.directory, None,
+                                   None, [], "", [], [], use_worker=False,
+                                   lint_timeout=1, memory_limit=0)
+        runner.cancel()
+        self.assertIsNone(runner.lint_files([self.write("fast.py")],
+                                            runner.get_options()))
+
+
+if __name__ == '__main__':
+    unittest.main()
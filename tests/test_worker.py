@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+""" The Pylint worker process, without Pylint """
+
+import unittest
+import importlib
+
+from support import load_pylinter
+
+sublime, pylinter = load_pylinter()
+engine = pylinter.engine
+pylint_worker = importlib.import_module("Pylinter.pylint_worker")
+
+
+class Module(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.file = None
+
+
+class Manager(object):
+
+    def __init__(self, *names):
+        self.astroid_cache = dict((name, Module(name)) for name in names)
+
+
+class CancelledJobTest(unittest.TestCase):
+
+    def test_modules_cached_by_a_cancelled_job_are_dropped(self):
+        manager = Manager("os", "collections")
+
+        def interrupted_run(args, **kwargs):
+            # Pylint is interrupted while astroid builds a module
+            manager.astroid_cache["half_built"] = Module("half_built")
+            raise KeyboardInterrupt()
+
+        response = pylint_worker.run_job(interrupted_run, "exit", manager,
+                                         None, {"id": 1, "args": [],
+                                                "files": []})
+        self.assertTrue(response["cancelled"])
+        self.assertEqual(sorted(manager.astroid_cache),
+                         ["collections", "os"])
+
+    def test_modules_cached_by_a_completed_job_are_kept(self):
+        manager = Manager("os")
+
+        def run(args, **kwargs):
+            manager.astroid_cache["json"] = Module("json")
+
+        response = pylint_worker.run_job(run, "exit", manager, None,
+                                         {"id": 2, "args": [], "files": []})
+        self.assertNotIn("cancelled", response)
+        self.assertEqual(sorted(manager.astroid_cache), ["json", "os"])
+
+
+
+class IdleWorker(object):
+
+    def __init__(self, key):
+        self.key = key
+        self.closed = False
+
+    def is_alive(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def tearDown(self):
+        engine.WorkerPool._idle = {}
+
+    def test_trim_keeps_the_most_recently_used_workers(self):
+        pool = engine.WorkerPool
+        workers = [IdleWorker(("project",)) for _ in range(4)]
+        other = IdleWorker(("other",))
+        for worker in workers + [other]:
+            pool.release(worker, 0)
+
+        pool.trim(2)
+        self.assertEqual([w.closed for w in workers],
+                         [True, True, False, False])
+        self.assertFalse(other.closed)
+        self.assertEqual(pool._idle[("project",)], workers[2:])
+
+
+if __name__ == '__main__':
+    unittest.main()